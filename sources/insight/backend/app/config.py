@@ -1,4 +1,5 @@
 """Application configuration loaded from environment variables."""
+import json
 import os
 from dotenv import load_dotenv, find_dotenv
 
@@ -28,3 +29,96 @@ SUPER_ADMIN_EMAILS = [
 
 # Bootstrap password for super admins (used on first seed only)
 SUPER_ADMIN_PASSWORD = os.getenv("SUPER_ADMIN_PASSWORD", "")
+
+# === Aruba API client ===
+# Limits for user-facing outbound Aruba calls (fleet fan-outs included)
+ARUBA_MAX_CONCURRENCY = int(os.getenv("ARUBA_MAX_CONCURRENCY", "8"))
+ARUBA_MAX_RPS = float(os.getenv("ARUBA_MAX_RPS", "10"))
+
+# Separate, lower lane for background polling (snapshot collector, live feeds);
+# the account sees at most the sum of both lanes
+ARUBA_BACKGROUND_MAX_CONCURRENCY = int(os.getenv("ARUBA_BACKGROUND_MAX_CONCURRENCY", "4"))
+ARUBA_BACKGROUND_MAX_RPS = float(os.getenv("ARUBA_BACKGROUND_MAX_RPS", "5"))
+
+# === Site snapshot collector ===
+# Background walk of every site of the linked master account; overview/inventory
+# reads are served from these snapshots instead of calling Aruba per request
+SNAPSHOT_COLLECTOR_ENABLED = os.getenv("SNAPSHOT_COLLECTOR_ENABLED", "true").lower() == "true"
+SNAPSHOT_INTERVAL_SECONDS = int(os.getenv("SNAPSHOT_INTERVAL_SECONDS", "300"))
+
+# Per-site Aruba resources collected each interval ("devices" is stored normalized,
+# "clients" feeds the cross-site client search index)
+SNAPSHOT_RESOURCES = [
+    r.strip() for r in os.getenv("SNAPSHOT_RESOURCES", "health,alerts,clientSummary,devices,clients").split(",") if r.strip()
+]
+
+# Snapshots older than this are ignored and the read falls back to a live Aruba call
+SNAPSHOT_MAX_AGE_SECONDS = int(os.getenv("SNAPSHOT_MAX_AGE_SECONDS", "900"))
+
+# Clients not seen by the collector for this long drop out of the search index
+CLIENT_INDEX_RETENTION_HOURS = int(os.getenv("CLIENT_INDEX_RETENTION_HOURS", "24"))
+
+# Device change log (diff of consecutive device snapshots) retention
+DEVICE_CHANGE_RETENTION_DAYS = int(os.getenv("DEVICE_CHANGE_RETENTION_DAYS", "30"))
+
+# === Dashboard live updates (overview SSE) ===
+# Each subscribed (site, resource) is polled once per interval, shared by all its viewers
+OVERVIEW_LIVE_POLL_SECONDS = int(os.getenv("OVERVIEW_LIVE_POLL_SECONDS", "30"))
+
+# === Capture retention (raw_logs / endpoints / bodies) ===
+# Default lifetime of a raw log; each log gets expire_at = timestamp + retention (TTL index)
+RAW_LOG_RETENTION_DAYS = int(os.getenv("RAW_LOG_RETENTION_DAYS", "30"))
+
+# Per-domain overrides, e.g. "portal.instant-on.hpe.com=90,sso.arubainstanton.com=7"
+RAW_LOG_RETENTION_OVERRIDES = {
+    domain.strip(): int(days)
+    for domain, _, days in (
+        item.partition("=") for item in os.getenv("RAW_LOG_RETENTION_OVERRIDES", "").split(",")
+    )
+    if domain.strip() and days.strip().isdigit()
+}
+
+# Size cap for raw_logs — oldest logs are rolled over (0 = no cap)
+RAW_LOGS_MAX_DOCS = int(os.getenv("RAW_LOGS_MAX_DOCS", "0"))
+
+# Endpoints not seen for this many days are dropped (0 = keep forever)
+ENDPOINT_RETENTION_DAYS = int(os.getenv("ENDPOINT_RETENTION_DAYS", "180"))
+
+# Body samples of endpoints kept forever (ENDPOINT_RETENTION_DAYS=0) expire this
+# many days after the endpoint was last seen, so the bodies store stays bounded
+ENDPOINT_SAMPLE_MAX_DAYS = int(os.getenv("ENDPOINT_SAMPLE_MAX_DAYS", "365"))
+
+# Hourly per-endpoint latency/status rollups (endpoint_stats) are kept this long
+ENDPOINT_STATS_RETENTION_DAYS = int(os.getenv("ENDPOINT_STATS_RETENTION_DAYS", "30"))
+
+# How often the retention (rollover) job runs
+RETENTION_JOB_INTERVAL_MINUTES = int(os.getenv("RETENTION_JOB_INTERVAL_MINUTES", "60"))
+
+# === Capture path templating ===
+# Optional JSON list of [regex, placeholder] pairs replacing the default
+# UUID / MAC / numeric-ID rules, e.g. '[["\\d+", "{id}"]]'
+# (invalid JSON / rules only warn — capture.path_template falls back to its defaults)
+try:
+    CAPTURE_PATH_RULES = json.loads(os.getenv("CAPTURE_PATH_RULES", "") or "null")
+except ValueError as e:
+    import warnings
+    warnings.warn(
+        f"[CONFIG] CAPTURE_PATH_RULES không phải JSON hợp lệ ({e}); dùng rules mặc định.",
+        stacklevel=2,
+    )
+    CAPTURE_PATH_RULES = None
+
+# === Audit log writer ===
+# Entries are buffered and written with insert_many per batch / interval
+AUDIT_SINK_BATCH_SIZE = int(os.getenv("AUDIT_SINK_BATCH_SIZE", "100"))
+AUDIT_SINK_FLUSH_INTERVAL_SECONDS = float(os.getenv("AUDIT_SINK_FLUSH_INTERVAL_SECONDS", "1.0"))
+
+# Buffer bound; entries beyond it are dropped (and counted) while MongoDB is unavailable
+AUDIT_SINK_MAX_BUFFER = int(os.getenv("AUDIT_SINK_MAX_BUFFER", "10000"))
+
+# === Live capture stream (WebSocket / SSE) ===
+# Per-subscriber queue bound; slow clients lose their oldest events first
+CAPTURE_LIVE_QUEUE_SIZE = int(os.getenv("CAPTURE_LIVE_QUEUE_SIZE", "1000"))
+
+# Events arriving within this window are sent to a client as one frame
+CAPTURE_LIVE_BATCH_WINDOW_MS = int(os.getenv("CAPTURE_LIVE_BATCH_WINDOW_MS", "100"))
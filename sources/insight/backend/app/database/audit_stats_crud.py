@@ -0,0 +1,98 @@
+"""MongoDB CRUD for the audit_rollups collection.
+
+Hourly and daily audit activity counters, maintained incrementally by the audit
+sink on every flush. One document per
+(granularity, bucket, action, zone_id, site_id, actor, status) holding a count,
+so dashboards aggregate O(buckets) small documents instead of scanning
+audit_logs. Day buckets follow Asia/Ho_Chi_Minh calendar days, like the log views.
+
+Hourly rows live as long as audit_logs (90 days); daily rows for a year.
+"""
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+import pytz
+from pymongo import UpdateOne
+from .connection import get_database
+
+VN_TZ = pytz.timezone("Asia/Ho_Chi_Minh")
+
+ROLLUP_GRANULARITIES = ("hour", "day")
+ROLLUP_DIMENSIONS = ("action", "zone_id", "site_id", "actor", "status")
+_ROLLUP_RETENTION = {"hour": timedelta(days=90), "day": timedelta(days=365)}
+
+
+def _bucket(ts: datetime, granularity: str) -> datetime:
+    if ts.tzinfo is None:
+        ts = pytz.utc.localize(ts)
+    if granularity == "hour":
+        return ts.astimezone(pytz.utc).replace(minute=0, second=0, microsecond=0)
+    local = ts.astimezone(VN_TZ)
+    return VN_TZ.localize(datetime(local.year, local.month, local.day)).astimezone(pytz.utc)
+
+
+async def record_audit_rollups(entries: List[Dict[str, Any]]):
+    """Fold a batch of written audit entries into the hourly/daily counters."""
+    counts: Dict[tuple, int] = {}
+    for e in entries:
+        ts = e.get("timestamp")
+        if not ts:
+            continue
+        dims = tuple(e.get(d) for d in ROLLUP_DIMENSIONS)
+        for granularity in ROLLUP_GRANULARITIES:
+            key = (granularity, _bucket(ts, granularity)) + dims
+            counts[key] = counts.get(key, 0) + 1
+    if not counts:
+        return
+
+    ops = []
+    for (granularity, bucket, *dims), n in counts.items():
+        ops.append(UpdateOne(
+            {"granularity": granularity, "bucket": bucket, **dict(zip(ROLLUP_DIMENSIONS, dims))},
+            {"$inc": {"count": n}, "$setOnInsert": {"expire_at": bucket + _ROLLUP_RETENTION[granularity]}},
+            upsert=True,
+        ))
+    db = get_database()
+    await db.audit_rollups.bulk_write(ops, ordered=False)
+
+
+async def get_audit_stats(
+    granularity: str,
+    start: datetime,
+    end: Optional[datetime] = None,
+    group_by: Optional[List[str]] = None,
+    scope: Optional[Dict[str, Any]] = None,
+    by_bucket: bool = True,
+    limit: int = 1000,
+) -> List[Dict[str, Any]]:
+    """Aggregate rollups in [start, end) into success/error/total counts.
+
+    `group_by` is a subset of ROLLUP_DIMENSIONS other than status; `scope` adds
+    equality/$in filters on those dimensions (e.g. the caller's visible actors).
+    With by_bucket=False, totals over the whole window are returned, largest first
+    (e.g. top actors).
+    """
+    db = get_database()
+    match: Dict[str, Any] = {"granularity": granularity, "bucket": {"$gte": _bucket(start, granularity)}}
+    if end:
+        match["bucket"]["$lt"] = end
+    match.update(scope or {})
+
+    group_id = {d: f"${d}" for d in group_by or []}
+    if by_bucket:
+        group_id["bucket"] = "$bucket"
+
+    pipeline = [
+        {"$match": match},
+        {"$group": {
+            "_id": group_id,
+            "total": {"$sum": "$count"},
+            "success": {"$sum": {"$cond": [{"$eq": ["$status", "SUCCESS"]}, "$count", 0]}},
+            "error": {"$sum": {"$cond": [{"$eq": ["$status", "SUCCESS"]}, 0, "$count"]}},
+        }},
+        {"$sort": {"_id.bucket": 1, "total": -1} if by_bucket else {"total": -1}},
+        {"$limit": limit},
+    ]
+    rows = []
+    async for row in db.audit_rollups.aggregate(pipeline):
+        rows.append({**row.pop("_id"), **row})
+    return rows
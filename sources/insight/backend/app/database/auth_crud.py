@@ -147,6 +147,17 @@ async def delete_user(email: str) -> bool:
 
 # ===== Audit log =====
 
+def normalize_actor(email: Optional[str]) -> str:
+    return (email or "anonymous").strip().lower()
+
+
+def with_actor(log_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Set the indexed `actor` field (legacy entries carry actor_email or insight_user_id)."""
+    if "actor" not in log_data:
+        log_data["actor"] = normalize_actor(log_data.get("actor_email") or log_data.get("insight_user_id"))
+    return log_data
+
+
 async def insert_audit_log(log_data: Dict[str, Any]):
     db = get_database()
-    await db.audit_logs.insert_one(log_data)
+    await db.audit_logs.insert_one(with_actor(log_data))
@@ -0,0 +1,288 @@
+"""Content-addressed, compressed storage for captured request/response bodies.
+
+Aruba responses (networksSummary, sites lists, ...) repeat almost byte-for-byte
+across captures, so each distinct body is stored once in the `bodies` collection:
+
+  _id          — sha256 of the canonical encoding (the reference kept by raw_logs/endpoints)
+  kind         — "json" (dict/list/number/bool) or "text" (str)
+  data         — zlib-compressed canonical bytes
+  size         — uncompressed byte length
+  stored_size  — compressed byte length
+  first_seen_at / last_seen_at
+  expire_at    — latest expiry of any referencing raw log or endpoint sample (TTL index);
+                 set from the raw log at store time, extended only for endpoint samples
+
+Bodies are only decompressed when a reader actually needs them (hydrate_* helpers).
+"""
+import hashlib
+import json
+import zlib
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from bson import Binary
+from pymongo import UpdateOne
+from .connection import get_database
+
+COMPRESSION_LEVEL = 6
+
+# Hashes recently written by this process — lets repeat bodies skip re-sending data
+_KNOWN_HASHES_MAX = 4096
+_known_hashes: "OrderedDict[str, None]" = OrderedDict()
+
+
+def _encode(body: Any) -> tuple:
+    """Return (kind, canonical bytes) for a body value."""
+    if isinstance(body, str):
+        return "text", body.encode("utf-8")
+    if isinstance(body, bytes):
+        return "text", body
+    return "json", json.dumps(body, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
+
+
+def _decode(kind: str, raw: bytes) -> Any:
+    text = raw.decode("utf-8", errors="replace")
+    return json.loads(text) if kind == "json" else text
+
+
+def _remember(body_hash: str):
+    _known_hashes[body_hash] = None
+    _known_hashes.move_to_end(body_hash)
+    if len(_known_hashes) > _KNOWN_HASHES_MAX:
+        _known_hashes.popitem(last=False)
+
+
+def forget_known_hashes():
+    """Clear the in-process hash cache (after the bodies collection is wiped)."""
+    _known_hashes.clear()
+
+
+async def store_body(body: Any, expire_at: Optional[datetime] = None) -> Optional[str]:
+    """Store a body once by content hash and return its reference (None for no body).
+
+    expire_at only ever moves forward ($max), so a body outlives every raw log
+    that references it and then expires with the last one (endpoint samples are
+    extended separately, see extend_body_expiry).
+    """
+    if body is None:
+        return None
+
+    db = get_database()
+    now = datetime.now(timezone.utc)
+    kind, raw = _encode(body)
+    body_hash = hashlib.sha256(kind.encode() + b":" + raw).hexdigest()
+
+    if body_hash in _known_hashes:
+        update = {"$set": {"last_seen_at": now}}
+        if expire_at:
+            update["$max"] = {"expire_at": expire_at}
+        result = await db.bodies.update_one({"_id": body_hash}, update)
+        if result.matched_count:
+            _remember(body_hash)
+            return body_hash
+
+    compressed = zlib.compress(raw, COMPRESSION_LEVEL)
+    update = {
+        "$setOnInsert": {
+            "kind": kind,
+            "data": Binary(compressed),
+            "size": len(raw),
+            "stored_size": len(compressed),
+            "first_seen_at": now,
+        },
+        "$set": {"last_seen_at": now},
+    }
+    if expire_at:
+        update["$max"] = {"expire_at": expire_at}
+    await db.bodies.update_one({"_id": body_hash}, update, upsert=True)
+    _remember(body_hash)
+    return body_hash
+
+
+async def store_bodies(items: List[Tuple[Any, Optional[datetime]]]) -> List[Optional[str]]:
+    """Batch form of store_body: (body, expire_at) pairs in, references out, one bulk_write.
+
+    Bodies repeated within the batch are written once, with their latest expire_at.
+    """
+    now = datetime.now(timezone.utc)
+    refs: List[Optional[str]] = []
+    pending: Dict[str, Dict[str, Any]] = {}
+    for body, expire_at in items:
+        if body is None:
+            refs.append(None)
+            continue
+        kind, raw = _encode(body)
+        body_hash = hashlib.sha256(kind.encode() + b":" + raw).hexdigest()
+        refs.append(body_hash)
+        entry = pending.get(body_hash)
+        if entry is None:
+            pending[body_hash] = {"kind": kind, "raw": raw, "expire_at": expire_at}
+        elif expire_at and (entry["expire_at"] is None or expire_at > entry["expire_at"]):
+            entry["expire_at"] = expire_at
+
+    ops = []
+    for body_hash, entry in pending.items():
+        compressed = zlib.compress(entry["raw"], COMPRESSION_LEVEL)
+        update = {
+            "$setOnInsert": {
+                "kind": entry["kind"],
+                "data": Binary(compressed),
+                "size": len(entry["raw"]),
+                "stored_size": len(compressed),
+                "first_seen_at": now,
+            },
+            "$set": {"last_seen_at": now},
+        }
+        if entry["expire_at"]:
+            update["$max"] = {"expire_at": entry["expire_at"]}
+        ops.append(UpdateOne({"_id": body_hash}, update, upsert=True))
+    if ops:
+        db = get_database()
+        await db.bodies.bulk_write(ops, ordered=False)
+        for body_hash in pending:
+            _remember(body_hash)
+    return refs
+
+
+async def extend_body_expiry(refs: Iterable[Optional[str]], expire_at: datetime):
+    """Push expire_at forward ($max) on the given bodies only, e.g. new endpoint samples."""
+    ops = [UpdateOne({"_id": ref}, {"$max": {"expire_at": expire_at}}) for ref in set(refs) if ref]
+    if ops:
+        db = get_database()
+        await db.bodies.bulk_write(ops, ordered=False)
+
+
+async def delete_unreferenced(refs: Iterable[Optional[str]]) -> int:
+    """Delete those of `refs` that no raw log or endpoint sample references any more.
+
+    Used after rollover so dropping logs also frees their bodies instead of
+    leaving them until the TTL.
+    """
+    candidates = {ref for ref in refs if ref}
+    if not candidates:
+        return 0
+    db = get_database()
+    for name, ref_field in _REFERENCE_FIELDS:
+        if not candidates:
+            return 0
+        async for doc in db[name].find({ref_field: {"$in": list(candidates)}}, {"_id": 0, ref_field: 1}):
+            candidates.discard(doc.get(ref_field))
+    if not candidates:
+        return 0
+    result = await db.bodies.delete_many({"_id": {"$in": list(candidates)}})
+    for ref in candidates:
+        _known_hashes.pop(ref, None)
+    return result.deleted_count
+
+
+async def load_bodies(refs: Iterable[Optional[str]]) -> Dict[str, Any]:
+    """Fetch and decompress several bodies in one query. Returns {ref: body}."""
+    wanted = list({r for r in refs if r})
+    if not wanted:
+        return {}
+    db = get_database()
+    bodies = {}
+    async for doc in db.bodies.find({"_id": {"$in": wanted}}):
+        bodies[doc["_id"]] = _decode(doc.get("kind", "json"), zlib.decompress(doc["data"]))
+    return bodies
+
+
+async def hydrate_docs(docs: List[dict], fields: Dict[str, str]) -> List[dict]:
+    """Replace body references with decompressed bodies, in place.
+
+    fields maps reference field → body field, e.g. {"response_body_ref": "response_body"}.
+    Documents written before content-addressed storage (inline bodies) are left as-is.
+    """
+    refs = [doc.get(ref_field) for doc in docs for ref_field in fields]
+    bodies = await load_bodies(refs)
+    for doc in docs:
+        for ref_field, body_field in fields.items():
+            ref = doc.pop(ref_field, None)
+            if ref:
+                doc[body_field] = bodies.get(ref)
+            else:
+                doc.setdefault(body_field, None)
+    return docs
+
+
+async def hydrate_stream(cursor, fields: Dict[str, str], chunk_size: int = 200):
+    """Async-iterate a cursor, hydrating bodies one chunk at a time (one lookup per chunk)."""
+    chunk: List[dict] = []
+    async for doc in cursor:
+        chunk.append(doc)
+        if len(chunk) >= chunk_size:
+            for hydrated in await hydrate_docs(chunk, fields):
+                yield hydrated
+            chunk = []
+    if chunk:
+        for hydrated in await hydrate_docs(chunk, fields):
+            yield hydrated
+
+
+# Body reference fields of the collections that hold references
+_REFERENCE_FIELDS = (
+    ("raw_logs", "request_body_ref"),
+    ("raw_logs", "response_body_ref"),
+    ("endpoints", "request_body_sample_ref"),
+    ("endpoints", "response_body_sample_ref"),
+)
+
+
+async def _live_references(collection, ref_field: str) -> Dict[str, int]:
+    """Count the body references one field currently holds and their uncompressed bytes."""
+    pipeline = [
+        {"$match": {ref_field: {"$type": "string"}}},
+        {"$group": {"_id": f"${ref_field}", "n": {"$sum": 1}}},
+        {"$lookup": {"from": "bodies", "localField": "_id", "foreignField": "_id", "as": "body"}},
+        {"$project": {"n": 1, "size": {"$ifNull": [{"$arrayElemAt": ["$body.size", 0]}, 0]}}},
+        {"$group": {
+            "_id": None,
+            "references": {"$sum": "$n"},
+            "logical_bytes": {"$sum": {"$multiply": ["$size", "$n"]}},
+        }},
+    ]
+    rows = await collection.aggregate(pipeline, allowDiskUse=True).to_list(length=1)
+    if not rows:
+        return {"references": 0, "logical_bytes": 0}
+    return {"references": rows[0]["references"], "logical_bytes": rows[0]["logical_bytes"]}
+
+
+async def get_storage_stats() -> Dict[str, Any]:
+    """Report how much space content-addressed storage saves.
+
+    references    — body references currently held by raw logs and endpoint samples
+    logical_bytes — what storing each of those references in full would cost
+    stored_bytes  — compressed bytes actually stored (one copy per distinct body)
+
+    References are counted from the live documents, so logs removed by TTL,
+    rollover or clear_all_data no longer count.
+    """
+    db = get_database()
+    pipeline = [
+        {"$group": {
+            "_id": None,
+            "distinct_bodies": {"$sum": 1},
+            "unique_bytes": {"$sum": "$size"},
+            "stored_bytes": {"$sum": "$stored_size"},
+        }},
+    ]
+    rows = await db.bodies.aggregate(pipeline).to_list(length=1)
+    stats = rows[0] if rows else {"distinct_bodies": 0, "unique_bytes": 0, "stored_bytes": 0}
+    stats.pop("_id", None)
+    stats["references"] = stats["logical_bytes"] = 0
+    for name, ref_field in _REFERENCE_FIELDS:
+        live = await _live_references(db[name], ref_field)
+        stats["references"] += live["references"]
+        stats["logical_bytes"] += live["logical_bytes"]
+    logical = stats["logical_bytes"]
+    stored = stats["stored_bytes"] or 0
+    stats["saved_bytes"] = logical - stored
+    stats["savings_ratio"] = round(1 - stored / logical, 4) if logical else 0.0
+    return stats
+
+
+async def clear_bodies() -> int:
+    db = get_database()
+    count = (await db.bodies.delete_many({})).deleted_count
+    forget_known_hashes()
+    return count
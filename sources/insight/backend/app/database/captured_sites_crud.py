@@ -0,0 +1,82 @@
+"""MongoDB CRUD for the captured_sites collection.
+
+Materialized view of the Aruba sites seen in captured traffic, maintained at
+ingest time. One document per site:
+
+  _id            — site UUID
+  siteName       — name from a sites-list response, or a "Site xxxxxxxx" placeholder
+  name_from_body — True once a real name has been captured
+  captured_at    — most recent capture that referenced the site
+"""
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from pymongo import UpdateOne
+from .connection import get_database
+
+
+def _placeholder_name(site_id: str) -> str:
+    return f"Site {site_id[:8]}"
+
+
+def _captured_site_ops(
+    captured_at: datetime,
+    path_site_id: Optional[str] = None,
+    named_sites: Optional[List[Dict[str, Any]]] = None,
+) -> List[UpdateOne]:
+    ops = []
+    named_ids = set()
+    for s in named_sites or []:
+        site_id = s["site_id"]
+        named_ids.add(site_id)
+        update: Dict[str, Any] = {"$max": {"captured_at": captured_at}}
+        if s.get("site_name"):
+            update["$set"] = {"siteName": s["site_name"], "name_from_body": True}
+        else:
+            update["$setOnInsert"] = {"siteName": _placeholder_name(site_id), "name_from_body": False}
+        ops.append(UpdateOne({"_id": site_id}, update, upsert=True))
+
+    if path_site_id and path_site_id not in named_ids:
+        ops.append(UpdateOne(
+            {"_id": path_site_id},
+            {
+                "$max": {"captured_at": captured_at},
+                "$setOnInsert": {"siteName": _placeholder_name(path_site_id), "name_from_body": False},
+            },
+            upsert=True,
+        ))
+    return ops
+
+
+async def record_captured_sites(
+    captured_at: datetime,
+    path_site_id: Optional[str] = None,
+    named_sites: Optional[List[Dict[str, Any]]] = None,
+):
+    """Upsert the sites referenced by one capture (URL and/or response body)."""
+    await record_captured_sites_many([(captured_at, path_site_id, named_sites)])
+
+
+async def record_captured_sites_many(
+    captures: List[Tuple[datetime, Optional[str], Optional[List[Dict[str, Any]]]]],
+):
+    """Upsert the sites referenced by several captures in one bulk_write."""
+    ops = [op for captured_at, path_site_id, named_sites in captures
+           for op in _captured_site_ops(captured_at, path_site_id, named_sites)]
+    if ops:
+        db = get_database()
+        await db.captured_sites.bulk_write(ops, ordered=False)
+
+
+async def list_captured_sites(limit: int = 1000) -> List[Dict[str, Any]]:
+    """Captured sites, most recently seen first (index on captured_at)."""
+    db = get_database()
+    cursor = db.captured_sites.find({}).sort("captured_at", -1).limit(limit)
+    return [
+        {"siteId": doc["_id"], "siteName": doc.get("siteName"), "captured_at": doc.get("captured_at")}
+        async for doc in cursor
+    ]
+
+
+async def clear_captured_sites() -> int:
+    db = get_database()
+    return (await db.captured_sites.delete_many({})).deleted_count
@@ -0,0 +1,113 @@
+"""MongoDB CRUD for the client_index collection.
+
+Cross-site search index of connected clients, fed by the snapshot collector
+from each site's client list. One document per (mac, site_id):
+
+  {mac, site_id, hostname, ip, ssid, client_type, last_seen, expire_at}
+
+mac is normalized (lowercase hex, no separators) and ip is lowercased (IPv6);
+hostname and ssid also have lowercase *_lc copies. Prefix lookups are anchored
+regexes on those fields, one query per field on its (field, last_seen) index, so a
+search touches only matching index ranges however many sites are indexed. Clients not seen for CLIENT_INDEX_RETENTION_HOURS are evicted by the
+TTL on expire_at (refreshed every time the client is seen).
+"""
+import asyncio
+import re
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Set
+from pymongo import UpdateOne
+from app.config import CLIENT_INDEX_RETENTION_HOURS
+from .connection import get_database
+
+CLIENT_SEARCH_FIELDS = ("mac", "hostname", "ip", "ssid")
+
+_MAC_SEPARATORS = re.compile(r"[:\-.]")
+_IP_PREFIX = re.compile(r"^[0-9.]+$|^[0-9a-f:]*:[0-9a-f:]*$")
+
+
+def normalize_mac(value: Optional[str]) -> str:
+    return _MAC_SEPARATORS.sub("", value or "").lower()
+
+
+def _client_entry(client: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    mac = normalize_mac(client.get("macAddress") or client.get("mac"))
+    if not mac:
+        return None
+    hostname = client.get("hostName") or client.get("name") or ""
+    ssid = client.get("wirelessNetworkName") or client.get("ssid") or ""
+    return {
+        "mac": mac,
+        "hostname": hostname,
+        "hostname_lc": hostname.lower(),
+        "ip": (client.get("ipAddress") or client.get("ip") or "").lower(),
+        "ssid": ssid,
+        "ssid_lc": ssid.lower(),
+        "client_type": client.get("clientType"),
+    }
+
+
+async def index_site_clients(site_id: str, clients: List[Dict[str, Any]], seen_at: datetime) -> int:
+    """Upsert every client currently connected to a site; returns the number indexed."""
+    expire_at = seen_at + timedelta(hours=CLIENT_INDEX_RETENTION_HOURS)
+    ops = []
+    for client in clients:
+        entry = _client_entry(client)
+        if entry is None:
+            continue
+        ops.append(UpdateOne(
+            {"mac": entry["mac"], "site_id": site_id},
+            {"$set": {**entry, "last_seen": seen_at, "expire_at": expire_at}},
+            upsert=True,
+        ))
+    if ops:
+        db = get_database()
+        await db.client_index.bulk_write(ops, ordered=False)
+    return len(ops)
+
+
+def _prefix_clauses(q: str, field: Optional[str]) -> List[Dict[str, Any]]:
+    q = q.strip()
+    lowered = q.lower()
+    clauses = {
+        "mac": {"mac": {"$regex": f"^{re.escape(normalize_mac(q))}"}} if normalize_mac(q) else None,
+        "hostname": {"hostname_lc": {"$regex": f"^{re.escape(lowered)}"}},
+        "ip": {"ip": {"$regex": f"^{re.escape(lowered)}"}} if _IP_PREFIX.match(lowered) else None,
+        "ssid": {"ssid_lc": {"$regex": f"^{re.escape(lowered)}"}},
+    }
+    if field:
+        return [clauses[field]] if clauses[field] else []
+    return [c for c in clauses.values() if c]
+
+
+async def search_clients(
+    q: str,
+    field: Optional[str] = None,
+    site_ids: Optional[Set[str]] = None,
+    limit: int = 50,
+) -> List[Dict[str, Any]]:
+    """Prefix search across MAC / hostname / IP / SSID (or one `field`), most recently seen first.
+
+    site_ids restricts the result to the caller's visible sites (None = all).
+    Each field is queried on its own through its (field, last_seen) index for its
+    `limit` most recently seen matches (a top-N sort over index keys); the
+    per-field hits are then merged and cut to the overall `limit` most recent.
+    """
+    clauses = _prefix_clauses(q, field)
+    if not clauses:
+        return []
+
+    db = get_database()
+    projection = {"_id": 0, "hostname_lc": 0, "ssid_lc": 0, "expire_at": 0}
+
+    async def _find(clause: Dict[str, Any]) -> List[Dict[str, Any]]:
+        query = dict(clause)
+        if site_ids is not None:
+            query["site_id"] = {"$in": list(site_ids)}
+        cursor = db.client_index.find(query, projection).sort("last_seen", -1).limit(limit)
+        return [doc async for doc in cursor]
+
+    merged: Dict[tuple, Dict[str, Any]] = {}
+    for docs in await asyncio.gather(*(_find(c) for c in clauses)):
+        for doc in docs:
+            merged[(doc["mac"], doc["site_id"])] = doc
+    return sorted(merged.values(), key=lambda d: d["last_seen"], reverse=True)[:limit]
@@ -3,12 +3,25 @@
 Collections:
   - users        — identity + internal app role
   - audit_logs   — 90-day TTL audit trail
+  - audit_rollups — hourly/daily audit activity counters, maintained by the audit sink
   - zones        — zone/group definitions with site assignments and members
   - tenants      — customer/company records with assigned tenant_admin
   - master_config — singleton Aruba master account config + token cache
+  - bodies       — content-addressed, zlib-compressed capture bodies (raw_logs/endpoints hold refs)
+  - raw_logs     — captured traffic, TTL-expired via per-document expire_at
+  - endpoints    — one document per captured API endpoint, TTL on last_seen_at
+  - endpoint_history — daily per-endpoint stats, updated on ingest (long-range trends)
+  - captured_sites — Aruba sites seen in captured traffic, maintained at ingest
+  - endpoint_stats — hourly per-endpoint latency sketch / status counts, updated on ingest
+  - site_snapshots — per-site state (site entry, health/alerts/..., devices) from the snapshot collector
+  - site_health_series — bucketed health score / alert counter history (raw, 5m, 1h)
+  - fleet_alerts — fleet-wide alerts deduplicated by fingerprint, with open/closed lifecycle
+  - client_index — cross-site connected-client search index (MAC / hostname / IP / SSID), TTL on expire_at
+  - device_changes — device inventory change log (diff of consecutive device snapshots), TTL on expire_at
 """
 from motor.motor_asyncio import AsyncIOMotorClient
-from app.config import MONGODB_URL, DATABASE_NAME
+from pymongo.errors import OperationFailure
+from app.config import MONGODB_URL, DATABASE_NAME, ENDPOINT_RETENTION_DAYS
 
 client: AsyncIOMotorClient = None
 db = None
@@ -27,6 +40,14 @@ async def connect_to_mongo():
     # === Core collections ===
     await db.users.create_index("email", unique=True)
     await db.audit_logs.create_index("timestamp", expireAfterSeconds=7776000)
+    await db.audit_logs.create_index([("actor", 1), ("timestamp", -1)])
+    await db.audit_logs.create_index([("zone_id", 1), ("timestamp", -1)])
+    await db.audit_logs.create_index([("site_id", 1), ("timestamp", -1)])
+    await db.audit_rollups.create_index(
+        [("granularity", 1), ("bucket", 1), ("action", 1), ("zone_id", 1), ("site_id", 1), ("actor", 1), ("status", 1)],
+        unique=True,
+    )
+    await db.audit_rollups.create_index("expire_at", expireAfterSeconds=0)
 
     # === Zone management collections ===
     await db.zones.create_index("name", unique=True)
@@ -40,6 +61,82 @@ async def connect_to_mongo():
     # === Master account config (singleton) ===
     await db.master_config.create_index("is_active")
 
+    # === Capture store (raw_logs / endpoints / bodies) ===
+    await db.raw_logs.create_index([("timestamp", -1)])
+    await db.raw_logs.create_index([("domain", 1), ("timestamp", -1)])
+    await db.raw_logs.create_index("expire_at", expireAfterSeconds=0)
+    # Captured-config lookup (cloner.fetch_site_config), covered: only tagged logs are indexed
+    await _drop_stale_index(db.raw_logs, "site_id_1_resource_kind_1_timestamp_-1")
+    await db.raw_logs.create_index(
+        [("site_id", 1), ("resource_kind", 1), ("method", 1), ("status_code", 1),
+         ("timestamp", -1), ("response_body_ref", 1)],
+        name="site_config_lookup",
+        partialFilterExpression={"resource_kind": {"$exists": True}},
+    )
+    await db.raw_logs.create_index("request_body_ref")
+    await db.raw_logs.create_index("response_body_ref")
+    await db.bodies.create_index("expire_at", expireAfterSeconds=0)
+    await db.endpoints.create_index("api_key")
+    await db.endpoints.create_index("request_body_sample_ref")
+    await db.endpoints.create_index("response_body_sample_ref")
+    await _ensure_ttl_index(db.endpoints, "last_seen_at", ENDPOINT_RETENTION_DAYS * 86400)
+    await db.endpoint_history.create_index(
+        [("domain", 1), ("method", 1), ("path", 1), ("day", -1)], unique=True
+    )
+    await db.captured_sites.create_index([("captured_at", -1)])
+    await db.endpoint_stats.create_index(
+        [("domain", 1), ("method", 1), ("path", 1), ("hour", -1)], unique=True
+    )
+    await db.endpoint_stats.create_index([("hour", -1)])
+    await db.endpoint_stats.create_index("expire_at", expireAfterSeconds=0)
+
+    # === Site health history (health score / alert counter buckets) ===
+    await db.site_health_series.create_index([("site_id", 1), ("res", 1), ("start", 1)], unique=True)
+    await db.site_health_series.create_index("expire_at", expireAfterSeconds=0)
+
+    # === Fleet alerts (deduplicated, open/closed lifecycle) ===
+    await db.fleet_alerts.create_index([("state", 1), ("opened_at", -1), ("_id", -1)])
+    await db.fleet_alerts.create_index([("site_id", 1), ("state", 1), ("opened_at", -1)])
+
+    # === Client search index ===
+    await db.client_index.create_index([("mac", 1), ("site_id", 1)], unique=True)
+    # (search field, last_seen): prefix match plus most-recent-first top-N per field
+    for search_field in ("mac", "hostname_lc", "ip", "ssid_lc"):
+        if search_field != "mac":
+            await _drop_stale_index(db.client_index, f"{search_field}_1")
+        await db.client_index.create_index([(search_field, 1), ("last_seen", -1)])
+    await db.client_index.create_index("expire_at", expireAfterSeconds=0)
+
+    # === Device change log ===
+    await db.device_changes.create_index([("site_id", 1), ("timestamp", -1)])
+    await db.device_changes.create_index("expire_at", expireAfterSeconds=0)
+
+
+async def _ensure_ttl_index(collection, field: str, expire_after_seconds: int):
+    """Create, retune (collMod) or drop a TTL index so it follows configuration."""
+    name = f"{field}_ttl"
+    if expire_after_seconds <= 0:
+        try:
+            await collection.drop_index(name)
+        except OperationFailure:
+            pass
+        return
+    try:
+        await collection.create_index(field, name=name, expireAfterSeconds=expire_after_seconds)
+    except OperationFailure:
+        await collection.database.command(
+            "collMod", collection.name,
+            index={"name": name, "expireAfterSeconds": expire_after_seconds},
+        )
+
+
+async def _drop_stale_index(collection, name: str):
+    """Drop an index replaced by a newer definition (no-op once it is gone)."""
+    try:
+        await collection.drop_index(name)
+    except OperationFailure:
+        pass
+
 
 async def close_mongo_connection():
     """Close MongoDB connection."""
@@ -1,8 +1,30 @@
 """CRUD operations with advanced filtering, full-text search, and auth management."""
 import json
-from datetime import datetime, timezone
+import time
+from datetime import datetime, timezone, timedelta
 from typing import Optional, List, Dict, Any
+from bson import ObjectId
+from pymongo import InsertOne, UpdateOne
+from pymongo.errors import BulkWriteError
+from app.config import (
+    ENDPOINT_RETENTION_DAYS,
+    ENDPOINT_SAMPLE_MAX_DAYS,
+    RAW_LOG_RETENTION_DAYS,
+    RAW_LOG_RETENTION_OVERRIDES,
+)
 from app.database.connection import get_database
+from app.database.bodies_crud import store_body, extend_body_expiry, hydrate_docs, hydrate_stream, clear_bodies
+from app.database.captured_sites_crud import clear_captured_sites
+from app.database.endpoint_stats_crud import clear_endpoint_stats
+
+# Log listing totals: "exact" counts are cached per filter signature for a short
+# window; "estimated" uses collection metadata or a capped count.
+LOG_COUNT_MODES = ("exact", "estimated", "none")
+LOG_COUNT_CACHE_TTL_SECONDS = 15
+LOG_COUNT_CACHE_MAX_ENTRIES = 256
+LOG_COUNT_ESTIMATE_CAP = 10000
+
+_log_count_cache: Dict[str, tuple] = {}  # filter signature -> (expires_at, total)
 
 
 # ===== URL Normalization Helpers =====
@@ -34,6 +56,23 @@ def _body_to_text(body: Any) -> str:
     return str(body)[:5000]
 
 
+def raw_log_expire_at(domain: str, timestamp: datetime) -> datetime:
+    """Expiry for a raw log: timestamp + retention (per-domain override or default)."""
+    days = RAW_LOG_RETENTION_OVERRIDES.get(domain, RAW_LOG_RETENTION_DAYS)
+    return timestamp + timedelta(days=days)
+
+
+def endpoint_sample_expire_at(now: Optional[datetime] = None) -> datetime:
+    """Expiry for a body kept as an endpoint sample: as long as the endpoint itself.
+
+    Endpoints expire ENDPOINT_RETENTION_DAYS after last_seen_at, and every sighting
+    replaces the sample, so the sample body must live that long. Endpoints kept
+    forever (0) still get a finite bound, ENDPOINT_SAMPLE_MAX_DAYS.
+    """
+    days = ENDPOINT_RETENTION_DAYS if ENDPOINT_RETENTION_DAYS > 0 else ENDPOINT_SAMPLE_MAX_DAYS
+    return (now or datetime.now(timezone.utc)) + timedelta(days=days)
+
+
 # ===== ENDPOINT CRUD =====
 
 async def upsert_endpoint(
@@ -44,86 +83,159 @@ async def upsert_endpoint(
     request_headers: Dict[str, str],
     cookies_str: str = "",
     query_params: Dict[str, str] = None,
-    request_body: Any = None,
-    response_body: Any = None,
+    request_body_ref: Optional[str] = None,
+    response_body_ref: Optional[str] = None,
     status_code: int = 200,
     content_type: str = "application/json",
     duration_ms: int = 0,
     mandatory_headers: Any = None,
     execution_context: str = "DATA_FETCH",
     dependencies: List[str] = None,
+    sample_path: Optional[str] = None,
 ) -> str:
-    """Create or update an endpoint document with smart merging."""
+    """Create or update an endpoint document with smart merging.
+
+    `path` is the templated path (e.g. /api/sites/{id}/devices); `sample_path`
+    keeps the latest concrete path seen for it.
+
+    Body samples are kept as references into the content-addressed `bodies`
+    collection (see bodies_crud.store_body), not as inline copies; the bodies that
+    become an endpoint's sample get their expiry extended to endpoint_sample_expire_at().
+    """
+    return (await upsert_endpoints([{
+        "api_key": api_key,
+        "domain": domain,
+        "path": path,
+        "method": method,
+        "request_headers": request_headers,
+        "cookies_str": cookies_str,
+        "query_params": query_params,
+        "request_body_ref": request_body_ref,
+        "response_body_ref": response_body_ref,
+        "status_code": status_code,
+        "content_type": content_type,
+        "mandatory_headers": mandatory_headers,
+        "execution_context": execution_context,
+        "dependencies": dependencies,
+        "sample_path": sample_path,
+    }]))[0]
+
+
+def _new_endpoint_doc(c: Dict[str, Any], headers, cookies, mh_dict, now: datetime) -> dict:
+    return {
+        "_id": ObjectId(),
+        "api_key": c["api_key"],
+        "domain": c["domain"],
+        "path": c["path"],
+        "sample_path": c.get("sample_path") or c["path"],
+        "method": c["method"],
+        "request_headers": headers,
+        "cookies": cookies,
+        "query_params": c.get("query_params") or {},
+        "request_body_sample_ref": c.get("request_body_ref"),
+        "response_body_sample_ref": c.get("response_body_ref"),
+        "status_codes": [c["status_code"]] if c.get("status_code") else [],
+        "content_type": c.get("content_type", "application/json"),
+        "request_count": 1,
+        "first_seen_at": now,
+        "last_seen_at": now,
+        "execution_context": c.get("execution_context", "DATA_FETCH"),
+        "mandatory_headers_sample": mh_dict,
+        "dependencies": c.get("dependencies") or [],
+    }
+
+
+async def upsert_endpoints(captures: List[Dict[str, Any]]) -> List[str]:
+    """Batch form of upsert_endpoint: one dict of its kwargs per capture, ids out in order.
+
+    Existing endpoints are read with one query; captures of the same endpoint are
+    merged in order in memory, then everything is written with one bulk_write.
+    Only the bodies that end up as an endpoint's sample outlive their raw logs.
+    """
     db = get_database()
     now = datetime.now(timezone.utc)
-    headers = {k.lower(): v for k, v in request_headers.items()}
-    parsed_cookies = _parse_cookies(cookies_str)
-    qp = query_params or {}
-    deps = dependencies or []
-    
-    # Convert Pydantic model to dict if needed
-    mh_dict = mandatory_headers.dict() if hasattr(mandatory_headers, "dict") else mandatory_headers
-
-    existing = await db.endpoints.find_one({"api_key": api_key})
+    api_keys = list({c["api_key"] for c in captures})
+    existing = {doc["api_key"]: doc async for doc in db.endpoints.find({"api_key": {"$in": api_keys}})}
+
+    merged: Dict[str, Dict[str, Any]] = {}  # api_key -> {doc, new, count, status_codes, set_refs}
+    ids = []
+    for c in captures:
+        headers = {k.lower(): v for k, v in (c.get("request_headers") or {}).items()}
+        parsed_cookies = _parse_cookies(c.get("cookies_str", ""))
+        mandatory_headers = c.get("mandatory_headers")
+        # Convert Pydantic model to dict if needed
+        mh_dict = mandatory_headers.dict() if hasattr(mandatory_headers, "dict") else mandatory_headers
+
+        state = merged.get(c["api_key"])
+        if state is None and c["api_key"] not in existing:
+            # CREATE NEW
+            state = merged[c["api_key"]] = {
+                "doc": _new_endpoint_doc(c, headers, parsed_cookies, mh_dict, now), "new": True,
+            }
+            ids.append(str(state["doc"]["_id"]))
+            continue
+        if state is None:
+            state = merged[c["api_key"]] = {
+                "doc": existing[c["api_key"]], "new": False, "count": 0, "status_codes": [], "set_refs": set(),
+            }
 
-    if existing:
         # MERGE UPDATE
-        merged_qp = {**existing.get("query_params", {}), **qp}
-        merged_cookies = {**existing.get("cookies", {}), **parsed_cookies}
-        merged_headers = {**existing.get("request_headers", {}), **headers}
-
-        update_doc = {
-            "$set": {
-                "request_headers": merged_headers,
-                "cookies": merged_cookies,
-                "query_params": merged_qp,
-                "content_type": content_type,
-                "last_seen_at": now,
-                "execution_context": execution_context,
-                "mandatory_headers_sample": mh_dict,
-                "dependencies": list(set(existing.get("dependencies", []) + deps))
-            },
-            "$inc": {"request_count": 1},
-        }
-
-        if status_code and status_code not in existing.get("status_codes", []):
-            update_doc["$addToSet"] = {"status_codes": status_code}
-
-        if request_body is not None:
-            update_doc["$set"]["request_body_sample"] = request_body
-        if response_body is not None:
-            update_doc["$set"]["response_body_sample"] = response_body
-
-        await db.endpoints.update_one({"_id": existing["_id"]}, update_doc)
-        return str(existing["_id"])
-    else:
-        # CREATE NEW
-        new_doc = {
-            "api_key": api_key,
-            "domain": domain,
-            "path": path,
-            "method": method,
-            "request_headers": headers,
-            "cookies": parsed_cookies,
-            "query_params": qp,
-            "request_body_sample": request_body,
-            "response_body_sample": response_body,
-            "status_codes": [status_code] if status_code else [],
-            "content_type": content_type,
-            "request_count": 1,
-            "first_seen_at": now,
-            "last_seen_at": now,
-            "execution_context": execution_context,
-            "mandatory_headers_sample": mh_dict,
-            "dependencies": deps,
+        doc = state["doc"]
+        doc["request_headers"] = {**doc.get("request_headers", {}), **headers}
+        doc["cookies"] = {**doc.get("cookies", {}), **parsed_cookies}
+        doc["query_params"] = {**doc.get("query_params", {}), **(c.get("query_params") or {})}
+        doc["content_type"] = c.get("content_type", "application/json")
+        doc["last_seen_at"] = now
+        doc["execution_context"] = c.get("execution_context", "DATA_FETCH")
+        doc["mandatory_headers_sample"] = mh_dict
+        doc["dependencies"] = list(set(doc.get("dependencies", []) + (c.get("dependencies") or [])))
+        doc["sample_path"] = c.get("sample_path") or c["path"]
+        status_code = c.get("status_code")
+        if status_code and status_code not in doc.setdefault("status_codes", []):
+            doc["status_codes"].append(status_code)
+            if not state["new"]:
+                state["status_codes"].append(status_code)
+        for ref_field, sample_field in (("request_body_ref", "request_body_sample_ref"),
+                                        ("response_body_ref", "response_body_sample_ref")):
+            if c.get(ref_field) is not None:
+                doc[sample_field] = c[ref_field]
+                if not state["new"]:
+                    state["set_refs"].add(sample_field)
+        if state["new"]:
+            doc["request_count"] += 1
+        else:
+            state["count"] += 1
+        ids.append(str(doc["_id"]))
+
+    ops = []
+    sample_refs = set()
+    for state in merged.values():
+        doc = state["doc"]
+        if state["new"]:
+            ops.append(InsertOne(doc))
+            sample_refs.update(doc[f] for f in ("request_body_sample_ref", "response_body_sample_ref") if doc[f])
+            continue
+        sample_refs.update(doc[f] for f in state["set_refs"])
+        fields = (
+            "request_headers", "cookies", "query_params", "content_type", "last_seen_at",
+            "execution_context", "mandatory_headers_sample", "dependencies", "sample_path",
+        ) + tuple(state["set_refs"])
+        update_doc: Dict[str, Any] = {
+            "$set": {f: doc[f] for f in fields},
+            "$inc": {"request_count": state["count"]},
         }
-        result = await db.endpoints.insert_one(new_doc)
-        return str(result.inserted_id)
+        if state["status_codes"]:
+            update_doc["$addToSet"] = {"status_codes": {"$each": state["status_codes"]}}
+        ops.append(UpdateOne({"_id": doc["_id"]}, update_doc))
+    if ops:
+        await db.endpoints.bulk_write(ops, ordered=False)
+    await extend_body_expiry(sample_refs, endpoint_sample_expire_at(now))
+    return ids
 
 
 # ===== RAW LOG CRUD =====
 
-async def insert_raw_log(
+def build_raw_log(
     url: str,
     method: str,
     domain: str,
@@ -138,11 +250,15 @@ async def insert_raw_log(
     query_params: Dict[str, str] = None,
     mandatory_headers: Any = None,
     execution_context: str = "DATA_FETCH",
-) -> str:
-    """Insert a raw request/response log for full-text search."""
-    db = get_database()
-    now = datetime.now(timezone.utc)
-    
+    request_body_ref: Optional[str] = None,
+    response_body_ref: Optional[str] = None,
+    path_template: Optional[str] = None,
+    site_id: Optional[str] = None,
+    resource_kind: Optional[str] = None,
+    timestamp: Optional[datetime] = None,
+) -> dict:
+    """Build a raw log document (bodies already stored; pass their refs)."""
+    now = timestamp or datetime.now(timezone.utc)
     mh_dict = mandatory_headers.dict() if hasattr(mandatory_headers, "dict") else mandatory_headers
 
     doc = {
@@ -150,12 +266,13 @@ async def insert_raw_log(
         "method": method.upper(),
         "domain": domain,
         "path": path,
+        "path_template": path_template or path,
         "request_headers": request_headers,
-        "request_body": request_body,
+        "request_body_ref": request_body_ref,
         "request_body_text": _body_to_text(request_body),
         "status_code": status_code,
         "response_headers": response_headers or {},
-        "response_body": response_body,
+        "response_body_ref": response_body_ref,
         "response_body_text": _body_to_text(response_body),
         "duration_ms": duration_ms,
         "cookies": cookies,
@@ -163,20 +280,68 @@ async def insert_raw_log(
         "mandatory_headers": mh_dict,
         "execution_context": execution_context,
         "timestamp": now,
+        "expire_at": raw_log_expire_at(domain, now),
     }
+    if site_id:
+        doc["site_id"] = site_id
+        doc["resource_kind"] = resource_kind
+    return doc
+
 
-    result = await db.raw_logs.insert_one(doc)
+async def insert_raw_log(**fields) -> str:
+    """Insert a raw request/response log for full-text search.
+
+    Takes build_raw_log's arguments. Full bodies live in the `bodies` collection;
+    the log keeps their references (pass refs already obtained from store_body to
+    avoid hashing twice) plus the truncated *_body_text snippets that keyword
+    search runs against. site_id / resource_kind are only stored for site-scoped
+    requests. `timestamp` backdates imported traffic; it defaults to now.
+    """
+    db = get_database()
+    now = fields.get("timestamp") or datetime.now(timezone.utc)
+    expire_at = raw_log_expire_at(fields["domain"], now)
+    if fields.get("request_body_ref") is None:
+        fields["request_body_ref"] = await store_body(fields.get("request_body"), expire_at)
+    if fields.get("response_body_ref") is None:
+        fields["response_body_ref"] = await store_body(fields.get("response_body"), expire_at)
+
+    result = await db.raw_logs.insert_one(build_raw_log(**fields))
     return str(result.inserted_id)
 
 
+async def insert_raw_logs(docs: List[dict]) -> List[Optional[str]]:
+    """Insert built raw logs with one insert_many; ids in order, None for a rejected document."""
+    if not docs:
+        return []
+    db = get_database()
+    for doc in docs:
+        doc.setdefault("_id", ObjectId())
+    failed = set()
+    try:
+        await db.raw_logs.insert_many(docs, ordered=False)
+    except BulkWriteError as e:
+        failed = {err["index"] for err in e.details.get("writeErrors", [])}
+        for err in e.details.get("writeErrors", [])[:3]:
+            print(f"[BATCH ERROR] Raw log rejected: {err.get('errmsg')}")
+    return [None if i in failed else str(doc["_id"]) for i, doc in enumerate(docs)]
+
+
+_LOG_BODY_FIELDS = {"request_body_ref": "request_body", "response_body_ref": "response_body"}
+_ENDPOINT_BODY_FIELDS = {
+    "request_body_sample_ref": "request_body_sample",
+    "response_body_sample_ref": "response_body_sample",
+}
+
+
 async def get_log_by_id(log_id: str) -> Optional[dict]:
-    """Retrieve a single raw log by ID."""
+    """Retrieve a single raw log by ID, with bodies decompressed."""
     from bson import ObjectId
     db = get_database()
     try:
         doc = await db.raw_logs.find_one({"_id": ObjectId(log_id)})
         if doc:
             doc["_id"] = str(doc["_id"])
+            await hydrate_docs([doc], _LOG_BODY_FIELDS)
         return doc
     except Exception:
         return None
@@ -184,7 +349,52 @@ async def get_log_by_id(log_id: str) -> Optional[dict]:
 
 # ===== SEARCH & FILTER =====
 
-async def search_logs(
+def _count_cache_key(query: dict) -> str:
+    """Stable signature for a raw_logs filter (datetimes/ObjectIds via str)."""
+    return json.dumps(query, sort_keys=True, default=str)
+
+
+def invalidate_log_count_cache():
+    """Drop all cached log totals (called after bulk deletes)."""
+    _log_count_cache.clear()
+
+
+async def _count_logs(query: dict, count: str) -> Optional[int]:
+    """Count raw_logs matching query according to the requested count mode.
+
+    - exact:     count_documents, cached for LOG_COUNT_CACHE_TTL_SECONDS per filter
+    - estimated: collection metadata when unfiltered, otherwise a count capped
+                 at LOG_COUNT_ESTIMATE_CAP (a result equal to the cap means "at least")
+    - none:      no count at all, returns None
+    """
+    db = get_database()
+
+    if count == "none":
+        return None
+
+    if count == "estimated":
+        if not query:
+            return await db.raw_logs.estimated_document_count()
+        return await db.raw_logs.count_documents(query, limit=LOG_COUNT_ESTIMATE_CAP)
+
+    key = _count_cache_key(query)
+    now = time.monotonic()
+    cached = _log_count_cache.get(key)
+    if cached and cached[0] > now:
+        return cached[1]
+
+    total = await db.raw_logs.count_documents(query)
+    if len(_log_count_cache) >= LOG_COUNT_CACHE_MAX_ENTRIES:
+        # Evict expired entries first, then the oldest insertion
+        for k in [k for k, v in _log_count_cache.items() if v[0] <= now]:
+            del _log_count_cache[k]
+        if len(_log_count_cache) >= LOG_COUNT_CACHE_MAX_ENTRIES:
+            del _log_count_cache[next(iter(_log_count_cache))]
+    _log_count_cache[key] = (now + LOG_COUNT_CACHE_TTL_SECONDS, total)
+    return total
+
+
+def _build_log_query(
     keyword: Optional[str] = None,
     method: Optional[List[str]] = None,
     status_code: Optional[List[int]] = None,
@@ -192,19 +402,8 @@ async def search_logs(
     from_date: Optional[datetime] = None,
     to_date: Optional[datetime] = None,
     log_ids: Optional[List[str]] = None,
-    skip: int = 0,
-    limit: int = 50,
-) -> tuple[List[dict], int]:
-    """Search raw_logs with advanced filtering.
-    
-    - keyword: searches across url, request_body_text, response_body_text
-    - method: filter by HTTP methods (e.g. ["GET", "POST"])
-    - status_code: filter by status codes (e.g. [200, 401])
-    - domain: filter by domain
-    - from_date: logs after this timestamp
-    - to_date: logs before this timestamp
-    """
-    db = get_database()
+) -> dict:
+    """Build the raw_logs filter shared by search_logs and iter_logs."""
     query = {}
 
     if domain:
@@ -244,7 +443,35 @@ async def search_logs(
             {"path": regex}
         ]
 
-    total = await db.raw_logs.count_documents(query)
+    return query
+
+
+async def search_logs(
+    keyword: Optional[str] = None,
+    method: Optional[List[str]] = None,
+    status_code: Optional[List[int]] = None,
+    domain: Optional[str] = None,
+    from_date: Optional[datetime] = None,
+    to_date: Optional[datetime] = None,
+    log_ids: Optional[List[str]] = None,
+    skip: int = 0,
+    limit: int = 50,
+    count: str = "exact",
+) -> tuple[List[dict], Optional[int]]:
+    """Search raw_logs with advanced filtering.
+    
+    - keyword: searches across url, request_body_text, response_body_text
+    - method: filter by HTTP methods (e.g. ["GET", "POST"])
+    - status_code: filter by status codes (e.g. [200, 401])
+    - domain: filter by domain
+    - from_date: logs after this timestamp
+    - to_date: logs before this timestamp
+    - count: "exact" | "estimated" | "none" — how the total is computed (see _count_logs)
+    """
+    db = get_database()
+    query = _build_log_query(keyword, method, status_code, domain, from_date, to_date, log_ids)
+
+    total = await _count_logs(query, count)
     cursor = (
         db.raw_logs.find(query, {"request_body_text": 0, "response_body_text": 0})
         .sort("timestamp", -1)
@@ -258,6 +485,41 @@ async def search_logs(
     return logs, total
 
 
+async def iter_logs(
+    keyword: Optional[str] = None,
+    method: Optional[List[str]] = None,
+    status_code: Optional[List[int]] = None,
+    domain: Optional[str] = None,
+    from_date: Optional[datetime] = None,
+    to_date: Optional[datetime] = None,
+    log_ids: Optional[List[str]] = None,
+    skip: int = 0,
+    limit: Optional[int] = None,
+    batch_size: int = 200,
+):
+    """Stream raw_logs matching the search filters straight from a cursor.
+
+    Same filters as search_logs, but documents are yielded one at a time so
+    exports never hold the full result set in memory. limit=None means no cap.
+    Bodies are hydrated per batch_size chunk with a single `bodies` lookup.
+    """
+    db = get_database()
+    query = _build_log_query(keyword, method, status_code, domain, from_date, to_date, log_ids)
+
+    cursor = (
+        db.raw_logs.find(query, {"request_body_text": 0, "response_body_text": 0})
+        .sort("timestamp", -1)
+        .skip(skip)
+        .batch_size(batch_size)
+    )
+    if limit:
+        cursor = cursor.limit(limit)
+
+    async for log in hydrate_stream(cursor, _LOG_BODY_FIELDS, chunk_size=batch_size):
+        log["_id"] = str(log["_id"])
+        yield log
+
+
 async def get_all_endpoints(
     domain: Optional[str] = None,
     method: Optional[List[str]] = None,
@@ -289,9 +551,36 @@ async def get_all_endpoints(
     endpoints = await cursor.to_list(length=limit)
     for ep in endpoints:
         ep["_id"] = str(ep["_id"])
+    await hydrate_docs(endpoints, _ENDPOINT_BODY_FIELDS)
     return endpoints, total
 
 
+async def get_endpoint_history(
+    domain: Optional[str] = None,
+    method: Optional[str] = None,
+    path: Optional[str] = None,
+    days: int = 30,
+    limit: int = 1000,
+) -> List[dict]:
+    """Daily per-endpoint stats (maintained on ingest, outlive the raw logs)."""
+    db = get_database()
+    query: Dict[str, Any] = {"day": {"$gte": datetime.now(timezone.utc) - timedelta(days=days)}}
+    if domain:
+        query["domain"] = domain
+    if method:
+        query["method"] = method.upper()
+    if path:
+        query["path"] = path
+
+    cursor = db.endpoint_history.find(query).sort("day", -1).limit(limit)
+    history = await cursor.to_list(length=limit)
+    for h in history:
+        h["_id"] = str(h["_id"])
+        count = h.get("count") or 0
+        h["avg_duration_ms"] = round(h.get("duration_total_ms", 0) / count, 1) if count else 0
+    return history
+
+
 async def get_domains() -> List[str]:
     """Get list of unique captured domains."""
     db = get_database()
@@ -305,9 +594,16 @@ async def clear_all_data() -> dict:
     log_count = (await db.raw_logs.delete_many({})).deleted_count
     auth_count = (await db.auth_sessions.delete_many({})).deleted_count
     bp_count = (await db.auth_blueprints.delete_many({})).deleted_count
+    body_count = await clear_bodies()
+    site_count = await clear_captured_sites()
+    stats_count = await clear_endpoint_stats()
+    invalidate_log_count_cache()
     return {
         "endpoints_deleted": ep_count,
         "logs_deleted": log_count,
+        "bodies_deleted": body_count,
+        "captured_sites_deleted": site_count,
+        "endpoint_stats_deleted": stats_count,
         "auth_sessions_deleted": auth_count,
         "auth_blueprints_deleted": bp_count,
     }
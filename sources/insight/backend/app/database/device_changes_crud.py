@@ -0,0 +1,99 @@
+"""MongoDB CRUD for the device_changes collection.
+
+Device inventory change log, written by the snapshot collector. Each collection
+pass diffs a site's freshly normalized device list against the list it replaces
+in site_snapshots (the previous pass), so only consecutive snapshots are ever
+compared — history is never rescanned. One compact document per change:
+
+  {site_id, timestamp, device_id, device_name, serial_number,
+   change: "added" | "removed" | "status" | "firmware" | "reboot",
+   old, new, expire_at}
+
+"reboot" is an uptime reset (uptime lower than on the previous pass). Events
+expire DEVICE_CHANGE_RETENTION_DAYS after they were recorded.
+"""
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Set
+from app.config import DEVICE_CHANGE_RETENTION_DAYS
+from .connection import get_database
+
+DEVICE_CHANGE_TYPES = ("added", "removed", "status", "firmware", "reboot")
+
+
+def _device_key(device: Dict[str, Any]) -> str:
+    return device.get("serial_number") or device.get("mac_address") or device.get("id") or ""
+
+
+def diff_devices(previous: List[Dict[str, Any]], current: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Changes between two normalized device lists of the same site, as (unstamped) events."""
+    before = {_device_key(d): d for d in previous}
+    after = {_device_key(d): d for d in current}
+    changes = []
+
+    def event(device: Dict[str, Any], change: str, old: Any = None, new: Any = None) -> Dict[str, Any]:
+        return {
+            "device_id": device.get("id"),
+            "device_name": device.get("name"),
+            "serial_number": device.get("serial_number"),
+            "change": change,
+            "old": old,
+            "new": new,
+        }
+
+    for key, device in after.items():
+        old = before.get(key)
+        if old is None:
+            changes.append(event(device, "added", new=device.get("status")))
+            continue
+        if old.get("status") != device.get("status"):
+            changes.append(event(device, "status", old.get("status"), device.get("status")))
+        if old.get("firmware_version") and device.get("firmware_version") \
+                and old["firmware_version"] != device["firmware_version"]:
+            changes.append(event(device, "firmware", old["firmware_version"], device["firmware_version"]))
+        if (old.get("uptime_seconds") or 0) > (device.get("uptime_seconds") or 0) > 0:
+            changes.append(event(device, "reboot", old.get("uptime_seconds"), device.get("uptime_seconds")))
+    for key, device in before.items():
+        if key not in after:
+            changes.append(event(device, "removed", old=device.get("status")))
+    return changes
+
+
+async def record_device_changes(
+    site_id: str,
+    previous: Optional[List[Dict[str, Any]]],
+    current: List[Dict[str, Any]],
+    timestamp: datetime,
+) -> int:
+    """Store the changes between a site's previous and current device lists; returns how many.
+
+    previous=None means the site has no earlier snapshot: the current list is
+    the baseline and nothing is recorded.
+    """
+    if previous is None:
+        return 0
+    changes = diff_devices(previous, current)
+    if changes:
+        expire_at = timestamp + timedelta(days=DEVICE_CHANGE_RETENTION_DAYS)
+        db = get_database()
+        await db.device_changes.insert_many([
+            {"site_id": site_id, "timestamp": timestamp, **c, "expire_at": expire_at} for c in changes
+        ])
+    return len(changes)
+
+
+async def list_device_changes(
+    site_ids: Optional[Set[str]],
+    since: datetime,
+    changes: Optional[List[str]] = None,
+    limit: int = 500,
+) -> List[Dict[str, Any]]:
+    """Changes recorded since `since` on `site_ids` (None = all sites), newest first."""
+    query: Dict[str, Any] = {"timestamp": {"$gte": since}}
+    if site_ids is not None:
+        query["site_id"] = {"$in": list(site_ids)}
+    if changes:
+        query["change"] = {"$in": changes}
+
+    db = get_database()
+    cursor = db.device_changes.find(query, {"_id": 0, "expire_at": 0}).sort("timestamp", -1).limit(limit)
+    return [doc async for doc in cursor]
@@ -0,0 +1,247 @@
+"""MongoDB CRUD for the per-endpoint rollups: endpoint_stats and endpoint_history.
+
+Both are maintained incrementally on ingest from the same samples, pre-aggregated
+per bucket and written with one bulk_write per collection (concurrently):
+
+  endpoint_stats   — hourly, one document per (domain, method, templated path, hour):
+    count, error_count, duration_total_ms, duration_max_ms
+    status_counts.<code>   — responses per status code
+    latency.<bucket>       — latency sketch counters (see shared.latency_sketch)
+    expire_at              — TTL, ENDPOINT_STATS_RETENTION_DAYS after the hour
+
+  endpoint_history — daily, one document per (domain, method, templated path, day),
+    the same counters without the latency sketch plus first_seen_at / last_seen_at;
+    kept for long-range trends after the hourly documents and raw logs expire.
+"""
+import asyncio
+from datetime import datetime, timezone, timedelta
+from typing import Any, Dict, List, Optional
+from pymongo import UpdateOne
+from app.config import ENDPOINT_STATS_RETENTION_DAYS
+from app.database.connection import get_database
+from app.shared import latency_sketch
+
+QUANTILES = {"p50": 0.5, "p95": 0.95, "p99": 0.99}
+
+
+def _hour(ts: datetime) -> datetime:
+    return ts.replace(minute=0, second=0, microsecond=0)
+
+
+def _day(ts: datetime) -> datetime:
+    return ts.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+async def record_endpoint_sample(
+    domain: str,
+    method: str,
+    path: str,
+    status_code: int,
+    duration_ms: int,
+    timestamp: Optional[datetime] = None,
+):
+    """Fold one captured request into its endpoint's hourly and daily buckets."""
+    await record_endpoint_samples([{
+        "domain": domain, "method": method, "path": path,
+        "status_code": status_code, "duration_ms": duration_ms, "timestamp": timestamp,
+    }])
+
+
+async def record_endpoint_samples(samples: List[Dict[str, Any]]):
+    """Fold captured requests (record_endpoint_sample kwargs) into their hourly and daily buckets.
+
+    Samples are pre-aggregated per bucket, so a batch costs one bulk_write per collection.
+    """
+    now = datetime.now(timezone.utc)
+    hourly: Dict[tuple, Dict[str, Any]] = {}
+    daily: Dict[tuple, Dict[str, Any]] = {}
+    for sample in samples:
+        ts = sample.get("timestamp") or now
+        duration = max(int(sample.get("duration_ms") or 0), 0)
+        status = int(sample.get("status_code") or 0)
+        key = (sample["domain"], sample["method"].upper(), sample["path"])
+        for buckets, bucket_key in ((hourly, key + (_hour(ts),)), (daily, key + (_day(ts),))):
+            b = buckets.setdefault(bucket_key, {
+                "inc": {}, "duration_max_ms": 0, "first_seen_at": ts, "last_seen_at": ts,
+            })
+            inc = b["inc"]
+            for field, n in (
+                ("count", 1),
+                ("error_count", 1 if status >= 400 or status == 0 else 0),
+                ("duration_total_ms", duration),
+                (f"status_counts.{status}", 1),
+            ):
+                inc[field] = inc.get(field, 0) + n
+            b["duration_max_ms"] = max(b["duration_max_ms"], duration)
+            b["first_seen_at"] = min(b["first_seen_at"], ts)
+            b["last_seen_at"] = max(b["last_seen_at"], ts)
+            if buckets is hourly:
+                bucket = f"latency.{latency_sketch.bucket_of(duration)}"
+                inc[bucket] = inc.get(bucket, 0) + 1
+
+    stats_ops = [
+        UpdateOne(
+            {"domain": domain, "method": method, "path": path, "hour": hour},
+            {
+                "$inc": b["inc"],
+                "$max": {"duration_max_ms": b["duration_max_ms"]},
+                "$setOnInsert": {"expire_at": hour + timedelta(days=ENDPOINT_STATS_RETENTION_DAYS)},
+            },
+            upsert=True,
+        )
+        for (domain, method, path, hour), b in hourly.items()
+    ]
+    history_ops = [
+        UpdateOne(
+            {"domain": domain, "method": method, "path": path, "day": day},
+            {
+                "$inc": b["inc"],
+                "$max": {"duration_max_ms": b["duration_max_ms"], "last_seen_at": b["last_seen_at"]},
+                "$min": {"first_seen_at": b["first_seen_at"]},
+            },
+            upsert=True,
+        )
+        for (domain, method, path, day), b in daily.items()
+    ]
+    if stats_ops:
+        db = get_database()
+        await asyncio.gather(
+            db.endpoint_stats.bulk_write(stats_ops, ordered=False),
+            db.endpoint_history.bulk_write(history_ops, ordered=False),
+        )
+
+
+def _summarize(docs: List[dict]) -> Dict[str, Any]:
+    """Merge hourly documents into one summary with latency percentiles."""
+    count = sum(d.get("count", 0) for d in docs)
+    errors = sum(d.get("error_count", 0) for d in docs)
+    total_ms = sum(d.get("duration_total_ms", 0) for d in docs)
+    status_counts: Dict[str, int] = {}
+    for d in docs:
+        for code, n in (d.get("status_counts") or {}).items():
+            status_counts[code] = status_counts.get(code, 0) + n
+    sketch = latency_sketch.merge(d.get("latency") for d in docs)
+
+    summary = {
+        "count": count,
+        "error_count": errors,
+        "error_rate": round(errors / count, 4) if count else 0,
+        "avg_duration_ms": round(total_ms / count, 1) if count else 0,
+        "max_duration_ms": max((d.get("duration_max_ms", 0) for d in docs), default=0),
+        "status_counts": status_counts,
+    }
+    summary.update({name: latency_sketch.quantile(sketch, q) for name, q in QUANTILES.items()})
+    return summary
+
+
+def _window_query(domain, method, path, hours) -> Dict[str, Any]:
+    query: Dict[str, Any] = {"hour": {"$gte": _hour(datetime.now(timezone.utc) - timedelta(hours=hours))}}
+    if domain:
+        query["domain"] = domain
+    if method:
+        query["method"] = method.upper()
+    if path:
+        query["path"] = path
+    return query
+
+
+_ENDPOINT_KEY = {"domain": "$domain", "method": "$method", "path": "$path"}
+
+
+async def _window_counters(query: Dict[str, Any]) -> Dict[tuple, Dict[str, Any]]:
+    """Per-endpoint counter totals over the window, summed server-side."""
+    db = get_database()
+    pipeline = [
+        {"$match": query},
+        {"$group": {
+            "_id": _ENDPOINT_KEY,
+            "count": {"$sum": "$count"},
+            "error_count": {"$sum": "$error_count"},
+            "duration_total_ms": {"$sum": "$duration_total_ms"},
+            "duration_max_ms": {"$max": "$duration_max_ms"},
+        }},
+    ]
+    counters: Dict[tuple, Dict[str, Any]] = {}
+    async for row in db.endpoint_stats.aggregate(pipeline, allowDiskUse=True):
+        key = row.pop("_id")
+        counters[(key["domain"], key["method"], key["path"])] = {**row, "latency": {}, "status_counts": {}}
+    return counters
+
+
+async def _merge_distributions(query: Dict[str, Any], counters: Dict[tuple, Dict[str, Any]]):
+    """Add each endpoint's merged latency sketch and status counts (summed server-side,
+    one row per endpoint and bucket) into `counters`."""
+    db = get_database()
+
+    def _entries(field: str) -> Dict[str, Any]:
+        return {"$map": {
+            "input": {"$objectToArray": {"$ifNull": [f"${field}", {}]}},
+            "in": {"f": field, "k": "$$this.k", "v": "$$this.v"},
+        }}
+
+    pipeline = [
+        {"$match": query},
+        {"$project": {
+            "_id": 0, "domain": 1, "method": 1, "path": 1,
+            "kv": {"$concatArrays": [_entries("latency"), _entries("status_counts")]},
+        }},
+        {"$unwind": "$kv"},
+        {"$group": {"_id": {**_ENDPOINT_KEY, "f": "$kv.f", "k": "$kv.k"}, "v": {"$sum": "$kv.v"}}},
+    ]
+    async for row in db.endpoint_stats.aggregate(pipeline, allowDiskUse=True):
+        key = row["_id"]
+        doc = counters.get((key["domain"], key["method"], key["path"]))
+        if doc is not None:
+            doc[key["f"]][key["k"]] = row["v"]
+
+
+async def get_endpoint_stats(
+    domain: Optional[str] = None,
+    method: Optional[str] = None,
+    path: Optional[str] = None,
+    hours: int = 24,
+    sort: str = "p95",
+    limit: int = 100,
+) -> List[Dict[str, Any]]:
+    """Per-endpoint summaries over the last `hours`, slowest (by `sort`) first.
+
+    Hourly documents are merged server-side, so the cost scales with endpoints,
+    not endpoints × hours. Counter sorts (count, error_rate, avg_duration_ms)
+    pick the top `limit` first and merge latency sketches for those only.
+    """
+    query = _window_query(domain, method, path, hours)
+    counters = await _window_counters(query)
+    if sort not in QUANTILES:
+        top = sorted(
+            counters.items(), key=lambda kv: _summarize([kv[1]]).get(sort) or 0, reverse=True
+        )[:limit]
+        counters = dict(top)
+        if counters:
+            query = {**query, "$or": [{"domain": d, "method": m, "path": p} for d, m, p in counters]}
+    if counters:
+        await _merge_distributions(query, counters)
+
+    stats = [
+        {"domain": d, "method": m, "path": p, **_summarize([doc])}
+        for (d, m, p), doc in counters.items()
+    ]
+    stats.sort(key=lambda s: s.get(sort) or 0, reverse=True)
+    return stats[:limit]
+
+
+async def get_endpoint_stats_hourly(
+    domain: str,
+    method: str,
+    path: str,
+    hours: int = 24,
+) -> List[Dict[str, Any]]:
+    """Hourly series for one endpoint, oldest first."""
+    db = get_database()
+    cursor = db.endpoint_stats.find(_window_query(domain, method, path, hours), {"_id": 0, "expire_at": 0}) \
+        .sort("hour", 1)
+    return [{"hour": doc["hour"], **_summarize([doc])} async for doc in cursor]
+
+
+async def clear_endpoint_stats() -> int:
+    db = get_database()
+    return (await db.endpoint_stats.delete_many({})).deleted_count
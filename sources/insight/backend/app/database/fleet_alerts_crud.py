@@ -0,0 +1,186 @@
+"""MongoDB CRUD for the fleet_alerts collection.
+
+Fleet-wide alert state, maintained by the snapshot collector from each site's
+alert list. Recurring alerts are deduplicated by fingerprint — sha1 of
+(site_id, type, subject), where subject is the device / client the alert is
+about — so one document tracks one problem across every time Aruba raises it:
+
+  {
+    _id: fingerprint, site_id, type, severity, subject, subject_name, description,
+    state: "open" | "closed",
+    opened_at, closed_at,          # current / last episode
+    first_raised_at,               # first episode ever seen
+    occurrences,                   # distinct Aruba alert ids seen for this fingerprint
+    last_alert_id, updated_at
+  }
+
+sync_site_alerts() compares a site's active alerts with its open documents and
+writes only what changed (new, reopened, re-raised, updated, closed).
+"""
+import base64
+import hashlib
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Set, Tuple
+from pymongo import UpdateOne
+from .connection import get_database
+
+ALERT_STATES = ("open", "closed")
+
+# alertTypeProperties keys identifying what an alert is about, most specific first
+_SUBJECT_KEYS = (
+    "deviceSerialNumber", "serialNumber", "macAddress", "clientMacAddress", "deviceMacAddress",
+    "deviceName", "apName", "clientName", "networkName",
+)
+_SUBJECT_NAME_KEYS = ("clientName", "deviceName", "apName", "networkName")
+
+
+def _ts(unix_seconds: Any) -> Optional[datetime]:
+    if isinstance(unix_seconds, (int, float)) and unix_seconds > 0:
+        return datetime.fromtimestamp(unix_seconds, tz=timezone.utc)
+    return None
+
+
+def alert_fingerprint(site_id: str, alert: Dict[str, Any]) -> Tuple[str, str]:
+    """(fingerprint, subject) of a raw Aruba alert."""
+    props = alert.get("alertTypeProperties") or {}
+    subject = next((str(props[k]) for k in _SUBJECT_KEYS if props.get(k)), "")
+    raw = f"{site_id}|{alert.get('type') or ''}|{subject.lower()}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest(), subject
+
+
+async def sync_site_alerts(site_id: str, alerts: List[Dict[str, Any]], now: datetime) -> Dict[str, int]:
+    """Fold one site's current alert list into fleet_alerts.
+
+    Returns change counts (opened / updated / closed) plus the site's open total.
+    """
+    db = get_database()
+
+    active: Dict[str, Dict[str, Any]] = {}
+    cleared: Dict[str, Optional[datetime]] = {}
+    for alert in alerts:
+        fp, subject = alert_fingerprint(site_id, alert)
+        if alert.get("clearedTime"):
+            cleared[fp] = max(filter(None, [cleared.get(fp), _ts(alert["clearedTime"])]), default=None)
+            continue
+        current = active.get(fp)
+        if current is None or (alert.get("raisedTime") or 0) > (current["alert"].get("raisedTime") or 0):
+            active[fp] = {"alert": alert, "subject": subject}
+
+    existing = {
+        doc["_id"]: doc
+        async for doc in db.fleet_alerts.find(
+            {"$or": [{"site_id": site_id, "state": "open"}, {"_id": {"$in": list(active)}}]},
+            {"state": 1, "severity": 1, "description": 1, "last_alert_id": 1},
+        )
+    }
+
+    ops = []
+    counts = {"opened": 0, "updated": 0, "closed": 0}
+    for fp, item in active.items():
+        alert = item["alert"]
+        props = alert.get("alertTypeProperties") or {}
+        raised_at = _ts(alert.get("raisedTime")) or now
+        fields = {
+            "severity": (alert.get("severity") or "").lower() or None,
+            "description": alert.get("description"),
+            "last_alert_id": alert.get("id"),
+        }
+        doc = existing.get(fp)
+        if doc is None:
+            ops.append(UpdateOne({"_id": fp}, {"$setOnInsert": {
+                **fields,
+                "site_id": site_id,
+                "type": alert.get("type"),
+                "subject": item["subject"],
+                "subject_name": next((props[k] for k in _SUBJECT_NAME_KEYS if props.get(k)), None),
+                "state": "open",
+                "opened_at": raised_at,
+                "closed_at": None,
+                "first_raised_at": raised_at,
+                "occurrences": 1,
+                "updated_at": now,
+            }}, upsert=True))
+            counts["opened"] += 1
+        elif doc["state"] != "open" or doc.get("last_alert_id") != fields["last_alert_id"]:
+            # Reopened, or raised again under a new Aruba alert id: a new occurrence
+            update: Dict[str, Any] = {"$set": {**fields, "updated_at": now}, "$inc": {"occurrences": 1}}
+            if doc["state"] != "open":
+                update["$set"].update({"state": "open", "opened_at": raised_at, "closed_at": None})
+                counts["opened"] += 1
+            else:
+                counts["updated"] += 1
+            ops.append(UpdateOne({"_id": fp}, update))
+        elif any(doc.get(k) != v for k, v in fields.items()):
+            ops.append(UpdateOne({"_id": fp}, {"$set": {**fields, "updated_at": now}}))
+            counts["updated"] += 1
+
+    for fp, doc in existing.items():
+        if doc["state"] == "open" and fp not in active:
+            ops.append(UpdateOne({"_id": fp}, {"$set": {
+                "state": "closed", "closed_at": cleared.get(fp) or now, "updated_at": now,
+            }}))
+            counts["closed"] += 1
+
+    if ops:
+        await db.fleet_alerts.bulk_write(ops, ordered=False)
+    counts["open"] = len(active)
+    return counts
+
+
+async def close_alerts_of_removed_sites(site_ids: List[str], now: datetime) -> int:
+    """Close open alerts of sites no longer on the account."""
+    db = get_database()
+    result = await db.fleet_alerts.update_many(
+        {"state": "open", "site_id": {"$nin": site_ids}},
+        {"$set": {"state": "closed", "closed_at": now, "updated_at": now}},
+    )
+    return result.modified_count
+
+
+def encode_cursor(opened_at: datetime, fingerprint: str) -> str:
+    raw = f"{opened_at.replace(tzinfo=None).isoformat()}|{fingerprint}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """Inverse of encode_cursor; raises ValueError on a malformed cursor."""
+    try:
+        opened_at, fingerprint = base64.urlsafe_b64decode(cursor.encode()).decode().split("|", 1)
+        return datetime.fromisoformat(opened_at), fingerprint
+    except Exception as e:
+        raise ValueError("invalid cursor") from e
+
+
+async def list_fleet_alerts(
+    site_ids: Optional[Set[str]] = None,
+    state: Optional[str] = "open",
+    severities: Optional[List[str]] = None,
+    opened_after: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = 50,
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """One page of alerts, newest episode first, and the cursor of the next page (None at the end)."""
+    query: Dict[str, Any] = {}
+    if site_ids is not None:
+        query["site_id"] = {"$in": list(site_ids)}
+    if state:
+        query["state"] = state
+    if severities:
+        query["severity"] = {"$in": [s.lower() for s in severities]}
+    if opened_after:
+        query["opened_at"] = {"$gte": opened_after}
+    if cursor:
+        opened_at, fingerprint = decode_cursor(cursor)
+        query["$or"] = [
+            {"opened_at": {"$lt": opened_at}},
+            {"opened_at": opened_at, "_id": {"$lt": fingerprint}},
+        ]
+
+    db = get_database()
+    docs = await db.fleet_alerts.find(query).sort([("opened_at", -1), ("_id", -1)]).limit(limit + 1).to_list(length=limit + 1)
+    next_cursor = encode_cursor(docs[limit - 1]["opened_at"], docs[limit - 1]["_id"]) if len(docs) > limit else None
+    alerts = []
+    for doc in docs[:limit]:
+        doc["fingerprint"] = doc.pop("_id")
+        alerts.append(doc)
+    return alerts, next_cursor
@@ -0,0 +1,149 @@
+"""MongoDB CRUD for the site_health_series collection.
+
+Per-site health score and active-alert counters, sampled by the snapshot
+collector once per interval and stored as bucketed documents at three
+resolutions, each keyed by (site_id, res, start):
+
+  raw — one document per site per hour, samples appended to `samples`
+  5m  — one document per site per day,   `points.<slot>` = per-5-minute aggregates
+  1h  — one document per site per week,  `points.<slot>` = per-hour aggregates
+
+Every sample is folded into all three on write ($inc / $min / $max on the
+aggregate slots; each metric keeps its own sample count, since a sample may
+lack some metrics), so downsampling needs no separate job, and each resolution
+expires through a TTL on expire_at. Storage per site is therefore bounded by
+retention, not by how long the collector has been running.
+"""
+from datetime import datetime, timezone, timedelta
+from typing import Any, Dict, List, Optional
+from pymongo import UpdateOne
+from .connection import get_database
+
+# res -> (slot seconds, bucket seconds, retention)
+HEALTH_RESOLUTIONS = {
+    "raw": (None, 3600, timedelta(days=2)),
+    "5m": (300, 86400, timedelta(days=35)),
+    "1h": (3600, 7 * 86400, timedelta(days=400)),
+}
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def _aware(ts: datetime) -> datetime:
+    return ts.replace(tzinfo=timezone.utc) if ts.tzinfo is None else ts
+
+
+def _floor(ts: datetime, seconds: int) -> datetime:
+    elapsed = int((_aware(ts) - _EPOCH).total_seconds())
+    return _EPOCH + timedelta(seconds=elapsed - elapsed % seconds)
+
+
+def sample_metrics(site: Dict[str, Any]) -> Dict[str, float]:
+    """Numeric metrics of a normalized site entry: health score plus every alert counter."""
+    metrics: Dict[str, float] = {}
+    score = (site.get("healthScore") or {}).get("score")
+    if isinstance(score, (int, float)) and not isinstance(score, bool):
+        metrics["score"] = score
+    for name, value in (site.get("activeAlertsCounters") or {}).items():
+        if isinstance(value, (int, float)) and not isinstance(value, bool) and "." not in name and not name.startswith("$"):
+            metrics[name] = value
+    return metrics
+
+
+async def record_health_samples(sites: List[Dict[str, Any]], ts: datetime):
+    """Append one sample per site and fold it into the 5m / 1h aggregates."""
+    ops = []
+    for site in sites:
+        site_id = site.get("siteId")
+        metrics = sample_metrics(site)
+        if not site_id or not metrics:
+            continue
+
+        _, bucket_seconds, retention = HEALTH_RESOLUTIONS["raw"]
+        start = _floor(ts, bucket_seconds)
+        ops.append(UpdateOne(
+            {"site_id": site_id, "res": "raw", "start": start},
+            {
+                "$push": {"samples": {
+                    "t": ts,
+                    **metrics,
+                    "severity": (site.get("healthScore") or {}).get("scoreSeverity"),
+                    "trend": site.get("healthScoreTrend"),
+                }},
+                "$setOnInsert": {"expire_at": start + timedelta(seconds=bucket_seconds) + retention},
+            },
+            upsert=True,
+        ))
+
+        for res in ("5m", "1h"):
+            slot_seconds, bucket_seconds, retention = HEALTH_RESOLUTIONS[res]
+            start = _floor(ts, bucket_seconds)
+            slot = f"points.{int((_floor(ts, slot_seconds) - start).total_seconds()) // slot_seconds}"
+            ops.append(UpdateOne(
+                {"site_id": site_id, "res": res, "start": start},
+                {
+                    "$inc": {
+                        f"{slot}.n": 1,
+                        **{f"{slot}.{m}.sum": v for m, v in metrics.items()},
+                        **{f"{slot}.{m}.n": 1 for m in metrics},
+                    },
+                    "$min": {f"{slot}.{m}.min": v for m, v in metrics.items()},
+                    "$max": {f"{slot}.{m}.max": v for m, v in metrics.items()},
+                    "$setOnInsert": {"expire_at": start + timedelta(seconds=bucket_seconds) + retention},
+                },
+                upsert=True,
+            ))
+
+    if ops:
+        db = get_database()
+        await db.site_health_series.bulk_write(ops, ordered=False)
+
+
+def pick_resolution(start: datetime, end: datetime) -> str:
+    """Coarsest-needed resolution for a range: raw up to a day, 5m up to a week, else 1h."""
+    span = end - start
+    if span <= timedelta(days=1):
+        return "raw"
+    if span <= timedelta(days=7):
+        return "5m"
+    return "1h"
+
+
+async def get_health_series(site_id: str, start: datetime, end: datetime, res: str) -> List[Dict[str, Any]]:
+    """Points of one site in [start, end) at resolution `res`, oldest first.
+
+    Each point is {t, n, <metric>: {avg, min, max}}; raw points have n = 1 and
+    also carry severity / trend. A metric's avg is over the samples that had it.
+    """
+    slot_seconds, bucket_seconds, _ = HEALTH_RESOLUTIONS[res]
+    start, end = _aware(start), _aware(end)
+    db = get_database()
+    cursor = db.site_health_series.find(
+        {"site_id": site_id, "res": res, "start": {"$gte": _floor(start, bucket_seconds), "$lt": end}}
+    ).sort("start", 1)
+
+    points: List[Dict[str, Any]] = []
+    async for doc in cursor:
+        if res == "raw":
+            for sample in doc.get("samples", []):
+                t = _aware(sample.pop("t"))
+                if start <= t < end:
+                    point: Dict[str, Any] = {"t": t, "n": 1}
+                    for name, value in sample.items():
+                        point[name] = {"avg": value, "min": value, "max": value} if isinstance(value, (int, float)) else value
+                    points.append(point)
+            continue
+
+        bucket_start = _aware(doc["start"])
+        for slot, agg in sorted(doc.get("points", {}).items(), key=lambda kv: int(kv[0])):
+            t = bucket_start + timedelta(seconds=int(slot) * slot_seconds)
+            if not (start <= t < end):
+                continue
+            n = agg.pop("n", 0) or 1
+            point = {"t": t, "n": n}
+            for name, stats in agg.items():
+                # Slots written before per-metric counts existed fall back to the slot count
+                count = stats.get("n") or n
+                point[name] = {"avg": stats["sum"] / count, "min": stats.get("min"), "max": stats.get("max")}
+            points.append(point)
+    return points
@@ -81,6 +81,7 @@ class EndpointDocument(BaseModel):
     api_key: str = Field(..., description="Unique key: domain|path|METHOD")
     domain: str = Field(..., description="e.g. nb.portal.arubainstanton.com")
     path: str = Field(..., description="Normalized path e.g. /api/sites/{id}")
+    sample_path: Optional[str] = Field(None, description="Latest concrete path, e.g. /api/sites/<uuid>")
     method: str = Field(..., description="HTTP method uppercase")
 
     # Latest captured data
@@ -0,0 +1,135 @@
+"""MongoDB CRUD for the site_snapshots collection.
+
+One document per Aruba site, written by the background snapshot collector:
+
+  {
+    _id:               site_id,
+    site:              normalized site entry (as returned by /overview/sites, minus caller role),
+    site_collected_at: when the site list was last read,
+    resources:         {<name>: {data: <raw Aruba JSON>, collected_at}},
+    devices:           [normalized DeviceResponse dicts],
+    devices_collected_at,
+    errors:            {<name>: <error message>}   # failures of the latest pass
+    summary:           {devices, devices_offline, clients, open_alerts}   # zone rollup inputs
+  }
+
+A failed resource fetch keeps the previous data, so a snapshot degrades to
+"older" rather than "missing". Sites that disappear from the account are removed.
+"""
+from datetime import datetime, timezone, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+from pymongo import ReturnDocument, UpdateOne
+from .connection import get_database
+
+
+def _aware(ts: Optional[datetime]) -> Optional[datetime]:
+    if ts is not None and ts.tzinfo is None:
+        return ts.replace(tzinfo=timezone.utc)
+    return ts
+
+
+def is_fresh(ts: Optional[datetime], max_age_seconds: int) -> bool:
+    """True if `ts` is set and no older than max_age_seconds."""
+    ts = _aware(ts)
+    return ts is not None and datetime.now(timezone.utc) - ts <= timedelta(seconds=max_age_seconds)
+
+
+async def save_site_list(sites: List[Dict[str, Any]], collected_at: datetime) -> Tuple[List[str], List[str]]:
+    """Upsert the normalized site entries and drop snapshots of sites no longer listed.
+
+    Returns (changed, removed) site ids — changed covers new sites and sites whose
+    status or health score moved, i.e. the ones whose zone rollups need a refresh.
+    """
+    db = get_database()
+    ids = [s["siteId"] for s in sites if s.get("siteId")]
+    previous = {
+        doc["_id"]: doc.get("site") or {}
+        async for doc in db.site_snapshots.find({}, {"site.status": 1, "site.healthScore.score": 1})
+    }
+    changed = [
+        s["siteId"] for s in sites if s.get("siteId") and (
+            s["siteId"] not in previous
+            or previous[s["siteId"]].get("status") != s.get("status")
+            or (previous[s["siteId"]].get("healthScore") or {}).get("score") != (s.get("healthScore") or {}).get("score")
+        )
+    ]
+    removed = [site_id for site_id in previous if site_id not in set(ids)]
+
+    ops = [
+        UpdateOne(
+            {"_id": s["siteId"]},
+            {"$set": {"site": s, "site_collected_at": collected_at}},
+            upsert=True,
+        )
+        for s in sites if s.get("siteId")
+    ]
+    if ops:
+        await db.site_snapshots.bulk_write(ops, ordered=False)
+    if removed:
+        await db.site_snapshots.delete_many({"_id": {"$in": removed}})
+    return changed, removed
+
+
+async def save_site_resources(
+    site_id: str,
+    resources: Dict[str, Any],
+    devices: Optional[List[Dict[str, Any]]],
+    errors: Dict[str, str],
+    collected_at: datetime,
+    summary: Optional[Dict[str, int]] = None,
+) -> Tuple[bool, Optional[List[Dict[str, Any]]]]:
+    """Store one collection pass for a site; failed resources keep their previous data.
+
+    `summary` holds the per-site counters zone rollups are built from (devices,
+    devices_offline, clients, open_alerts); only the counters that were collected
+    are passed. Returns (summary_changed, previous_devices): whether any of those
+    counters changed, and the device list this pass replaced (None if `devices`
+    was not collected or the site had no device snapshot yet).
+    """
+    db = get_database()
+    set_fields: Dict[str, Any] = {
+        f"resources.{name}": {"data": data, "collected_at": collected_at} for name, data in resources.items()
+    }
+    if devices is not None:
+        set_fields["devices"] = devices
+        set_fields["devices_collected_at"] = collected_at
+    set_fields["errors"] = errors
+    for name, value in (summary or {}).items():
+        set_fields[f"summary.{name}"] = value
+
+    projection = {"summary": 1}
+    if devices is not None:
+        projection["devices"] = 1
+    before = await db.site_snapshots.find_one_and_update(
+        {"_id": site_id},
+        {"$set": set_fields},
+        projection=projection,
+        return_document=ReturnDocument.BEFORE,
+    ) or {}
+    previous = before.get("summary") or {}
+    summary_changed = any(previous.get(name) != value for name, value in (summary or {}).items())
+    return summary_changed, before.get("devices") if devices is not None else None
+
+
+async def get_site_snapshots(
+    site_ids: Optional[List[str]] = None,
+    projection: Optional[Dict[str, int]] = None,
+) -> List[Dict[str, Any]]:
+    """All site snapshots, or only those for `site_ids`."""
+    db = get_database()
+    query = {"_id": {"$in": site_ids}} if site_ids is not None else {}
+    docs = []
+    async for doc in db.site_snapshots.find(query, projection):
+        docs.append(doc)
+    return docs
+
+
+async def get_snapshot_resource(site_id: str, name: str) -> Optional[Dict[str, Any]]:
+    """{data, collected_at} for one stored resource of a site, or None."""
+    db = get_database()
+    doc = await db.site_snapshots.find_one({"_id": site_id}, {f"resources.{name}": 1})
+    entry = ((doc or {}).get("resources") or {}).get(name)
+    if not entry:
+        return None
+    return {"data": entry.get("data"), "collected_at": _aware(entry.get("collected_at"))}
+
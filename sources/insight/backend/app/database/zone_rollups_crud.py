@@ -0,0 +1,70 @@
+"""Zone rollups — per-zone summary stored on the zone document (zones.rollup).
+
+  {sites_reporting, sites_down, devices, devices_offline, clients,
+   worst_health_score, open_alerts, collected_at, updated_at}
+
+Built from the site_snapshots of the zone's sites (site entry + per-site
+summary counters kept by the snapshot collector). A zone is recomputed only
+when one of its sites' snapshot counters changes or its site list changes
+(set_zone_sites / add_sites_to_zone), so zone cards read one precomputed
+field instead of calling Aruba per site.
+"""
+from datetime import datetime, timezone
+from typing import Any, Dict, List
+from bson import ObjectId
+from .connection import get_database
+
+_EMPTY_ROLLUP = {
+    "sites_reporting": 0, "sites_down": 0, "devices": 0, "devices_offline": 0, "clients": 0,
+    "worst_health_score": None, "open_alerts": 0, "collected_at": None,
+}
+
+
+async def compute_rollup(site_ids: List[str]) -> Dict[str, Any]:
+    db = get_database()
+    pipeline = [
+        {"$match": {"_id": {"$in": site_ids}}},
+        {"$group": {
+            "_id": None,
+            "sites_reporting": {"$sum": 1},
+            "sites_down": {"$sum": {"$cond": [{"$eq": ["$site.status", "down"]}, 1, 0]}},
+            "devices": {"$sum": "$summary.devices"},
+            "devices_offline": {"$sum": "$summary.devices_offline"},
+            "clients": {"$sum": "$summary.clients"},
+            "worst_health_score": {"$min": "$site.healthScore.score"},
+            "open_alerts": {"$sum": "$summary.open_alerts"},
+            "collected_at": {"$min": "$site_collected_at"},
+        }},
+    ]
+    rows = await db.site_snapshots.aggregate(pipeline).to_list(length=1)
+    if not rows:
+        return dict(_EMPTY_ROLLUP)
+    row = rows[0]
+    row.pop("_id")
+    return row
+
+
+async def recompute_zone_rollup(zone_id: str):
+    """Recompute one zone's rollup from its current site list."""
+    db = get_database()
+    try:
+        oid = ObjectId(zone_id)
+    except Exception:
+        return
+    zone = await db.zones.find_one({"_id": oid}, {"site_ids": 1})
+    if not zone:
+        return
+    rollup = await compute_rollup(zone.get("site_ids", []))
+    rollup["updated_at"] = datetime.now(timezone.utc)
+    await db.zones.update_one({"_id": oid}, {"$set": {"rollup": rollup}})
+
+
+async def recompute_rollups_for_sites(site_ids: List[str]) -> int:
+    """Recompute every zone containing any of `site_ids`; returns the number of zones."""
+    if not site_ids:
+        return 0
+    db = get_database()
+    zone_ids = [str(z["_id"]) async for z in db.zones.find({"site_ids": {"$in": site_ids}}, {"_id": 1})]
+    for zone_id in zone_ids:
+        await recompute_zone_rollup(zone_id)
+    return len(zone_ids)
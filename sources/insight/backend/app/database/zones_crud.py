@@ -3,6 +3,7 @@ from datetime import datetime, timezone
 from typing import Optional, Dict, Any, List
 from bson import ObjectId
 from .connection import get_database
+from .zone_rollups_crud import recompute_zone_rollup
 
 VALID_ZONE_ROLES = {"admin", "operator", "viewer"}
 
@@ -104,6 +105,8 @@ async def set_zone_sites(zone_id: str, site_ids: List[str]) -> bool:
         )
     except Exception:
         return False
+    if result.matched_count > 0:
+        await recompute_zone_rollup(zone_id)
     return result.matched_count > 0
 
 
@@ -120,6 +123,8 @@ async def add_sites_to_zone(zone_id: str, site_ids: List[str]) -> bool:
         )
     except Exception:
         return False
+    if result.matched_count > 0:
+        await recompute_zone_rollup(zone_id)
     return result.matched_count > 0
 
 
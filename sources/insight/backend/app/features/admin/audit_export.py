@@ -0,0 +1,69 @@
+"""Streaming CSV / NDJSON export of audit logs.
+
+The cursor is read in batches and each batch is encoded and yielded as one
+chunk, with timestamps converted to the requested timezone on the way out —
+memory stays flat however many rows the 90-day window holds.
+"""
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List
+import pytz
+
+EXPORT_BATCH_SIZE = 1000
+EXPORT_FORMATS = ("csv", "ndjson")
+
+EXPORT_COLUMNS = [
+    "timestamp", "actor", "action", "status", "statusCode", "method", "endpoint",
+    "zone_id", "site_id", "ip_address", "admin_master_id", "detail", "payload",
+]
+EXPORT_PROJECTION = {"_id": 1, **{c: 1 for c in EXPORT_COLUMNS}, "actor_email": 1, "insight_user_id": 1}
+
+
+def _row(log: Dict[str, Any], tz) -> Dict[str, Any]:
+    ts = log.get("timestamp")
+    if isinstance(ts, datetime):
+        ts = (ts if ts.tzinfo else pytz.utc.localize(ts)).astimezone(tz).isoformat()
+    row = {c: log.get(c) for c in EXPORT_COLUMNS}
+    row["id"] = str(log["_id"])
+    row["timestamp"] = ts
+    row["actor"] = log.get("actor") or log.get("actor_email") or log.get("insight_user_id")
+    return row
+
+
+async def _batches(cursor, size: int) -> AsyncIterator[List[Dict[str, Any]]]:
+    batch = []
+    async for log in cursor:
+        batch.append(log)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+async def ndjson_stream(cursor, tz) -> AsyncIterator[bytes]:
+    async for batch in _batches(cursor, EXPORT_BATCH_SIZE):
+        yield "".join(
+            json.dumps(_row(log, tz), ensure_ascii=False, default=str) + "\n" for log in batch
+        ).encode("utf-8")
+
+
+async def csv_stream(cursor, tz) -> AsyncIterator[bytes]:
+    columns = ["id"] + EXPORT_COLUMNS
+    buf = io.StringIO()
+    writer = csv.DictWriter(buf, fieldnames=columns, extrasaction="ignore")
+    buf.write("\ufeff")  # BOM so Excel opens UTF-8 (Vietnamese) text correctly
+    writer.writeheader()
+    async for batch in _batches(cursor, EXPORT_BATCH_SIZE):
+        for log in batch:
+            row = _row(log, tz)
+            if row["payload"] is not None:
+                row["payload"] = json.dumps(row["payload"], ensure_ascii=False, default=str)
+            writer.writerow(row)
+        yield buf.getvalue().encode("utf-8")
+        buf.seek(0)
+        buf.truncate()
+    if buf.tell():
+        yield buf.getvalue().encode("utf-8")
@@ -1,9 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException
-from typing import List, Any, Dict
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from typing import List, Any, Dict, Optional
+from datetime import datetime, timezone, timedelta
 import pytz
 from app.shared.auth_deps import require_internal_admin
 from app.database.connection import get_database
 from app.database.models import LogResponse
+from app.features.admin import audit_export
+from app.database.audit_stats_crud import get_audit_stats, ROLLUP_GRANULARITIES, ROLLUP_DIMENSIONS
 from app.database.auth_crud import (
     create_user_with_password,
     create_user_no_password,
@@ -11,6 +15,7 @@ from app.database.auth_crud import (
     reset_user_password,
     delete_user,
     get_user_by_email,
+    normalize_actor,
 )
 
 router = APIRouter()
@@ -226,15 +231,9 @@ async def reset_password_endpoint(
 
 # ===== Audit logs =====
 
-@router.get("/logs", response_model=List[LogResponse])
-async def get_audit_logs(
-    limit: int = 50,
-    skip: int = 0,
-    zone_id: str = None,
-    current_user: Dict[str, Any] = Depends(require_internal_admin),
-):
-    db = get_database()
-    query = {}
+async def _audit_scope(current_user: Dict[str, Any], zone_id: Optional[str]) -> Optional[Dict[str, Any]]:
+    """Actor filter for the audit views the caller may see (None = nothing visible)."""
+    query: Dict[str, Any] = {}
 
     from app.config import SUPER_ADMIN_EMAILS
     is_super_admin = current_user.get("role") == "super_admin" or current_user.get("email") in SUPER_ADMIN_EMAILS
@@ -243,12 +242,9 @@ async def get_audit_logs(
         from app.database.zones_crud import get_all_member_emails_in_zone
         member_emails = await get_all_member_emails_in_zone(zone_id)
         if member_emails:
-            query["$or"] = [
-                {"actor_email": {"$in": member_emails}},
-                {"insight_user_id": {"$in": member_emails}}
-            ]
+            query["actor"] = {"$in": [normalize_actor(e) for e in member_emails]}
         else:
-            return []
+            return None
     elif not is_super_admin:
         from app.database.zones_crud import get_zones_for_member
         zones = await get_zones_for_member(current_user.get("email"))
@@ -258,17 +254,25 @@ async def get_audit_logs(
                 sub_emails.add(m["email"])
         
         if sub_emails:
-            sub_list = list(sub_emails)
-            query["$or"] = [
-                {"actor_email": {"$in": sub_list}},
-                {"insight_user_id": {"$in": sub_list}}
-            ]
+            query["actor"] = {"$in": [normalize_actor(e) for e in sub_emails]}
         else:
-            query["$or"] = [
-                {"actor_email": current_user.get("email")},
-                {"insight_user_id": current_user.get("email")}
-            ]
+            query["actor"] = normalize_actor(current_user.get("email"))
+    return query
+
+
+@router.get("/logs", response_model=List[LogResponse])
+async def get_audit_logs(
+    limit: int = 50,
+    skip: int = 0,
+    zone_id: str = None,
+    current_user: Dict[str, Any] = Depends(require_internal_admin),
+):
+    db = get_database()
+    query = await _audit_scope(current_user, zone_id)
+    if query is None:
+        return []
 
+    # Served by the (actor, timestamp) index — or the timestamp index for super admins
     cursor = db.audit_logs.find(query).sort("timestamp", -1).skip(skip).limit(limit)
     logs = await cursor.to_list(length=limit)
 
@@ -298,3 +302,78 @@ async def get_audit_logs(
             master_account_used=log.get("master_account_used", False),
         ))
     return formatted_logs
+
+
+@router.get("/logs/export")
+async def export_audit_logs(
+    format: str = "csv",
+    days: int = Query(90, ge=1, le=90),
+    zone_id: str = None,
+    tz: str = "Asia/Ho_Chi_Minh",
+    current_user: Dict[str, Any] = Depends(require_internal_admin),
+):
+    """Stream the audit trail (CSV or NDJSON) for the window the caller may see."""
+    if format not in audit_export.EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail="format phải là 'csv' hoặc 'ndjson'.")
+    try:
+        out_tz = pytz.timezone(tz)
+    except pytz.UnknownTimeZoneError:
+        raise HTTPException(status_code=400, detail=f"Múi giờ không hợp lệ: {tz}")
+
+    query = await _audit_scope(current_user, zone_id)
+    if query is None:
+        query = {"_id": None}  # nothing visible — export just the header
+    query["timestamp"] = {"$gte": datetime.now(timezone.utc) - timedelta(days=days)}
+
+    db = get_database()
+    cursor = db.audit_logs.find(query, audit_export.EXPORT_PROJECTION) \
+        .sort("timestamp", -1).batch_size(audit_export.EXPORT_BATCH_SIZE)
+
+    stream = audit_export.csv_stream(cursor, out_tz) if format == "csv" else audit_export.ndjson_stream(cursor, out_tz)
+    filename = f"audit_logs_{datetime.now(out_tz).strftime('%Y%m%d_%H%M%S')}.{format}"
+    return StreamingResponse(
+        stream,
+        media_type="text/csv; charset=utf-8" if format == "csv" else "application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+@router.get("/logs/stats")
+async def get_audit_stats_view(
+    granularity: str = "day",
+    days: int = Query(7, ge=1, le=365),
+    group_by: Optional[str] = None,
+    by_bucket: bool = True,
+    zone_id: str = None,
+    limit: int = Query(1000, ge=1, le=10000),
+    current_user: Dict[str, Any] = Depends(require_internal_admin),
+):
+    """Audit activity counts from the hourly/daily rollups.
+
+    group_by: comma-separated subset of action, zone_id, site_id, actor.
+    by_bucket=false returns window totals, largest first (e.g. top actors).
+    """
+    if granularity not in ROLLUP_GRANULARITIES:
+        raise HTTPException(status_code=400, detail="granularity phải là 'hour' hoặc 'day'.")
+    dims = [d.strip() for d in group_by.split(",") if d.strip()] if group_by else []
+    invalid = [d for d in dims if d not in ROLLUP_DIMENSIONS or d == "status"]
+    if invalid:
+        raise HTTPException(status_code=400, detail=f"group_by không hợp lệ: {', '.join(invalid)}")
+
+    scope = await _audit_scope(current_user, zone_id)
+    if scope is None:
+        return {"granularity": granularity, "data": []}
+
+    start = datetime.now(timezone.utc) - timedelta(days=days)
+    rows = await get_audit_stats(
+        granularity=granularity,
+        start=start,
+        group_by=dims,
+        scope=scope,
+        by_bucket=by_bucket,
+        limit=limit,
+    )
+    for row in rows:
+        if "bucket" in row:
+            bucket = row["bucket"] if row["bucket"].tzinfo else pytz.utc.localize(row["bucket"])
+            row["bucket"] = bucket.astimezone(VN_TZ).isoformat()
+    return {"granularity": granularity, "data": rows}
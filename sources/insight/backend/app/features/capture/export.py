@@ -0,0 +1,99 @@
+"""Streaming serializers for captured-log exports (NDJSON, JSON array, Postman v2.1).
+
+Each generator takes the first log (already fetched so the route can return 404
+on an empty result) plus the async iterator for the rest, and yields encoded
+chunks one document at a time — memory stays flat regardless of export size.
+"""
+import json
+import uuid
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Dict, List
+from urllib.parse import urlparse, parse_qsl
+
+# Request headers that make no sense in a replayable collection
+_POSTMAN_SKIP_HEADERS = {"content-length", "host", "connection"}
+
+
+def _json_default(value: Any):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, default=_json_default)
+
+
+async def ndjson_stream(first: dict, rest: AsyncIterator[dict]):
+    """One JSON document per line."""
+    yield (_dumps(first) + "\n").encode("utf-8")
+    async for log in rest:
+        yield (_dumps(log) + "\n").encode("utf-8")
+
+
+async def json_stream(first: dict, rest: AsyncIterator[dict]):
+    """{"exported_at": ..., "logs": [...]} written incrementally."""
+    exported_at = datetime.now(timezone.utc).isoformat()
+    yield f'{{"exported_at": {_dumps(exported_at)}, "logs": [\n'.encode("utf-8")
+    yield _dumps(first).encode("utf-8")
+    async for log in rest:
+        yield (",\n" + _dumps(log)).encode("utf-8")
+    yield b"\n]}\n"
+
+
+def _postman_url(url: str, query_params: Dict[str, Any]) -> Dict[str, Any]:
+    parsed = urlparse(url)
+    query = [{"key": k, "value": v} for k, v in parse_qsl(parsed.query, keep_blank_values=True)]
+    if not query and query_params:
+        query = [{"key": k, "value": str(v)} for k, v in query_params.items()]
+    return {
+        "raw": url,
+        "protocol": parsed.scheme or "https",
+        "host": parsed.hostname.split(".") if parsed.hostname else [],
+        "path": [seg for seg in parsed.path.split("/") if seg],
+        "query": query,
+    }
+
+
+def postman_item(log: dict) -> Dict[str, Any]:
+    """Map a raw log document to a Postman v2.1 request item."""
+    method = (log.get("method") or "GET").upper()
+    headers: List[Dict[str, str]] = [
+        {"key": k, "value": str(v)}
+        for k, v in (log.get("request_headers") or {}).items()
+        if not k.startswith(":") and k.lower() not in _POSTMAN_SKIP_HEADERS
+    ]
+    request: Dict[str, Any] = {
+        "method": method,
+        "header": headers,
+        "url": _postman_url(log.get("url", ""), log.get("query_params") or {}),
+    }
+
+    body = log.get("request_body")
+    if body is not None:
+        is_json = isinstance(body, (dict, list))
+        request["body"] = {
+            "mode": "raw",
+            "raw": _dumps(body) if is_json else str(body),
+            "options": {"raw": {"language": "json" if is_json else "text"}},
+        }
+
+    return {
+        "name": f"{method} {log.get('path') or log.get('url', '')}",
+        "request": request,
+        "response": [],
+    }
+
+
+async def postman_stream(first: dict, rest: AsyncIterator[dict], collection_name: str):
+    """Postman Collection v2.1 with items written incrementally."""
+    info = {
+        "_postman_id": str(uuid.uuid4()),
+        "name": collection_name,
+        "schema": "https://schema.getpostman.com/json/collection/v2.1.0/collection.json",
+    }
+    yield f'{{"info": {_dumps(info)}, "item": [\n'.encode("utf-8")
+    yield _dumps(postman_item(first)).encode("utf-8")
+    async for log in rest:
+        yield (",\n" + _dumps(postman_item(log))).encode("utf-8")
+    yield b"\n]}\n"
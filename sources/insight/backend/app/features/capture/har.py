@@ -0,0 +1,211 @@
+"""HAR (HTTP Archive) import into the capture store.
+
+HAR exports from DevTools can be hundreds of MB, mostly response bodies. The
+parser never loads the whole file: it skips ahead to log.entries and decodes
+one entry object at a time out of a rolling text buffer, so memory is bounded
+by the largest single entry. Entries are mapped onto CapturePayload and pushed
+through the same bulk ingest path as /capture/batch.
+"""
+import base64
+import codecs
+import json
+import re
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+from fastapi.concurrency import run_in_threadpool
+from app.database.models import CapturePayload
+
+HAR_IMPORT_BATCH_SIZE = 200
+
+_ENTRIES_RE = re.compile(r'"entries"\s*:\s*\[')
+_decoder = json.JSONDecoder()
+
+
+class HarFormatError(ValueError):
+    pass
+
+
+class HarEntryParser:
+    """Incremental parser yielding the objects of log.entries from text chunks."""
+
+    def __init__(self):
+        self._buf = ""
+        self._in_entries = False
+        self._done = False
+        self._retry_at = 0  # don't re-attempt a partial entry until the buffer grows past this
+
+    def feed(self, text: str, final: bool = False) -> List[Dict[str, Any]]:
+        if self._done:
+            return []
+        self._buf += text
+        entries: List[Dict[str, Any]] = []
+
+        if not self._in_entries:
+            match = _ENTRIES_RE.search(self._buf)
+            if not match:
+                self._buf = self._buf[-64:]  # "entries": [ may straddle chunks
+                return entries
+            self._buf = self._buf[match.end():]
+            self._in_entries = True
+
+        if final:
+            self._retry_at = 0
+        while len(self._buf) >= self._retry_at:
+            pos = 0
+            while pos < len(self._buf) and self._buf[pos] in " \t\r\n,":
+                pos += 1
+            if pos == len(self._buf):
+                self._buf = ""
+                break
+            if self._buf[pos] == "]":
+                self._done = True
+                self._buf = ""
+                break
+            try:
+                entry, end = _decoder.raw_decode(self._buf, pos)
+            except json.JSONDecodeError:
+                # Incomplete entry — wait for substantially more data before retrying,
+                # so a huge entry is not re-parsed on every small chunk
+                self._buf = self._buf[pos:]
+                self._retry_at = 0 if final else len(self._buf) * 2
+                break
+            self._buf = self._buf[end:]
+            self._retry_at = 0
+            if isinstance(entry, dict):
+                entries.append(entry)
+        return entries
+
+    def close(self):
+        if not self._in_entries:
+            raise HarFormatError("No log.entries array found — not a HAR file?")
+        if not self._done:
+            if self._buf.strip():
+                _decoder.raw_decode(self._buf.strip())  # surfaces the real JSON error
+            raise HarFormatError("HAR file ended before log.entries was closed")
+
+
+def _headers(items: Optional[List[Dict[str, Any]]]) -> Dict[str, str]:
+    return {h.get("name", ""): str(h.get("value", "")) for h in items or [] if h.get("name")}
+
+
+def _body(text: Optional[str], mime_type: str) -> Any:
+    if text is None or text == "":
+        return None
+    if "json" in (mime_type or "").lower() or text[:1] in "{[":
+        try:
+            return json.loads(text)
+        except ValueError:
+            pass
+    return text
+
+
+def _started_at(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        ts = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return ts if ts.tzinfo else ts.replace(tzinfo=timezone.utc)
+
+
+def entry_to_capture(entry: Dict[str, Any]) -> Tuple[CapturePayload, Optional[datetime]]:
+    """Map one HAR entry onto the extension's capture model (+ its start time)."""
+    request = entry.get("request") or {}
+    response = entry.get("response") or {}
+    content = response.get("content") or {}
+    post_data = request.get("postData") or {}
+    mime_type = content.get("mimeType") or ""
+
+    is_binary = content.get("encoding") == "base64"
+    response_text = content.get("text")
+    if is_binary and response_text and ("json" in mime_type or "text" in mime_type):
+        try:
+            response_text = base64.b64decode(response_text).decode("utf-8")
+            is_binary = False
+        except (ValueError, UnicodeDecodeError):
+            pass
+
+    started_at = _started_at(entry.get("startedDateTime"))
+    payload = CapturePayload(
+        url=request.get("url", ""),
+        method=(request.get("method") or "GET").upper(),
+        request_headers=_headers(request.get("headers")),
+        request_body=_body(post_data.get("text"), post_data.get("mimeType", "")),
+        status_code=int(response.get("status") or 0),
+        response_headers=_headers(response.get("headers")),
+        response_body=None if is_binary else _body(response_text, mime_type),
+        duration_ms=max(int(entry.get("time") or 0), 0),
+        mime_type=mime_type or None,
+        timestamp=started_at.timestamp() * 1000 if started_at else 0.0,
+        is_binary=is_binary,
+    )
+    return payload, started_at
+
+
+async def iter_har_entries(chunks: AsyncIterator[bytes]) -> AsyncIterator[Dict[str, Any]]:
+    parser = HarEntryParser()
+    utf8 = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    async for chunk in chunks:
+        for entry in parser.feed(utf8.decode(chunk)):
+            yield entry
+    for entry in parser.feed(utf8.decode(b"", final=True), final=True):
+        yield entry
+    parser.close()
+
+
+async def read_har_file(path: str, chunk_size: int = 1 << 20) -> AsyncIterator[bytes]:
+    """Chunked reader for local HAR files (CLI import)."""
+    with open(path, "rb") as f:
+        while chunk := f.read(chunk_size):
+            yield chunk
+
+
+async def read_spooled(f, chunk_size: int = 1 << 20) -> AsyncIterator[bytes]:
+    """Chunked reader over an already-spooled upload, closing it when done."""
+    # A spool past its memory threshold is a real file: keep its reads off the event loop
+    try:
+        await run_in_threadpool(f.seek, 0)
+        while chunk := await run_in_threadpool(f.read, chunk_size):
+            yield chunk
+    finally:
+        f.close()
+
+
+async def import_har(
+    chunks: AsyncIterator[bytes],
+    ingest: Callable[[List[Tuple[CapturePayload, Optional[datetime]]]], Awaitable[Tuple[int, int]]],
+    batch_size: int = HAR_IMPORT_BATCH_SIZE,
+) -> AsyncIterator[Dict[str, int]]:
+    """Stream-import a HAR file, yielding a cumulative progress report per batch.
+
+    Entries without an http(s) URL (data:, chrome-extension:, ...) are skipped.
+    The last report is the final summary.
+    """
+    progress = {"entries": 0, "processed": 0, "failed": 0, "skipped": 0}
+    batch: List[Tuple[CapturePayload, Optional[datetime]]] = []
+
+    async def _flush():
+        processed, failed = await ingest(batch)
+        progress["processed"] += processed
+        progress["failed"] += failed
+        batch.clear()
+
+    async for entry in iter_har_entries(chunks):
+        progress["entries"] += 1
+        url = (entry.get("request") or {}).get("url", "")
+        if not url.startswith(("http://", "https://")):
+            progress["skipped"] += 1
+            continue
+        try:
+            batch.append(entry_to_capture(entry))
+        except (ValueError, TypeError):
+            progress["failed"] += 1
+            continue
+        if len(batch) >= batch_size:
+            await _flush()
+            yield dict(progress)
+
+    if batch:
+        await _flush()
+    yield dict(progress)
@@ -0,0 +1,91 @@
+"""Live fan-out of captured traffic to dashboard subscribers (WebSocket / SSE).
+
+Each subscriber owns a bounded drop-oldest queue and a server-side filter
+(domain / method / status). broadcast() only does a filter check and a
+non-blocking put per subscriber, so ingest never waits on a slow client. The
+subscriber's sender collects events over a short window and ships them as one
+frame, so a capture burst of 1,000 requests becomes a handful of frames per client.
+
+In-process only — like the other background pieces, this assumes a SINGLE
+Uvicorn worker.
+"""
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Set
+from app.config import CAPTURE_LIVE_QUEUE_SIZE, CAPTURE_LIVE_BATCH_WINDOW_MS
+from app.shared.streaming import DropOldestQueue
+
+MAX_BATCH_EVENTS = 500
+
+
+@dataclass
+class LiveFilter:
+    domain: Optional[str] = None
+    methods: Optional[Set[str]] = None
+    status_codes: Optional[Set[int]] = None
+
+    def matches(self, data: Dict[str, Any]) -> bool:
+        if self.domain and data.get("domain") != self.domain:
+            return False
+        if self.methods and (data.get("method") or "").upper() not in self.methods:
+            return False
+        if self.status_codes and data.get("status_code") not in self.status_codes:
+            return False
+        return True
+
+
+@dataclass(eq=False)
+class Subscriber:
+    filter: LiveFilter
+    queue: DropOldestQueue = field(default_factory=lambda: DropOldestQueue(CAPTURE_LIVE_QUEUE_SIZE))
+
+    async def next_frame(self) -> Dict[str, Any]:
+        """Block until at least one event is queued, then return one batched frame.
+
+        A single event keeps the legacy {"type": "NEW_REQUEST"} shape; bursts are
+        sent as {"type": "NEW_REQUEST_BATCH", "data": [...]}. `dropped` reports how
+        many events this client lost to the drop-oldest policy since the last frame.
+        """
+        events = await self.queue.get_batch(CAPTURE_LIVE_BATCH_WINDOW_MS / 1000, MAX_BATCH_EVENTS)
+        frame: Dict[str, Any] = (
+            {"type": "NEW_REQUEST", "data": events[0]} if len(events) == 1
+            else {"type": "NEW_REQUEST_BATCH", "data": events}
+        )
+        dropped = self.queue.take_dropped()
+        if dropped:
+            frame["dropped"] = dropped
+        return frame
+
+
+class CaptureBroadcaster:
+    def __init__(self):
+        self._subscribers: Set[Subscriber] = set()
+
+    def subscribe(self, live_filter: LiveFilter) -> Subscriber:
+        sub = Subscriber(live_filter)
+        self._subscribers.add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscriber):
+        self._subscribers.discard(sub)
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    async def broadcast(self, message: Dict[str, Any]):
+        """Queue a {"type": "NEW_REQUEST", "data": {...}} event for matching subscribers."""
+        data = message.get("data") or {}
+        for sub in list(self._subscribers):
+            if sub.filter.matches(data):
+                sub.queue.put(data)
+
+
+manager = CaptureBroadcaster()
+
+
+def build_filter(domain: Optional[str], methods: Optional[List[str]], status_codes: Optional[List[int]]) -> LiveFilter:
+    return LiveFilter(
+        domain=domain or None,
+        methods={m.upper() for m in methods} if methods else None,
+        status_codes=set(status_codes) if status_codes else None,
+    )
@@ -0,0 +1,59 @@
+"""Path templating for captured endpoints.
+
+Turns concrete request paths into templates so one endpoint document covers
+every site/device it was called for:
+
+    /api/sites/0b6c…-…/networksSummary   → /api/sites/{id}/networksSummary
+    /api/sites/{id}/devices/AA:BB:CC:DD:EE:FF → /api/sites/{id}/devices/{mac}
+
+Rules are (regex, placeholder) pairs matched against whole path segments, first
+match wins. Override them with CAPTURE_PATH_RULES (JSON list of [regex, placeholder]).
+"""
+import re
+import warnings
+from typing import Any, List, Pattern, Tuple
+from urllib.parse import urlparse
+from app.config import CAPTURE_PATH_RULES
+
+DEFAULT_PATH_RULES: List[Tuple[str, str]] = [
+    (r"[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}", "{id}"),  # UUID
+    (r"(?:[0-9a-fA-F]{2}[:-]){5}[0-9a-fA-F]{2}", "{mac}"),                                    # MAC
+    (r"\d+", "{id}"),                                                                        # numeric ID
+    (r"[0-9a-fA-F]{24}", "{id}"),                                                            # ObjectId-style hex
+]
+
+
+
+def _compile_rules(rules: Any) -> List[Tuple[Pattern, str]]:
+    """Compile configured rules; malformed ones warn and fall back to DEFAULT_PATH_RULES."""
+    if rules:
+        try:
+            return [(re.compile(pattern), str(placeholder)) for pattern, placeholder in rules]
+        except (TypeError, ValueError, re.error) as e:
+            warnings.warn(
+                f"[CONFIG] CAPTURE_PATH_RULES không hợp lệ ({e}); dùng rules mặc định.",
+                stacklevel=2,
+            )
+    return [(re.compile(pattern), placeholder) for pattern, placeholder in DEFAULT_PATH_RULES]
+
+
+_rules = _compile_rules(CAPTURE_PATH_RULES)
+
+
+def template_path(path: str) -> str:
+    """Replace identifier-like path segments with placeholders."""
+    segments = path.split("/")
+    for i, segment in enumerate(segments):
+        if not segment:
+            continue
+        for regex, placeholder in _rules:
+            if regex.fullmatch(segment):
+                segments[i] = placeholder
+                break
+    return "/".join(segments)
+
+
+def endpoint_key(method: str, url: str, path: str) -> str:
+    """Endpoint identity: METHOD-scheme://host/templated/path (query string dropped)."""
+    parsed = urlparse(url)
+    return f"{method.upper()}-{parsed.scheme}://{parsed.netloc}{template_path(path)}"
@@ -0,0 +1,98 @@
+"""Background retention job for the capture store.
+
+raw_logs expire through a TTL index on expire_at (set per document at insert,
+honouring RAW_LOG_RETENTION_OVERRIDES); this job backfills expire_at on legacy
+logs and enforces the RAW_LOGS_MAX_DOCS size cap, deleting the bodies only the
+rolled-over logs referenced. Long-range per-endpoint
+trends don't depend on the raw logs: endpoint_history is maintained on ingest
+(see endpoint_stats_crud), so logs can be dropped without compaction.
+
+Like the master token manager, this relies on a SINGLE Uvicorn worker.
+"""
+import asyncio
+from typing import Any, Dict, Optional
+from app.config import (
+    RAW_LOG_RETENTION_DAYS,
+    RAW_LOG_RETENTION_OVERRIDES,
+    RAW_LOGS_MAX_DOCS,
+    RETENTION_JOB_INTERVAL_MINUTES,
+)
+from app.database.bodies_crud import delete_unreferenced
+from app.database.connection import get_database
+
+_retention_task: Optional[asyncio.Task] = None
+
+ROLLOVER_BATCH_SIZE = 5000
+
+
+async def backfill_expiry() -> int:
+    """Give logs captured before retention existed an expire_at (one-off, cheap when done)."""
+    db = get_database()
+    updated = 0
+    overrides = RAW_LOG_RETENTION_OVERRIDES
+    for domain, days in list(overrides.items()) + [(None, RAW_LOG_RETENTION_DAYS)]:
+        query: Dict[str, Any] = {"expire_at": {"$exists": False}}
+        if domain is not None:
+            query["domain"] = domain
+        elif overrides:
+            query["domain"] = {"$nin": list(overrides)}
+        result = await db.raw_logs.update_many(
+            query,
+            [{"$set": {"expire_at": {"$add": ["$timestamp", days * 86400 * 1000]}}}],
+        )
+        updated += result.modified_count
+    return updated
+
+
+async def rollover() -> Dict[str, int]:
+    """Enforce RAW_LOGS_MAX_DOCS: delete the oldest logs over the cap, and the
+    bodies no remaining log or endpoint sample references."""
+    if RAW_LOGS_MAX_DOCS <= 0:
+        return {"rolled_over": 0, "bodies_deleted": 0}
+    db = get_database()
+    deleted = bodies_deleted = 0
+    excess = await db.raw_logs.estimated_document_count() - RAW_LOGS_MAX_DOCS
+    while excess > 0:
+        batch = min(excess, ROLLOVER_BATCH_SIZE)
+        oldest = await db.raw_logs.find(
+            {}, {"_id": 1, "request_body_ref": 1, "response_body_ref": 1}
+        ).sort("timestamp", 1).limit(batch).to_list(length=batch)
+        if not oldest:
+            break
+        result = await db.raw_logs.delete_many({"_id": {"$in": [log["_id"] for log in oldest]}})
+        deleted += result.deleted_count
+        bodies_deleted += await delete_unreferenced(
+            ref for log in oldest for ref in (log.get("request_body_ref"), log.get("response_body_ref"))
+        )
+        excess -= len(oldest)
+    return {"rolled_over": deleted, "bodies_deleted": bodies_deleted}
+
+
+async def run_retention_pass() -> Dict[str, int]:
+    """One full pass: enforce the size cap."""
+    result = await rollover()
+    if result["rolled_over"]:
+        print(f"[RETENTION] Rolled over {result['rolled_over']} log(s), {result['bodies_deleted']} body(ies).")
+    return result
+
+
+async def _retention_loop():
+    try:
+        backfilled = await backfill_expiry()
+        if backfilled:
+            print(f"[RETENTION] Backfilled expire_at on {backfilled} legacy log(s).")
+    except Exception as e:
+        print(f"[RETENTION] ERROR during expiry backfill: {e}")
+    while True:
+        try:
+            await run_retention_pass()
+        except Exception as e:
+            print(f"[RETENTION] ERROR during retention pass: {e}")
+        await asyncio.sleep(RETENTION_JOB_INTERVAL_MINUTES * 60)
+
+
+def start_retention_job():
+    """Start the background expiry-backfill/rollover task. Called from lifespan()."""
+    global _retention_task
+    if _retention_task is None or _retention_task.done():
+        _retention_task = asyncio.create_task(_retention_loop())
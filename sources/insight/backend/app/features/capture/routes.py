@@ -1,93 +1,214 @@
-from fastapi import APIRouter, HTTPException, Query, Request, status
-from typing import List, Optional
+import asyncio
+import json
+import tempfile
+from fastapi import APIRouter, HTTPException, Query, Request, WebSocket, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from typing import Any, Dict, List, Optional, Tuple, Union
+from urllib.parse import urlparse, parse_qs
+from app.config import ENDPOINT_STATS_RETENTION_DAYS
 from app.database.models import CapturePayload, BatchCapturePayload, AuthSessionPayload, AuthFlowBlueprint
 from app.database.crud import (
-    upsert_endpoint,
-    insert_raw_log,
+    upsert_endpoints,
+    build_raw_log,
+    insert_raw_logs,
     search_logs,
+    iter_logs,
     get_all_endpoints,
+    get_endpoint_history,
     upsert_blueprint,
     clear_all_data,
     get_log_by_id,
-    upsert_auth_session
+    upsert_auth_session,
+    raw_log_expire_at,
+    LOG_COUNT_MODES,
 )
-try:
-    from app.export.postman import generate_postman_from_logs
-except ImportError:
-    generate_postman_from_logs = None
-
-# Websocket manager — stub fallback (module not present in this deployment)
-class _NoopBroadcaster:
-    async def broadcast(self, *args, **kwargs): pass
-manager = _NoopBroadcaster()
+from app.database.bodies_crud import store_bodies, get_storage_stats
+from app.features.capture import export
+from app.features.capture.har import import_har, read_spooled, HarFormatError, HAR_IMPORT_BATCH_SIZE
+from app.features.capture.retention import run_retention_pass
+from app.features.capture.path_template import template_path, endpoint_key
+from app.features.capture.site_tags import site_id_from_path, resource_kind_from_path, sites_from_body
+from app.database.captured_sites_crud import record_captured_sites_many
+from app.database.endpoint_stats_crud import record_endpoint_samples, get_endpoint_stats, get_endpoint_stats_hourly
+from app.features.capture.live import manager, build_filter
 from datetime import datetime, timezone
 
 # Hidden router for internal tools (Extension, Dashboard)
 router = APIRouter(prefix="/api/v1", include_in_schema=False)
 
-async def _process_capture(data: CapturePayload):
-    """Helper to process a single capture payload."""
+def _prepare_capture(data: CapturePayload, captured_at: Optional[datetime]) -> Dict[str, Any]:
+    """Derive everything ingest stores for one capture (no I/O).
+
+    `captured_at` backdates imported traffic (HAR); live captures use now.
+    """
+    now = captured_at or datetime.now(timezone.utc)
     # Extract domain and path robustly if missing
     url_obj = data.url.split("/")
     domain = data.domain or (url_obj[2] if len(url_obj) > 2 else "unknown")
     path = data.path or ("/" + "/".join(url_obj[3:]).split("?")[0] if len(url_obj) > 3 else "/")
 
     # Parse query params from URL if not explicitly provided
-    from urllib.parse import urlparse, parse_qs
     parsed_url = urlparse(data.url)
     q_params = {k: v[0] for k, v in parse_qs(parsed_url.query).items()}
 
-    # Get cookies from headers
-    cookies_str = data.request_headers.get("cookie", data.request_headers.get("Cookie", ""))
-
-    # 1. Store as structured Endpoint (for documentation)
-    endpoint_id = await upsert_endpoint(
-        api_key=f"{data.method}-{data.url.split('?')[0]}", # Simple deduce key
-        domain=domain,
-        path=path,
-        method=data.method,
-        request_headers=data.request_headers or {},
-        cookies_str=cookies_str,
-        query_params=q_params,
-        response_body=data.response_body,
-        request_body=data.request_body,
-        status_code=data.status_code,
-        content_type=data.response_headers.get("content-type", "") if data.response_headers else ""
-    )
-
-    # 2. Store as Raw Log (for observability)
-    log_id = await insert_raw_log(
-        url=data.url,
-        method=data.method,
-        domain=domain,
-        path=path,
-        request_headers=data.request_headers or {},
-        request_body=data.request_body,
-        status_code=data.status_code,
-        response_headers=data.response_headers,
-        response_body=data.response_body,
-        duration_ms=data.duration_ms or 0,
-        cookies=cookies_str,
-        query_params=q_params,
-        mandatory_headers=data.mandatory_headers,
-        execution_context=data.execution_context
-    )
-
-    # 3. Broadcast to UI
-    await manager.broadcast({
-        "type": "NEW_REQUEST",
-        "data": {
-            "id": log_id,
-            "url": data.url,
-            "method": data.method,
-            "domain": domain,
-            "path": path,
-            "status_code": data.status_code,
-            "duration_ms": data.duration_ms or 0,
-            "timestamp": datetime.now(timezone.utc).isoformat()
+    return {
+        "data": data,
+        "now": now,
+        "domain": domain,
+        "path": path,
+        "q_params": q_params,
+        # Identifier segments (site UUIDs, MACs, numeric IDs) → placeholders
+        "path_template": template_path(path),
+        "site_id": site_id_from_path(path),
+        # Get cookies from headers
+        "cookies_str": data.request_headers.get("cookie", data.request_headers.get("Cookie", "")),
+        # Bodies live as long as the raw log; upsert_endpoints extends the ones
+        # that become an endpoint's sample
+        "body_expire_at": raw_log_expire_at(domain, now),
+    }
+
+
+async def _process_captures(
+    items: List[Tuple[CapturePayload, Optional[datetime]]],
+) -> List[Union[Tuple[str, str], Exception]]:
+    """Ingest captures with one batched write per collection.
+
+    Returns, per item and in order, (endpoint_id, log_id) or the exception that
+    rejected it; a bad capture doesn't affect the others.
+    """
+    results: List[Union[Tuple[str, str], Exception]] = []
+    prepared = []
+    for data, captured_at in items:
+        try:
+            prepared.append(_prepare_capture(data, captured_at))
+            results.append(None)
+        except Exception as e:
+            results.append(e)
+    if not prepared:
+        return results
+    slots = [i for i, r in enumerate(results) if r is None]
+
+    # 0. Store bodies once (content-addressed) — one bulk write for the batch
+    refs = await store_bodies([
+        (body, p["body_expire_at"]) for p in prepared for body in (p["data"].request_body, p["data"].response_body)
+    ])
+
+    # 1. Store as structured Endpoints (for documentation)
+    endpoint_ids = await upsert_endpoints([
+        {
+            "api_key": endpoint_key(p["data"].method, p["data"].url, p["path"]),
+            "domain": p["domain"],
+            "path": p["path_template"],
+            "sample_path": p["path"],
+            "method": p["data"].method,
+            "request_headers": p["data"].request_headers or {},
+            "cookies_str": p["cookies_str"],
+            "query_params": p["q_params"],
+            "request_body_ref": refs[2 * i],
+            "response_body_ref": refs[2 * i + 1],
+            "status_code": p["data"].status_code,
+            "content_type": p["data"].response_headers.get("content-type", "") if p["data"].response_headers else "",
         }
-    })
-    return endpoint_id, log_id
+        for i, p in enumerate(prepared)
+    ])
+
+    # 2. Store as Raw Logs (for observability)
+    log_ids = await insert_raw_logs([
+        build_raw_log(
+            url=p["data"].url,
+            method=p["data"].method,
+            domain=p["domain"],
+            path=p["path"],
+            path_template=p["path_template"],
+            request_headers=p["data"].request_headers or {},
+            request_body=p["data"].request_body,
+            status_code=p["data"].status_code,
+            response_headers=p["data"].response_headers,
+            response_body=p["data"].response_body,
+            duration_ms=p["data"].duration_ms or 0,
+            cookies=p["cookies_str"],
+            query_params=p["q_params"],
+            mandatory_headers=p["data"].mandatory_headers,
+            execution_context=p["data"].execution_context,
+            request_body_ref=refs[2 * i],
+            response_body_ref=refs[2 * i + 1],
+            site_id=p["site_id"],
+            resource_kind=resource_kind_from_path(p["path"]),
+            timestamp=p["now"],
+        )
+        for i, p in enumerate(prepared)
+    ])
+    stored = []
+    for slot, p, endpoint_id, log_id in zip(slots, prepared, endpoint_ids, log_ids):
+        if log_id is None:
+            results[slot] = RuntimeError("raw log rejected by MongoDB")
+        else:
+            results[slot] = (endpoint_id, log_id)
+            stored.append((p, log_id))
+
+    # 3. Maintain captured_sites (cloner "captured source" reads it instead of raw_logs)
+    await record_captured_sites_many([
+        (
+            p["now"],
+            p["site_id"],
+            sites_from_body(p["data"].url, p["data"].response_body) if p["data"].status_code < 400 else [],
+        )
+        for p, _ in stored
+    ])
+
+    # 4. Hourly + daily latency/status rollups for the endpoints
+    await record_endpoint_samples([
+        {
+            "domain": p["domain"],
+            "method": p["data"].method,
+            "path": p["path_template"],
+            "status_code": p["data"].status_code,
+            "duration_ms": p["data"].duration_ms or 0,
+            "timestamp": p["now"],
+        }
+        for p, _ in stored
+    ])
+
+    # 5. Broadcast to UI
+    for p, log_id in stored:
+        await manager.broadcast({
+            "type": "NEW_REQUEST",
+            "data": {
+                "id": log_id,
+                "url": p["data"].url,
+                "method": p["data"].method,
+                "domain": p["domain"],
+                "path": p["path"],
+                "status_code": p["data"].status_code,
+                "duration_ms": p["data"].duration_ms or 0,
+                "timestamp": p["now"].isoformat()
+            }
+        })
+    return results
+
+async def _process_capture(data: CapturePayload, captured_at: Optional[datetime] = None) -> Tuple[str, str]:
+    """Helper to process a single capture payload; returns (endpoint_id, log_id)."""
+    result = (await _process_captures([(data, captured_at)]))[0]
+    if isinstance(result, Exception):
+        raise result
+    return result
+
+async def ingest_captures(items: List[Tuple[CapturePayload, Optional[datetime]]]) -> Tuple[int, int]:
+    """Bulk ingest path shared by /capture/batch and HAR import.
+
+    The batch is written with one round-trip per collection; one failing capture
+    is logged and counted without aborting the rest. Returns (processed, failed).
+    """
+    try:
+        results = await _process_captures(items)
+    except Exception as e:
+        print(f"[BATCH ERROR] Batch of {len(items)} capture(s) failed: {e}")
+        return 0, len(items)
+    failed = [r for r in results if isinstance(r, Exception)]
+    for e in failed[:3]:
+        print(f"[BATCH ERROR] Skipping individual request failure: {e}")
+    return len(results) - len(failed), len(failed)
 
 @router.post("/capture", status_code=status.HTTP_201_CREATED)
 async def capture_request(data: CapturePayload):
@@ -104,14 +225,108 @@ async def capture_request(data: CapturePayload):
 @router.post("/capture/batch", status_code=status.HTTP_201_CREATED)
 async def capture_batch(data: BatchCapturePayload):
     """Handle multiple captured requests at once."""
-    results = []
-    for req in data.requests:
+    processed, _ = await ingest_captures([(req, None) for req in data.requests])
+    return {"status": "success", "processed": processed}
+
+HAR_SPOOL_MEMORY_BYTES = 8 * 1024 * 1024
+
+@router.post("/capture/har")
+async def capture_har_import(request: Request, batch_size: int = Query(HAR_IMPORT_BATCH_SIZE, ge=1, le=5000)):
+    """
+    Import a HAR file sent as the raw request body (e.g. curl --data-binary @file.har).
+    The response is NDJSON progress lines, the last one being the final summary.
+    Hidden from Swagger.
+    """
+    # Spool the upload (to disk beyond a few MB) before responding: a streaming
+    # response listens on the same receive channel, so the body can't be read
+    # from inside it. Parsing the spool is still incremental.
+    spool = tempfile.SpooledTemporaryFile(max_size=HAR_SPOOL_MEMORY_BYTES)
+    async for chunk in request.stream():
+        await run_in_threadpool(spool.write, chunk)
+
+    async def _progress():
         try:
-            eid, lid = await _process_capture(req)
-            results.append({"endpoint_id": eid, "log_id": lid})
-        except Exception as e:
-            print(f"[BATCH ERROR] Skipping individual request failure: {e}")
-    return {"status": "success", "processed": len(results)}
+            async for report in import_har(read_spooled(spool), ingest_captures, batch_size):
+                yield json.dumps(report) + "\n"
+        except (HarFormatError, ValueError) as e:
+            yield json.dumps({"error": f"Invalid HAR file: {e}"}) + "\n"
+
+    return StreamingResponse(_progress(), media_type="application/x-ndjson")
+
+def _live_filter(domain: Optional[str], method: Optional[str], status_filter: Optional[str]):
+    """Same method/status syntax as GET /logs (e.g. method=GET,POST&status=4,500)."""
+    method_list, status_list, _, _ = _parse_log_filters(method, status_filter, None, None)
+    return build_filter(domain, method_list, status_list)
+
+@router.websocket("/capture/ws")
+async def capture_live_ws(
+    websocket: WebSocket,
+    domain: Optional[str] = None,
+    method: Optional[str] = None,
+    status: Optional[str] = None,
+):
+    """Live captured traffic over WebSocket, filtered server-side and batched."""
+    try:
+        live_filter = _live_filter(domain, method, status)
+    except ValueError:
+        await websocket.close(code=1008)
+        return
+
+    await websocket.accept()
+    sub = manager.subscribe(live_filter)
+
+    async def _pump():
+        while True:
+            frame = await sub.next_frame()
+            await websocket.send_text(json.dumps(frame, default=str))
+
+    pump = asyncio.create_task(_pump())
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+    finally:
+        pump.cancel()
+        manager.unsubscribe(sub)
+
+SSE_KEEPALIVE_SECONDS = 15
+
+@router.get("/capture/stream")
+async def capture_live_sse(
+    domain: Optional[str] = None,
+    method: Optional[str] = None,
+    status_filter: Optional[str] = Query(None, alias="status"),
+):
+    """Live captured traffic as Server-Sent Events (same frames as /capture/ws)."""
+    try:
+        live_filter = _live_filter(domain, method, status_filter)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid status filter")
+
+    sub = manager.subscribe(live_filter)
+
+    async def _events():
+        pending = None
+        try:
+            while True:
+                pending = pending or asyncio.ensure_future(sub.next_frame())
+                done, _ = await asyncio.wait({pending}, timeout=SSE_KEEPALIVE_SECONDS)
+                if not done:
+                    yield ": keepalive\n\n"
+                    continue
+                frame, pending = pending.result(), None
+                yield f"event: {frame['type']}\ndata: {json.dumps(frame, default=str)}\n\n"
+        finally:
+            if pending:
+                pending.cancel()
+            manager.unsubscribe(sub)
+
+    return StreamingResponse(
+        _events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 @router.post("/auth-session", status_code=status.HTTP_201_CREATED)
 async def capture_auth_session(data: AuthSessionPayload):
@@ -159,41 +374,52 @@ async def capture_blueprint(blueprint: AuthFlowBlueprint):
         print(f"[BLUEPRINT ERROR] {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.get("/logs/export/postman")
-async def export_logs_postman(
-    limit: int = 5000,
-    skip: int = 0,
-    domain: Optional[str] = None,
-    keyword: Optional[str] = None,
-    method: Optional[str] = None,
-    status: Optional[str] = None,
-    log_ids: Optional[str] = Query(None, alias="ids"),
-    from_date: Optional[str] = Query(None, alias="from"),
-    to_date: Optional[str] = Query(None, alias="to")
+def _parse_log_filters(
+    method: Optional[str],
+    status: Optional[str],
+    from_date: Optional[str],
+    to_date: Optional[str],
 ):
-    """
-    Export captured logs as a Postman Collection v2.1.
-    """
-    ids_list = log_ids.split(",") if log_ids else None
-
-    # Reuse filtering logic
+    """Parse comma-separated method/status filters and ISO date bounds."""
     method_list = method.split(",") if method else None
+
     status_list = []
     if status:
         for s in status.split(","):
-            if len(s) == 1: status_list.extend([int(f"{s}{i:02d}") for i in range(100)])
-            else: status_list.append(int(s))
+            if len(s) == 1: # Group match like '2' for 2xx
+                status_list.extend([int(f"{s}{i:02d}") for i in range(100)])
+            else:
+                status_list.append(int(s))
 
     f_date = None
     if from_date:
-        try: f_date = datetime.fromisoformat(from_date.replace("Z", "+00:00"))
+        try:
+            f_date = datetime.fromisoformat(from_date.replace("Z", "+00:00"))
         except: pass
+
     t_date = None
     if to_date:
-        try: t_date = datetime.fromisoformat(to_date.replace("Z", "+00:00"))
+        try:
+            t_date = datetime.fromisoformat(to_date.replace("Z", "+00:00"))
         except: pass
 
-    logs, _ = await search_logs(
+    return method_list, status_list, f_date, t_date
+
+
+async def _open_export_stream(
+    limit: Optional[int],
+    skip: int,
+    domain: Optional[str],
+    keyword: Optional[str],
+    method: Optional[str],
+    status: Optional[str],
+    log_ids: Optional[str],
+    from_date: Optional[str],
+    to_date: Optional[str],
+):
+    """Open a log cursor for export and fetch the first document (404 if none)."""
+    method_list, status_list, f_date, t_date = _parse_log_filters(method, status, from_date, to_date)
+    logs = iter_logs(
         limit=limit,
         skip=skip,
         domain=domain,
@@ -202,22 +428,21 @@ async def export_logs_postman(
         status_code=status_list,
         from_date=f_date,
         to_date=t_date,
-        log_ids=ids_list
+        log_ids=log_ids.split(",") if log_ids else None
     )
-
-    if not logs:
+    first = await anext(logs, None)
+    if first is None:
         raise HTTPException(status_code=404, detail="No logs found matching criteria")
+    return first, logs
 
-    collection = generate_postman_from_logs(
-        logs,
-        collection_name=f"Captured Traffic - {datetime.now().strftime('%Y-%m-%d %H:%M')}"
-    )
 
-    return collection
+def _attachment(filename: str) -> dict:
+    return {"Content-Disposition": f'attachment; filename="{filename}"'}
 
-@router.get("/logs/export/json")
-async def export_logs_json(
-    limit: int = 5000,
+
+@router.get("/logs/export/postman")
+async def export_logs_postman(
+    limit: Optional[int] = None,
     skip: int = 0,
     domain: Optional[str] = None,
     keyword: Optional[str] = None,
@@ -228,41 +453,56 @@ async def export_logs_json(
     to_date: Optional[str] = Query(None, alias="to")
 ):
     """
-    Export captured logs as raw JSON.
+    Export captured logs as a Postman Collection v2.1, streamed from the cursor.
     """
-    ids_list = log_ids.split(",") if log_ids else None
-    method_list = method.split(",") if method else None
-    status_list = []
-    if status:
-        for s in status.split(","):
-            if len(s) == 1: status_list.extend([int(f"{s}{i:02d}") for i in range(100)])
-            else: status_list.append(int(s))
-
-    f_date = None
-    if from_date:
-        try: f_date = datetime.fromisoformat(from_date.replace("Z", "+00:00"))
-        except: pass
-    t_date = None
-    if to_date:
-        try: t_date = datetime.fromisoformat(to_date.replace("Z", "+00:00"))
-        except: pass
-
-    logs, _ = await search_logs(
-        limit=limit,
-        skip=skip,
-        domain=domain,
-        keyword=keyword,
-        method=method_list,
-        status_code=status_list,
-        from_date=f_date,
-        to_date=t_date,
-        log_ids=ids_list
+    first, logs = await _open_export_stream(limit, skip, domain, keyword, method, status, log_ids, from_date, to_date)
+    stamp = datetime.now().strftime('%Y-%m-%d %H:%M')
+    return StreamingResponse(
+        export.postman_stream(first, logs, collection_name=f"Captured Traffic - {stamp}"),
+        media_type="application/json",
+        headers=_attachment("captured_traffic.postman_collection.json"),
     )
 
-    if not logs:
-        raise HTTPException(status_code=404, detail="No logs found matching criteria")
+@router.get("/logs/export/json")
+async def export_logs_json(
+    limit: Optional[int] = None,
+    skip: int = 0,
+    domain: Optional[str] = None,
+    keyword: Optional[str] = None,
+    method: Optional[str] = None,
+    status: Optional[str] = None,
+    log_ids: Optional[str] = Query(None, alias="ids"),
+    from_date: Optional[str] = Query(None, alias="from"),
+    to_date: Optional[str] = Query(None, alias="to"),
+    format: str = "json", # json | ndjson
+):
+    """
+    Export captured logs as raw JSON ({"exported_at", "logs": [...]}) or NDJSON,
+    streamed from the cursor with no row cap.
+    """
+    if format not in ("json", "ndjson"):
+        raise HTTPException(status_code=400, detail="format must be 'json' or 'ndjson'")
+
+    first, logs = await _open_export_stream(limit, skip, domain, keyword, method, status, log_ids, from_date, to_date)
+    if format == "ndjson":
+        return StreamingResponse(
+            export.ndjson_stream(first, logs),
+            media_type="application/x-ndjson",
+            headers=_attachment("captured_logs.ndjson"),
+        )
+    return StreamingResponse(
+        export.json_stream(first, logs),
+        media_type="application/json",
+        headers=_attachment("captured_logs.json"),
+    )
 
-    return {"logs": logs, "exported_at": datetime.now(timezone.utc).isoformat()}
+@router.get("/logs/storage-stats")
+async def get_log_storage_stats():
+    """
+    Report body storage savings from content-addressed compression.
+    Hidden from Swagger.
+    """
+    return await get_storage_stats()
 
 @router.get("/logs/{log_id}")
 async def get_log(log_id: str):
@@ -284,34 +524,20 @@ async def get_logs(
     method: Optional[str] = None, # Comma separated: GET,POST
     status: Optional[str] = None, # Comma separated: 200,404 or first digit: 2,4
     from_date: Optional[str] = Query(None, alias="from"),
-    to_date: Optional[str] = Query(None, alias="to")
+    to_date: Optional[str] = Query(None, alias="to"),
+    count: str = "exact", # exact | estimated | none
 ):
     """
     Retrieve logs for Dashboard with advanced filtering.
     Hidden from Swagger.
-    """
-    method_list = method.split(",") if method else None
-
-    status_list = []
-    if status:
-        for s in status.split(","):
-            if len(s) == 1: # Group match like '2' for 2xx
-                status_list.extend([int(f"{s}{i:02d}") for i in range(100)])
-            else:
-                status_list.append(int(s))
 
-    # Parse dates
-    f_date = None
-    if from_date:
-        try:
-            f_date = datetime.fromisoformat(from_date.replace("Z", "+00:00"))
-        except: pass
+    `count` controls how `total` is computed: exact (briefly cached per filter),
+    estimated (metadata or capped count) or none (total is null, use has_more).
+    """
+    if count not in LOG_COUNT_MODES:
+        raise HTTPException(status_code=400, detail=f"count must be one of {list(LOG_COUNT_MODES)}")
 
-    t_date = None
-    if to_date:
-        try:
-            t_date = datetime.fromisoformat(to_date.replace("Z", "+00:00"))
-        except: pass
+    method_list, status_list, f_date, t_date = _parse_log_filters(method, status, from_date, to_date)
 
     logs, total = await search_logs(
         limit=limit,
@@ -321,9 +547,14 @@ async def get_logs(
         method=method_list,
         status_code=status_list,
         from_date=f_date,
-        to_date=t_date
+        to_date=t_date,
+        count=count
     )
-    return {"logs": logs, "total": total}
+    if count == "exact":
+        has_more = skip + len(logs) < total
+    else:
+        has_more = len(logs) == limit
+    return {"logs": logs, "total": total, "count_mode": count, "has_more": has_more}
 
 @router.get("/endpoints")
 async def get_captured_endpoints(limit: int = 100, skip: int = 0):
@@ -334,6 +565,65 @@ async def get_captured_endpoints(limit: int = 100, skip: int = 0):
     endpoints, total = await get_all_endpoints(limit=limit, skip=skip)
     return {"data": endpoints, "total": total}
 
+@router.get("/endpoints/history")
+async def get_captured_endpoint_history(
+    domain: Optional[str] = None,
+    method: Optional[str] = None,
+    path: Optional[str] = None,
+    days: int = 30,
+):
+    """
+    Daily per-endpoint statistics, kept after the raw logs expire.
+    Hidden from Swagger.
+    """
+    history = await get_endpoint_history(domain=domain, method=method, path=path, days=days)
+    return {"data": history, "total": len(history)}
+
+ENDPOINT_STATS_SORTS = ("p50", "p95", "p99", "avg_duration_ms", "error_rate", "count")
+
+@router.get("/endpoints/stats")
+async def get_captured_endpoint_stats(
+    domain: Optional[str] = None,
+    method: Optional[str] = None,
+    path: Optional[str] = None,
+    hours: int = Query(24, ge=1, le=24 * ENDPOINT_STATS_RETENTION_DAYS),
+    sort: str = "p95",
+    limit: int = Query(100, ge=1, le=1000),
+):
+    """
+    Per-endpoint latency percentiles (p50/p95/p99), error rate and status counts
+    over the last `hours` (at most ENDPOINT_STATS_RETENTION_DAYS), slowest first.
+    Hidden from Swagger.
+    """
+    if sort not in ENDPOINT_STATS_SORTS:
+        raise HTTPException(status_code=400, detail=f"sort must be one of {', '.join(ENDPOINT_STATS_SORTS)}")
+    stats = await get_endpoint_stats(domain=domain, method=method, path=path, hours=hours, sort=sort, limit=limit)
+    return {"data": stats, "total": len(stats)}
+
+@router.get("/endpoints/stats/hourly")
+async def get_captured_endpoint_stats_hourly(
+    domain: str,
+    method: str,
+    path: str,
+    hours: int = Query(24, ge=1, le=24 * ENDPOINT_STATS_RETENTION_DAYS),
+):
+    """
+    Hourly latency/status series for one endpoint (templated path).
+    Hidden from Swagger.
+    """
+    series = await get_endpoint_stats_hourly(domain=domain, method=method, path=path, hours=hours)
+    return {"data": series, "total": len(series)}
+
+@router.post("/logs/rollover")
+async def rollover_logs():
+    """
+    Run a retention pass now: roll over the oldest raw logs beyond RAW_LOGS_MAX_DOCS
+    (and their no longer referenced bodies).
+    Hidden from Swagger.
+    """
+    result = await run_retention_pass()
+    return {"status": "success", **result}
+
 @router.delete("/logs")
 async def clear_logs():
     """
@@ -0,0 +1,52 @@
+"""Ingest-time extraction of Aruba site references from captured traffic.
+
+Runs once per capture so readers (cloner "captured source", ...) can use
+indexed fields instead of regex scans and body re-parsing over raw_logs.
+"""
+import re
+from typing import Any, Dict, List, Optional
+
+_SITE_IN_PATH_RE = re.compile(r"/sites/([a-f0-9-]{36})(?:/|$)", re.IGNORECASE)
+_SITES_LIST_RE = re.compile(r"api/v1/.*sites|/sites/?$")
+
+
+def site_id_from_path(path: str) -> Optional[str]:
+    """Site UUID addressed by a request path (/api/sites/<uuid>/...), if any."""
+    match = _SITE_IN_PATH_RE.search(path or "")
+    return match.group(1).lower() if match else None
+
+
+def resource_kind_from_path(path: str) -> Optional[str]:
+    """Site resource a request targets: the segment after the site UUID.
+
+    /api/sites/<uuid>/networksSummary → "networksSummary"; None when the path
+    does not address a site resource.
+    """
+    match = _SITE_IN_PATH_RE.search(path or "")
+    if not match:
+        return None
+    rest = (path or "")[match.end():].split("?")[0]
+    segment = rest.split("/", 1)[0]
+    return segment or None
+
+
+def sites_from_body(url: str, body: Any) -> List[Dict[str, str]]:
+    """Named sites listed in a sites-list style response body.
+
+    Handles {"elements": [...]} envelopes and single-site objects, with either
+    siteId/siteName or id/name keys (the latter only on */sites listings).
+    """
+    if not isinstance(body, dict) or not _SITES_LIST_RE.search(url.split("?")[0]):
+        return []
+    elements = body.get("elements") if isinstance(body.get("elements"), list) else [body]
+    is_listing = url.split("?")[0].rstrip("/").endswith("/sites")
+
+    sites = []
+    for s in elements:
+        if not isinstance(s, dict):
+            continue
+        site_id = s.get("siteId") or (s.get("id") if is_listing else None)
+        name = s.get("siteName") or (s.get("name") if is_listing else None)
+        if site_id:
+            sites.append({"site_id": str(site_id).lower(), "site_name": name})
+    return sites
@@ -112,65 +112,32 @@ async def fetch_site_config_live(site_id: str, aruba_token: str) -> Dict[str, An
         return {"error": f"Live fetch exception: {str(e)}"}
 
 async def get_captured_sites() -> List[Dict[str, Any]]:
-    """Extract unique site IDs and names from raw logs using multiple patterns."""
-    db = get_database()
-    import re
-
-    # Pattern 1: Direct sites list (/api/v1/sites or /api/v1/customers/.../sites)
-    cursor = db.raw_logs.find(
-        {"url": {"$regex": "api/v1/.*sites"}},
-        {"response_body": 1, "timestamp": 1, "url": 1}
-    ).sort("timestamp", -1)
-
-    sites = {}
-    async for doc in cursor:
-        body = doc.get("response_body")
-        if not body or not isinstance(body, dict): continue
-        # Handle { "elements": [...] } or direct list
-        elements = body.get("elements", []) if isinstance(body.get("elements"), list) else ([body] if body.get("siteId") else [])
-        for s in elements:
-            s_id = s.get("siteId")
-            if s_id and s_id not in sites:
-                sites[s_id] = {
-                    "siteId": s_id,
-                    "siteName": s.get("siteName", "Unknown Site"),
-                    "captured_at": doc.get("timestamp")
-                }
-
-    # Pattern 2: Extract Site ID from URLs (e.g. .../sites/{siteId}/dashboard)
-    cursor_url = db.raw_logs.find(
-        {"url": {"$regex": "/sites/[a-f0-9-]{36}"}},
-        {"url": 1, "timestamp": 1}
-    ).sort("timestamp", -1).limit(200)
-
-    async for doc in cursor_url:
-        match = re.search(r"sites/([a-f0-9-]{36})", doc["url"])
-        if match:
-            s_id = match.group(1)
-            if s_id not in sites:
-                sites[s_id] = {
-                    "siteId": s_id,
-                    "siteName": f"Site {s_id[:8]}",
-                    "captured_at": doc.get("timestamp")
-                }
+    """Sites seen in captured traffic, newest first (captured_sites, maintained at ingest)."""
+    from app.database.captured_sites_crud import list_captured_sites
+    return await list_captured_sites()
 
-    return sorted(list(sites.values()), key=lambda x: x["captured_at"], reverse=True)
+CAPTURED_CONFIG_RESOURCES = ["networksSummary", "wiredNetworks"]
 
 async def fetch_site_config(site_id: str) -> Dict[str, Any]:
     """Retrieve the latest captured wired/wireless config for a site."""
     db = get_database()
-    # Flexible match for networksSummary or wiredNetworks anywhere in URL
+    # site_id / resource_kind are tagged at ingest — covered by the partial
+    # site_config_lookup index (every predicate and projected field is in it),
+    # no URL regex scan and no document fetch
     cursor = db.raw_logs.find({
-        "url": {"$regex": f"sites/{site_id}/(networksSummary|wiredNetworks)"},
+        "site_id": site_id.lower(),
+        "resource_kind": {"$exists": True, "$in": CAPTURED_CONFIG_RESOURCES},
         "method": "GET",
         "status_code": 200
-    }).sort("timestamp", -1).limit(1)
+    }, {"_id": 0, "response_body_ref": 1, "timestamp": 1}).sort("timestamp", -1).limit(1)
 
     log = await cursor.to_list(length=1)
     if not log:
         return {"error": "No configuration found for this site ID in logs."}
 
-    return log[0].get("response_body", {})
+    from app.database.bodies_crud import hydrate_docs
+    await hydrate_docs(log, {"response_body_ref": "response_body"})
+    return log[0].get("response_body") or {}
 
 async def apply_config_to_site(target_site_id: str, config: Dict[str, Any]):
     """
@@ -939,7 +906,7 @@ async def batch_account_precheck(email: str, target_site_ids: List[str], master_
 
 async def batch_account_access(action_type: str, email: str, role: str, target_site_ids: List[str], master_token: str, actor_email: str = "anonymous") -> List[Dict]:
     import asyncio
-    from app.database.auth_crud import insert_audit_log
+    from app.shared.audit_sink import audit_sink
     from datetime import datetime, timezone
     api_headers = {"Authorization": f"Bearer {master_token}"}
     results = []
@@ -964,7 +931,7 @@ async def batch_account_access(action_type: str, email: str, role: str, target_s
                 results.append({"target": site_id, "status": "ERROR", "detail": str(e)})
                 
             # Insert Audit Log for each site
-            await insert_audit_log({
+            audit_sink.submit({
                 "timestamp": datetime.now(timezone.utc),
                 "insight_user_id": actor_email,
                 "admin_master_id": "Master System",
@@ -980,7 +947,7 @@ async def batch_account_access(action_type: str, email: str, role: str, target_s
 
 async def batch_site_delete(target_site_ids: List[str], master_token: str, actor_email: str = "anonymous") -> List[Dict]:
     import asyncio
-    from app.database.auth_crud import insert_audit_log
+    from app.shared.audit_sink import audit_sink
     from datetime import datetime, timezone
     api_headers = {"Authorization": f"Bearer {master_token}"}
     results = []
@@ -1002,7 +969,7 @@ async def batch_site_delete(target_site_ids: List[str], master_token: str, actor
                 results.append({"target": site_id, "status": "ERROR", "detail": str(e)})
                 
             # Insert Audit Log for each site
-            await insert_audit_log({
+            audit_sink.submit({
                 "timestamp": datetime.now(timezone.utc),
                 "insight_user_id": actor_email,
                 "admin_master_id": "Master System",
@@ -1027,7 +994,7 @@ async def batch_site_provision(
     actor_email: str = "anonymous"
 ) -> List[Dict]:
     import asyncio
-    from app.database.auth_crud import insert_audit_log
+    from app.shared.audit_sink import audit_sink
     from datetime import datetime, timezone
     api_headers = {"Authorization": f"Bearer {master_token}", "X-ION-API-VERSION": "23"}
     results = []
@@ -1069,7 +1036,7 @@ async def batch_site_provision(
                 results.append({"target": site_name, "status": "ERROR", "detail": str(e)})
                 
             # Insert Audit Log for each site
-            await insert_audit_log({
+            audit_sink.submit({
                 "timestamp": datetime.now(timezone.utc),
                 "insight_user_id": actor_email,
                 "admin_master_id": "Master System",
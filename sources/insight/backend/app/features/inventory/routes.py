@@ -1,7 +1,13 @@
-from fastapi import APIRouter, Depends
-from typing import List, Dict, Any
-from app.features.inventory.schemas import DeviceResponse
+from datetime import datetime, timezone, timedelta
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import JSONResponse
+from typing import List, Dict, Any, Optional
+from app.database.device_changes_crud import DEVICE_CHANGE_TYPES, list_device_changes
+from app.database.snapshots_crud import get_site_snapshots
+from app.database.zones_crud import get_site_ids_for_zones
+from app.features.inventory.schemas import DeviceResponse, DeviceStatus, DeviceType, FleetInventoryResponse
 from app.features.inventory.service import inventory_service
+from app.features.overview.service import overview_service
 from app.shared.auth_deps import get_current_insight_user, require_master_token
 
 router = APIRouter(prefix="/api/v1/inventory", tags=["Inventory"])
@@ -13,4 +19,65 @@ async def get_devices(
     user: Dict[str, Any] = Depends(get_current_insight_user),
     master_token: str = Depends(require_master_token),
 ):
-    return await inventory_service.get_site_devices(site_id, master_token)
+    devices, collected_at = await inventory_service.get_site_devices(site_id, master_token)
+    headers = {"X-Collected-At": collected_at.isoformat()} if collected_at else None
+    # Records are already in the response_model shape; returning a Response skips re-validation
+    return JSONResponse([d.to_dict() for d in devices], headers=headers)
+
+
+@router.get("/devices", response_model=FleetInventoryResponse)
+async def get_fleet_devices(
+    status: Optional[DeviceStatus] = None,
+    type: Optional[DeviceType] = None,
+    q: Optional[str] = Query(None, description="Serial number or MAC prefix"),
+    page: int = Query(1, ge=1),
+    page_size: int = Query(100, ge=1, le=1000),
+    user: Dict[str, Any] = Depends(get_current_insight_user),
+    master_token: str = Depends(require_master_token),
+):
+    """Every device across every site the caller can see (zone-filtered)."""
+    sites, _ = await overview_service.get_sites(master_token, user["email"])
+    return JSONResponse(await inventory_service.get_fleet_devices(
+        sites,
+        master_token,
+        status=status,
+        device_type=type,
+        id_prefix=q,
+        page=page,
+        page_size=page_size,
+    ))
+
+
+@router.get("/changes")
+async def get_device_changes(
+    zone_id: Optional[str] = None,
+    site_id: Optional[str] = None,
+    hours: int = Query(24, ge=1, le=24 * 90),
+    change: Optional[str] = Query(None, description="Comma-separated, e.g. status,reboot"),
+    limit: int = Query(500, ge=1, le=5000),
+    user: Dict[str, Any] = Depends(get_current_insight_user),
+):
+    """Device changes (added / removed / status / firmware / reboot) in the last `hours`, newest first."""
+    changes = [c.strip() for c in change.split(",") if c.strip()] if change else None
+    if changes and any(c not in DEVICE_CHANGE_TYPES for c in changes):
+        raise HTTPException(
+            status_code=400, detail=f"change không hợp lệ. Chọn: {', '.join(DEVICE_CHANGE_TYPES)}"
+        )
+
+    site_ids = await overview_service.visible_site_ids(user)
+    if zone_id:
+        zone_sites = set(await get_site_ids_for_zones([zone_id]))
+        site_ids = zone_sites if site_ids is None else site_ids & zone_sites
+    if site_id:
+        site_ids = {site_id} if site_ids is None else site_ids & {site_id}
+
+    events = await list_device_changes(
+        site_ids, datetime.now(timezone.utc) - timedelta(hours=hours), changes=changes, limit=limit
+    )
+    site_names = {
+        doc["_id"]: (doc.get("site") or {}).get("siteName")
+        for doc in await get_site_snapshots(list({e["site_id"] for e in events}), {"site.siteName": 1})
+    }
+    for event in events:
+        event["site_name"] = site_names.get(event["site_id"])
+    return {"status": "success", "changes": events}
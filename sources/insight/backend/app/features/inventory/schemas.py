@@ -1,5 +1,7 @@
 from pydantic import BaseModel, HttpUrl
-from typing import Optional, List
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional, List, Dict, Any
 from enum import Enum
 
 class DeviceStatus(str, Enum):
@@ -38,3 +40,55 @@ class DeviceResponse(DeviceBase):
     """
     uptime_seconds: Optional[int] = 0
     client_count: int = 0
+    firmware_version: Optional[str] = None
+
+@dataclass(slots=True)
+class DeviceRecord:
+    """
+    Internal, unvalidated form of DeviceResponse (same fields, status/type as
+    their enum values). The inventory service builds these instead of Pydantic
+    models so large fleets are normalized and serialized without per-device
+    validation; the response models stay the documented API shape.
+    """
+    id: str
+    name: str
+    status: str
+    type: str
+    serial_number: Optional[str]
+    mac_address: Optional[str]
+    site_id: str
+    uptime_seconds: Optional[int] = 0
+    client_count: int = 0
+    firmware_version: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "name": self.name,
+            "status": self.status,
+            "type": self.type,
+            "serial_number": self.serial_number,
+            "mac_address": self.mac_address,
+            "site_id": self.site_id,
+            "uptime_seconds": self.uptime_seconds,
+            "client_count": self.client_count,
+            "firmware_version": self.firmware_version,
+        }
+
+class FleetDeviceResponse(DeviceResponse):
+    site_name: Optional[str] = None
+
+class SiteFetchError(BaseModel):
+    site_id: str
+    site_name: Optional[str] = None
+    error: str
+
+class FleetInventoryResponse(BaseModel):
+    """One page of the merged fleet inventory plus per-site fetch failures."""
+    devices: List[FleetDeviceResponse]
+    total: int
+    page: int
+    page_size: int
+    sites_total: int
+    sites_failed: List[SiteFetchError] = []
+    collected_at: Optional[datetime] = None  # oldest snapshot used
@@ -1,13 +1,73 @@
-from typing import List, Dict, Any
+import asyncio
+from datetime import datetime, timezone
+from typing import List, Dict, Any, Optional, Tuple
+from app.config import SNAPSHOT_MAX_AGE_SECONDS
+from app.database.snapshots_crud import get_site_snapshots, is_fresh
 from app.shared.aruba import aruba_service
-from app.features.inventory.schemas import DeviceResponse, DeviceStatus, DeviceType
+from app.features.inventory.schemas import DeviceRecord, DeviceStatus, DeviceType
+
+
+# Aruba device state -> DeviceStatus value; anything else is "unknown"
+_STATUS_BY_STATE = {
+    "ONLINE": DeviceStatus.ONLINE.value,
+    "ACTIVE": DeviceStatus.ONLINE.value,
+    "OFFLINE": DeviceStatus.OFFLINE.value,
+    "DOWN": DeviceStatus.OFFLINE.value,
+    "ALERT": DeviceStatus.ALERT.value,
+    "PROBLEM": DeviceStatus.ALERT.value,
+}
+
+# Aruba deviceType -> DeviceType value, filled on first sight (a fleet has only a handful of raw types)
+_TYPE_BY_RAW_TYPE: Dict[str, str] = {}
+
+
+def _device_type(raw_type: str) -> str:
+    dtype = _TYPE_BY_RAW_TYPE.get(raw_type)
+    if dtype is None:
+        lowered = raw_type.lower()
+        if "ap" in lowered or "accesspoint" in lowered:
+            dtype = DeviceType.AP.value
+        elif "switch" in lowered:
+            dtype = DeviceType.SWITCH.value
+        else:
+            dtype = DeviceType.UNKNOWN.value
+        _TYPE_BY_RAW_TYPE[raw_type] = dtype
+    return dtype
+
+
+def _to_device(item: Dict[str, Any], site_id: str) -> DeviceRecord:
+    """Map one raw Aruba device onto the Safe internal schema (Data Scrubbing)."""
+    get = item.get
+    # Scrubbing happens here by omission of fields
+    return DeviceRecord(
+        get("id", "unknown"),
+        get("name", "Unknown Device"),
+        _STATUS_BY_STATE.get(get("state", "UNKNOWN").upper(), DeviceStatus.UNKNOWN.value),
+        _device_type(get("deviceType", "UNKNOWN")),
+        get("serialNumber"),  # Allowed
+        get("macAddress"),    # Allowed
+        site_id,
+        get("uptime", 0),
+        get("connectedClients", 0),
+        get("firmwareVersion"),
+    )
+
+
+def normalize_devices(raw_data: Any, site_id: str) -> List[DeviceRecord]:
+    """Scrub a raw Aruba device listing (bare list or {"elements": [...]})."""
+    # Handle { "elements": [...] } structure common in Aruba API
+    elements = raw_data.get("elements", []) if isinstance(raw_data, dict) else raw_data
+    return [_to_device(item, site_id) for item in elements]
+
+
+def _normalize_id(value: Optional[str]) -> str:
+    """Serial/MAC comparison key: case-insensitive, separators ignored."""
+    return (value or "").replace(":", "").replace("-", "").replace(".", "").lower()
+
 
 class InventoryService:
-    async def get_site_devices(self, site_id: str, aruba_token: str) -> List[DeviceResponse]:
-        """
-        Fetches raw device inventory from Aruba and transforms it into
-        the Safe internal schema (Data Scrubbing).
-        """
+    async def _fetch_site_devices(self, site_id: str, aruba_token: str) -> Tuple[List[DeviceRecord], Optional[str]]:
+        """Fetch and scrub one site's devices. Returns (devices, error) — never raises."""
         endpoint = f"api/sites/{site_id}/devices" # Assumed endpoint
 
         try:
@@ -16,53 +76,106 @@ class InventoryService:
 
             if response.status_code != 200:
                 print(f"[INVENTORY] Failed to fetch devices: {response.status_code}")
-                # Return empty or raise, depending on requirement.
-                # For now return empty list to avoid breaking UI.
-                return []
-
-            raw_data = response.json()
-            # Handle { "elements": [...] } structure common in Aruba API
-            elements = raw_data.get("elements", []) if isinstance(raw_data, dict) else raw_data
+                return [], f"Aruba API returned {response.status_code}"
 
             # 2. Data Transformation / Scrubbing
-            devices = []
-            for item in elements:
-                # Map raw status to Enum
-                raw_state = item.get("state", "UNKNOWN").upper()
-                status = DeviceStatus.UNKNOWN
-                if raw_state in ["ONLINE", "ACTIVE"]:
-                    status = DeviceStatus.ONLINE
-                elif raw_state in ["OFFLINE", "DOWN"]:
-                    status = DeviceStatus.OFFLINE
-                elif raw_state in ["ALERT", "PROBLEM"]:
-                    status = DeviceStatus.ALERT
-
-                # Map raw type to Enum
-                raw_type = item.get("deviceType", "UNKNOWN").lower()
-                dtype = DeviceType.UNKNOWN
-                if "ap" in raw_type or "accesspoint" in raw_type:
-                    dtype = DeviceType.AP
-                elif "switch" in raw_type:
-                    dtype = DeviceType.SWITCH
-
-                # Create Pydantic Model (Scrubbing happens here by omission of fields)
-                device = DeviceResponse(
-                    id=item.get("id", "unknown"),
-                    name=item.get("name", "Unknown Device"),
-                    status=status,
-                    type=dtype,
-                    serial_number=item.get("serialNumber"), # Allowed
-                    mac_address=item.get("macAddress"),     # Allowed
-                    site_id=site_id,
-                    uptime_seconds=item.get("uptime", 0),
-                    client_count=item.get("connectedClients", 0)
-                )
-                devices.append(device)
-
-            return devices
+            return normalize_devices(response.json(), site_id), None
 
         except Exception as e:
             print(f"[INVENTORY] Exception fetching devices: {e}")
-            return []
+            return [], str(e)
+
+    async def _load_site_devices(
+        self, site_ids: List[str], aruba_token: str
+    ) -> Dict[str, Tuple[List[DeviceRecord], Optional[str], Optional[datetime]]]:
+        """
+        Devices per site as {site_id: (devices, error, collected_at)}: from the
+        collector's snapshot when fresh, otherwise fetched live (in parallel).
+        """
+        loaded: Dict[str, Tuple[List[DeviceRecord], Optional[str], Optional[datetime]]] = {}
+        snapshots = await get_site_snapshots(site_ids, {"devices": 1, "devices_collected_at": 1})
+        for doc in snapshots:
+            collected_at = doc.get("devices_collected_at")
+            if "devices" in doc and is_fresh(collected_at, SNAPSHOT_MAX_AGE_SECONDS):
+                loaded[doc["_id"]] = (
+                    [DeviceRecord(**d) for d in doc["devices"]], None, collected_at.replace(tzinfo=timezone.utc)
+                )
+
+        missing = [site_id for site_id in site_ids if site_id not in loaded]
+        if missing:
+            results = await asyncio.gather(*(self._fetch_site_devices(site_id, aruba_token) for site_id in missing))
+            now = datetime.now(timezone.utc)
+            for site_id, (devices, error) in zip(missing, results):
+                loaded[site_id] = (devices, error, now)
+        return loaded
+
+    async def get_site_devices(self, site_id: str, aruba_token: str) -> Tuple[List[DeviceRecord], Optional[datetime]]:
+        """
+        Device inventory of one site in the Safe internal schema (Data Scrubbing),
+        with the time it was collected.
+        """
+        # Failures return an empty list to avoid breaking the UI.
+        devices, _, collected_at = (await self._load_site_devices([site_id], aruba_token))[site_id]
+        return devices, collected_at
+
+    async def get_fleet_devices(
+        self,
+        sites: List[Dict[str, Any]],
+        aruba_token: str,
+        status: Optional[DeviceStatus] = None,
+        device_type: Optional[DeviceType] = None,
+        id_prefix: Optional[str] = None,
+        page: int = 1,
+        page_size: int = 100,
+    ) -> Dict[str, Any]:
+        """
+        Every device across `sites`, from snapshots or fetched in parallel (bounded
+        by the shared Aruba rate limit). A failing site is reported in sites_failed
+        and does not affect the others. Filters apply server-side before pagination.
+
+        Returns a JSON-ready dict in the FleetInventoryResponse shape; only the
+        requested page is turned into dicts.
+        """
+        loaded = await self._load_site_devices([site["siteId"] for site in sites], aruba_token)
+
+        prefix = _normalize_id(id_prefix)
+        status_value = status.value if status else None
+        type_value = device_type.value if device_type else None
+        matched: List[Tuple[str, DeviceRecord]] = []
+        failed: List[Dict[str, Any]] = []
+        for site in sites:
+            site_devices, error, _ = loaded[site["siteId"]]
+            if error:
+                failed.append({"site_id": site["siteId"], "site_name": site.get("siteName"), "error": error})
+                continue
+            site_name = site.get("siteName")
+            for d in site_devices:
+                if status_value and d.status != status_value:
+                    continue
+                if type_value and d.type != type_value:
+                    continue
+                if prefix and not (
+                    _normalize_id(d.serial_number).startswith(prefix) or _normalize_id(d.mac_address).startswith(prefix)
+                ):
+                    continue
+                matched.append((site_name, d))
+
+        matched.sort(key=lambda m: (m[0] or "", m[1].name))
+        start = (page - 1) * page_size
+        page_devices = []
+        for site_name, d in matched[start:start + page_size]:
+            device = d.to_dict()
+            device["site_name"] = site_name
+            page_devices.append(device)
+        collected_at = min((ts for _, _, ts in loaded.values() if ts), default=None)
+        return {
+            "devices": page_devices,
+            "total": len(matched),
+            "page": page,
+            "page_size": page_size,
+            "sites_total": len(sites),
+            "sites_failed": failed,
+            "collected_at": collected_at.isoformat() if collected_at else None,
+        }
 
 inventory_service = InventoryService()
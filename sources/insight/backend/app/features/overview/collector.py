@@ -0,0 +1,160 @@
+"""Background collector for the local site snapshot store (site_snapshots).
+
+Every SNAPSHOT_INTERVAL_SECONDS the collector reads the site list of the linked
+master account (recording each site's health score and alert counters in
+site_health_series), then collects each site's SNAPSHOT_RESOURCES. Alert lists
+are also folded into the fleet-wide fleet_alerts state, device lists are diffed
+against the previous pass into the device_changes log, and zones whose sites'
+counters changed get their rollups recomputed. Site collections
+are staggered evenly across the interval, so the account sees a steady trickle
+of requests instead of a burst per cycle; every call goes through the background
+Aruba rate-limit lane, so user requests never queue behind collector traffic. Overview and inventory reads are then served from
+the snapshots, independent of Aruba latency.
+
+Like the master token manager, this relies on a SINGLE Uvicorn worker.
+"""
+import asyncio
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+from fastapi import HTTPException
+from app.config import SNAPSHOT_INTERVAL_SECONDS, SNAPSHOT_RESOURCES
+from app.database.master_crud import get_master_token
+from app.database.client_index_crud import index_site_clients
+from app.database.device_changes_crud import record_device_changes
+from app.database.fleet_alerts_crud import close_alerts_of_removed_sites, sync_site_alerts
+from app.database.health_series_crud import record_health_samples
+from app.database.snapshots_crud import save_site_list, save_site_resources
+from app.database.zone_rollups_crud import recompute_rollups_for_sites
+from app.features.inventory.service import normalize_devices
+from app.features.overview.service import overview_service
+from app.shared.aruba import aruba_service
+
+_collector_task: Optional[asyncio.Task] = None
+
+
+async def _fetch_resource(site_id: str, name: str, aruba_token: str) -> Tuple[Any, Optional[str]]:
+    """GET /api/sites/{site_id}/{name}. Returns (json, error) — never raises."""
+    try:
+        response = await aruba_service.call_api(
+            "GET", f"/api/sites/{site_id}/{name}", aruba_token=aruba_token, background=True
+        )
+        if response.status_code != 200:
+            return None, f"Aruba API returned {response.status_code}"
+        return response.json(), None
+    except Exception as e:
+        return None, str(e)
+
+
+def _client_list(data: Any) -> List[Dict[str, Any]]:
+    """Client entries from the shapes Aruba uses for a site's client list."""
+    if isinstance(data, list):
+        return data
+    if not isinstance(data, dict):
+        return []
+    return data.get("elements") or data.get("clients") or (data.get("clientsOverview") or {}).get("clients") or []
+
+
+async def collect_site(site_id: str):
+    """Collect every configured resource of one site and store the snapshot."""
+    aruba_token = await get_master_token()
+    if not aruba_token:
+        return
+
+    results = await asyncio.gather(*(
+        _fetch_resource(site_id, name, aruba_token) for name in SNAPSHOT_RESOURCES
+    ))
+    collected_at = datetime.now(timezone.utc)
+
+    resources: Dict[str, Any] = {}
+    devices: Optional[List[Dict[str, Any]]] = None
+    errors: Dict[str, str] = {}
+    summary: Dict[str, int] = {}
+    for name, (data, error) in zip(SNAPSHOT_RESOURCES, results):
+        if error:
+            errors[name] = error
+        elif name == "devices":
+            devices = [d.to_dict() for d in normalize_devices(data, site_id)]
+            summary["devices"] = len(devices)
+            summary["devices_offline"] = sum(1 for d in devices if d["status"] == "offline")
+        elif name == "clients":
+            clients = _client_list(data)
+            await index_site_clients(site_id, clients, collected_at)
+            summary["clients"] = len(clients)
+        else:
+            resources[name] = data
+            if name == "alerts":
+                alerts = data if isinstance(data, list) else (data or {}).get("elements") or (data or {}).get("alerts") or []
+                summary["open_alerts"] = (await sync_site_alerts(site_id, alerts, collected_at))["open"]
+
+    summary_changed, previous_devices = await save_site_resources(
+        site_id, resources, devices, errors, collected_at, summary
+    )
+    if summary_changed:
+        await recompute_rollups_for_sites([site_id])
+    if devices is not None:
+        await record_device_changes(site_id, previous_devices, devices, collected_at)
+    if errors:
+        print(f"[SNAPSHOT] Site {site_id}: {len(errors)} resource(s) failed: {', '.join(errors)}")
+
+
+async def collect_once(interval_seconds: float = SNAPSHOT_INTERVAL_SECONDS) -> int:
+    """One collection cycle. Returns the number of sites scheduled."""
+    aruba_token = await get_master_token()
+    if not aruba_token:
+        return 0
+
+    try:
+        sites = await overview_service.fetch_site_list(aruba_token, background=True)
+    except HTTPException:
+        print("[SNAPSHOT] Master token rejected by Aruba — skipping cycle.")
+        return 0
+    if sites is None:
+        return 0
+
+    collected_at = datetime.now(timezone.utc)
+    changed, removed = await save_site_list(sites, collected_at)
+    await record_health_samples(sites, collected_at)
+    if removed:
+        print(f"[SNAPSHOT] Removed {len(removed)} snapshot(s) of sites no longer on the account.")
+    await recompute_rollups_for_sites(changed + removed)
+
+    site_ids = [s["siteId"] for s in sites if s.get("siteId")]
+    await close_alerts_of_removed_sites(site_ids, collected_at)
+    if not site_ids:
+        return 0
+
+    # Spread site collections evenly over the interval
+    spacing = interval_seconds / len(site_ids)
+    start = time.monotonic()
+    tasks = []
+    for i, site_id in enumerate(site_ids):
+        delay = start + i * spacing - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(collect_site(site_id)))
+
+    for site_id, result in zip(site_ids, await asyncio.gather(*tasks, return_exceptions=True)):
+        if isinstance(result, Exception):
+            print(f"[SNAPSHOT] ERROR collecting site {site_id}: {result}")
+    return len(site_ids)
+
+
+async def _collector_loop():
+    """Infinite loop: one cycle per SNAPSHOT_INTERVAL_SECONDS."""
+    while True:
+        started = time.monotonic()
+        try:
+            count = await collect_once()
+            if count:
+                print(f"[SNAPSHOT] Collected {count} site(s) in {time.monotonic() - started:.0f}s.")
+        except Exception as e:
+            print(f"[SNAPSHOT] ERROR during collection cycle: {e}")
+        await asyncio.sleep(max(0.0, SNAPSHOT_INTERVAL_SECONDS - (time.monotonic() - started)))
+
+
+def start_snapshot_collector():
+    """Start the background snapshot collector. Called from lifespan()."""
+    global _collector_task
+    if _collector_task is None or _collector_task.done():
+        _collector_task = asyncio.create_task(_collector_loop())
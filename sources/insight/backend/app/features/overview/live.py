@@ -0,0 +1,191 @@
+"""Server push of site resources (health, alerts, inventory, ...) to dashboards.
+
+Clients subscribe to (site_id, resource) keys. Each distinct key has exactly one
+feed, polled every OVERVIEW_LIVE_POLL_SECONDS through
+OverviewService.read_site_resource (collector snapshot when fresh, otherwise
+Aruba), however many tabs are watching it — upstream load scales with distinct
+resources, not viewers. A feed starts with its first subscriber and stops with
+its last.
+
+Subscribers get the current value once ("snapshot"), then only changes as JSON
+Merge Patches (RFC 7386: changed keys carry the new value, removed keys are
+null, arrays are replaced whole). A patch cannot express a key whose new value
+is null, so such changes are sent as a fresh "snapshot" instead. Polls that
+change nothing send nothing.
+Each subscriber has a bounded drop-oldest queue; if a slow client loses events,
+its next frame is a "resync" with full snapshots of every key instead of patches
+it could no longer apply.
+
+In-process only — like the other background pieces, this assumes a SINGLE
+Uvicorn worker.
+"""
+import asyncio
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Set, Tuple
+from app.config import OVERVIEW_LIVE_POLL_SECONDS
+from app.database.master_crud import get_master_token
+from app.features.overview.service import overview_service
+from app.shared.streaming import DropOldestQueue
+
+QUEUE_SIZE = 64
+MAX_FRAME_EVENTS = 100
+
+FeedKey = Tuple[str, str]  # (site_id, resource)
+
+_UNCHANGED = object()
+_NEEDS_SNAPSHOT = object()
+
+
+def _has_null(value: Any) -> bool:
+    """True if applying `value` as a patch would read one of its nulls as a removal."""
+    if value is None:
+        return True
+    return isinstance(value, dict) and any(_has_null(v) for v in value.values())
+
+
+def merge_patch(old: Any, new: Any) -> Any:
+    """RFC 7386 patch turning `old` into `new`, _UNCHANGED if they are equal, or
+    _NEEDS_SNAPSHOT if a changed key's new value is (or contains) null, which a
+    patch would turn into a removal."""
+    if isinstance(old, dict) and isinstance(new, dict):
+        patch = {}
+        for key, value in new.items():
+            if key not in old:
+                if _has_null(value):
+                    return _NEEDS_SNAPSHOT
+                patch[key] = value
+            else:
+                sub = merge_patch(old[key], value)
+                if sub is _NEEDS_SNAPSHOT:
+                    return _NEEDS_SNAPSHOT
+                if sub is not _UNCHANGED:
+                    patch[key] = sub
+        for key in old:
+            if key not in new:
+                patch[key] = None
+        return patch or _UNCHANGED
+    if old == new:
+        return _UNCHANGED
+    return _NEEDS_SNAPSHOT if _has_null(new) else new
+
+
+@dataclass(eq=False)
+class Subscription:
+    keys: List[FeedKey]
+    queue: DropOldestQueue = field(default_factory=lambda: DropOldestQueue(QUEUE_SIZE))
+
+    async def next_events(self) -> List[Dict[str, Any]]:
+        """Block until something is queued; return the events to send, in order."""
+        events = await self.queue.get_batch(0, MAX_FRAME_EVENTS)
+        if self.queue.take_dropped():
+            return [{"type": "resync", "data": hub.snapshots(self.keys)}]
+        return events
+
+
+class _Feed:
+    def __init__(self, key: FeedKey):
+        self.key = key
+        self.subscribers: Set[Subscription] = set()
+        self.value: Any = None
+        self.has_value = False
+        self.collected_at: Optional[datetime] = None
+        self.status: Optional[int] = None
+        self.task: Optional[asyncio.Task] = None
+
+    def snapshot_event(self) -> Dict[str, Any]:
+        return {
+            "type": "snapshot",
+            "site_id": self.key[0],
+            "resource": self.key[1],
+            "data": self.value,
+            "collected_at": self.collected_at,
+        }
+
+    def publish(self, event: Dict[str, Any]):
+        for sub in list(self.subscribers):
+            sub.queue.put(event)
+
+    async def poll_once(self):
+        site_id, resource = self.key
+        aruba_token = await get_master_token()
+        if not aruba_token:
+            status_code, data, collected_at = 503, None, None
+        else:
+            try:
+                status_code, data, collected_at = await overview_service.read_site_resource(
+                    site_id, resource, aruba_token, background=True
+                )
+            except Exception as e:
+                print(f"[OVERVIEW LIVE] Poll failed for {site_id}/{resource}: {e}")
+                status_code, data, collected_at = 502, None, None
+
+        if status_code != 200:
+            if status_code != self.status:
+                self.status = status_code
+                self.publish({"type": "error", "site_id": site_id, "resource": resource, "status": status_code})
+            return
+
+        self.status = 200
+        self.collected_at = collected_at or datetime.now(timezone.utc)
+        if not self.has_value:
+            self.value, self.has_value = data, True
+            self.publish(self.snapshot_event())
+            return
+
+        patch = merge_patch(self.value, data)
+        self.value = data
+        if patch is _NEEDS_SNAPSHOT:
+            self.publish(self.snapshot_event())
+        elif patch is not _UNCHANGED:
+            self.publish({
+                "type": "patch",
+                "site_id": site_id,
+                "resource": resource,
+                "patch": patch,
+                "collected_at": self.collected_at,
+            })
+
+    async def run(self):
+        while True:
+            await self.poll_once()
+            await asyncio.sleep(OVERVIEW_LIVE_POLL_SECONDS)
+
+
+class ResourceHub:
+    def __init__(self):
+        self._feeds: Dict[FeedKey, _Feed] = {}
+
+    def subscribe(self, keys: List[FeedKey]) -> Subscription:
+        sub = Subscription(keys)
+        for key in keys:
+            feed = self._feeds.get(key)
+            if feed is None:
+                feed = self._feeds[key] = _Feed(key)
+                feed.task = asyncio.create_task(feed.run())
+            feed.subscribers.add(sub)
+            if feed.has_value:
+                sub.queue.put(feed.snapshot_event())
+        return sub
+
+    def unsubscribe(self, sub: Subscription):
+        for key in sub.keys:
+            feed = self._feeds.get(key)
+            if feed is None:
+                continue
+            feed.subscribers.discard(sub)
+            if not feed.subscribers:
+                feed.task.cancel()
+                del self._feeds[key]
+
+    def snapshots(self, keys: List[FeedKey]) -> List[Dict[str, Any]]:
+        return [self._feeds[key].snapshot_event() for key in keys if key in self._feeds and self._feeds[key].has_value]
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "feeds": len(self._feeds),
+            "subscriptions": len({sub for feed in self._feeds.values() for sub in feed.subscribers}),
+        }
+
+
+hub = ResourceHub()
@@ -1,19 +1,97 @@
-from fastapi import APIRouter, HTTPException, Depends
-from typing import Dict, Any
+import asyncio
+import json
+from datetime import datetime, timezone, timedelta
+from fastapi import APIRouter, HTTPException, Depends, Response, Query
+from fastapi.responses import StreamingResponse
+from typing import Dict, Any, List, Optional
+from app.database.client_index_crud import CLIENT_SEARCH_FIELDS, search_clients
+from app.database.fleet_alerts_crud import ALERT_STATES, list_fleet_alerts
+from app.database.health_series_crud import HEALTH_RESOLUTIONS, get_health_series, pick_resolution
+from app.database.snapshots_crud import get_site_snapshots
+from app.database.zones_crud import get_site_ids_for_zones
 from app.shared.auth_deps import get_current_insight_user, require_master_token
+from app.features.overview.live import hub
+from app.features.overview.schemas import BatchReadRequest, SiteReadItem
 from app.features.overview.service import overview_service
 from app.shared.aruba import aruba_service
 
 router = APIRouter(prefix="/api/v1/overview", tags=["Overview"])
 
+SSE_KEEPALIVE_SECONDS = 15
+STREAM_MAX_KEYS = 50
+
 
 @router.get("/sites")
 async def get_live_sites(
     user: Dict[str, Any] = Depends(get_current_insight_user),
     master_token: str = Depends(require_master_token),
 ):
-    sites = await overview_service.get_live_sites(master_token, user["email"])
-    return {"status": "success", "sites": sites}
+    sites, collected_at = await overview_service.get_sites(master_token, user["email"])
+    return {"status": "success", "sites": sites, "collected_at": collected_at}
+
+
+@router.get("/clients/search")
+async def search_fleet_clients(
+    q: str = Query(..., min_length=2, description="MAC / hostname / IP / SSID prefix"),
+    field: Optional[str] = Query(None, description="mac | hostname | ip | ssid (default: all)"),
+    limit: int = Query(50, ge=1, le=500),
+    user: Dict[str, Any] = Depends(get_current_insight_user),
+):
+    """Find which site(s) a client is on, from the collector's cross-site client index."""
+    if field and field not in CLIENT_SEARCH_FIELDS:
+        raise HTTPException(status_code=400, detail=f"field không hợp lệ. Chọn: {', '.join(CLIENT_SEARCH_FIELDS)}")
+
+    visible = await overview_service.visible_site_ids(user)
+    clients = await search_clients(q, field, visible, limit)
+
+    site_names = {
+        doc["_id"]: (doc.get("site") or {}).get("siteName")
+        for doc in await get_site_snapshots(list({c["site_id"] for c in clients}), {"site.siteName": 1})
+    }
+    for client in clients:
+        client["site_name"] = site_names.get(client["site_id"])
+    return {"status": "success", "clients": clients}
+
+
+@router.get("/alerts")
+async def get_fleet_alerts(
+    state: str = Query("open", description="open | closed | all"),
+    severity: Optional[str] = Query(None, description="Comma-separated, e.g. major,minor"),
+    zone_id: Optional[str] = None,
+    max_age_hours: Optional[int] = Query(None, ge=1, description="Only alerts opened within this many hours"),
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=500),
+    user: Dict[str, Any] = Depends(get_current_insight_user),
+):
+    """Fleet-wide alerts (deduplicated, open/closed lifecycle) across the caller's visible sites."""
+    if state != "all" and state not in ALERT_STATES:
+        raise HTTPException(status_code=400, detail="state không hợp lệ. Chọn: open, closed, all")
+
+    site_ids = await overview_service.visible_site_ids(user)
+    if zone_id:
+        zone_sites = set(await get_site_ids_for_zones([zone_id]))
+        site_ids = zone_sites if site_ids is None else site_ids & zone_sites
+
+    opened_after = datetime.now(timezone.utc) - timedelta(hours=max_age_hours) if max_age_hours else None
+    try:
+        alerts, next_cursor = await list_fleet_alerts(
+            site_ids=site_ids,
+            state=None if state == "all" else state,
+            severities=[s.strip() for s in severity.split(",") if s.strip()] if severity else None,
+            opened_after=opened_after,
+            cursor=cursor,
+            limit=limit,
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="cursor không hợp lệ.")
+
+    site_names = {
+        doc["_id"]: (doc.get("site") or {}).get("siteName")
+        for doc in await get_site_snapshots(list({a["site_id"] for a in alerts}), {"site.siteName": 1})
+    }
+    for alert in alerts:
+        alert["site_name"] = site_names.get(alert["site_id"])
+    return {"status": "success", "alerts": alerts, "next_cursor": next_cursor}
 
 
 @router.get("/sites/{site_id}")
@@ -35,22 +113,156 @@ async def get_site_detail(
     return response.json()
 
 
+@router.get("/sites/{site_id}/health-history")
+async def get_site_health_history(
+    site_id: str,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    resolution: str = Query("auto", description="auto | raw | 5m | 1h"),
+    user: Dict[str, Any] = Depends(get_current_insight_user),
+):
+    """Health score / alert counter history of a site, from the local time series."""
+    if resolution != "auto" and resolution not in HEALTH_RESOLUTIONS:
+        raise HTTPException(status_code=400, detail=f"resolution không hợp lệ. Chọn: auto, {', '.join(HEALTH_RESOLUTIONS)}")
+    if not await overview_service.can_view_site(site_id, user):
+        raise HTTPException(status_code=403, detail="Bạn không có quyền truy cập site này.")
+
+    end = end or datetime.now(timezone.utc)
+    start = start or end - timedelta(days=1)
+    if end.tzinfo is None:
+        end = end.replace(tzinfo=timezone.utc)
+    if start.tzinfo is None:
+        start = start.replace(tzinfo=timezone.utc)
+    if start >= end:
+        raise HTTPException(status_code=400, detail="start phải nhỏ hơn end.")
+
+    res = pick_resolution(start, end) if resolution == "auto" else resolution
+    points = await get_health_series(site_id, start, end, res)
+    return {"site_id": site_id, "resolution": res, "start": start, "end": end, "points": points}
+
+
 @router.get("/sites/{site_id}/{sub_path:path}")
 async def proxy_site_endpoint(
     site_id: str,
     sub_path: str,
+    response: Response,
     user: Dict[str, Any] = Depends(get_current_insight_user),
     master_token: str = Depends(require_master_token),
 ):
-    """Generic proxy for any Aruba site sub-endpoint using master token."""
-    response = await aruba_service.call_api(
-        method="GET",
-        endpoint=f"/api/sites/{site_id}/{sub_path}",
-        aruba_token=master_token,
-    )
-    if response.status_code == 401:
+    """Generic proxy for any Aruba site sub-endpoint using master token.
+
+    Resources kept by the snapshot collector (health, alerts, ...) are served
+    from the snapshot while fresh; X-Collected-At tells the client how old it is.
+    """
+    status_code, data, collected_at = await overview_service.read_site_resource(site_id, sub_path, master_token)
+    if status_code == 401:
         raise HTTPException(status_code=401, detail="Phiên làm việc Aruba đã hết hạn.")
-    if response.status_code != 200:
-        raise HTTPException(status_code=response.status_code, detail="Aruba API error.")
+    if status_code != 200:
+        raise HTTPException(status_code=status_code, detail="Aruba API error.")
 
-    return response.json()
+    if collected_at:
+        response.headers["X-Collected-At"] = collected_at.isoformat()
+    return data
+
+
+@router.post("/batch")
+async def batch_read(
+    body: BatchReadRequest,
+    stream: bool = False,
+    user: Dict[str, Any] = Depends(get_current_insight_user),
+    master_token: str = Depends(require_master_token),
+):
+    """Read many (site_id, sub_path) pairs in one request.
+
+    The caller is authorized once; items run concurrently (snapshot first, then
+    Aruba under the shared rate limit). Results are keyed "site_id/sub_path",
+    each with its own status. With ?stream=true the results are streamed as
+    NDJSON lines in completion order.
+    """
+    visible = await overview_service.visible_site_ids(user)
+    items = {f"{item.site_id}/{item.sub_path}": item for item in body.items}
+
+    async def _read(key: str, item: SiteReadItem) -> Dict[str, Any]:
+        result: Dict[str, Any] = {"key": key, "site_id": item.site_id, "sub_path": item.sub_path}
+        if visible is not None and item.site_id not in visible:
+            return {**result, "status": 403, "error": "Bạn không có quyền truy cập site này."}
+        try:
+            status_code, data, collected_at = await overview_service.read_site_resource(
+                item.site_id, item.sub_path, master_token
+            )
+        except Exception as e:
+            return {**result, "status": 502, "error": str(e)}
+        result["status"] = status_code
+        if status_code == 200:
+            result["data"] = data
+            result["collected_at"] = collected_at
+        else:
+            result["error"] = "Phiên làm việc Aruba đã hết hạn." if status_code == 401 else "Aruba API error."
+        return result
+
+    if not stream:
+        results = await asyncio.gather(*(_read(key, item) for key, item in items.items()))
+        return {"status": "success", "results": {r.pop("key"): r for r in results}}
+
+    async def _lines():
+        tasks = [asyncio.create_task(_read(key, item)) for key, item in items.items()]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                result = await next_done
+                yield json.dumps(result, ensure_ascii=False, default=str) + "\n"
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    return StreamingResponse(_lines(), media_type="application/x-ndjson")
+
+
+@router.get("/stream")
+async def stream_site_resources(
+    sub: List[str] = Query(..., description="site_id/resource, repeatable"),
+    user: Dict[str, Any] = Depends(get_current_insight_user),
+    master_token: str = Depends(require_master_token),
+):
+    """Live site resources as Server-Sent Events, replacing per-page polling.
+
+    One "snapshot" event per key on connect, then "patch" events (JSON Merge
+    Patch) only when a value changes; "resync" after a slow client lost events.
+    Each key is polled once server-side no matter how many clients watch it.
+    """
+    keys = []
+    for item in dict.fromkeys(sub):
+        site_id, _, resource = item.partition("/")
+        if not site_id or not resource:
+            raise HTTPException(status_code=400, detail=f"sub không hợp lệ: {item} (dạng site_id/resource)")
+        keys.append((site_id, resource))
+    if len(keys) > STREAM_MAX_KEYS:
+        raise HTTPException(status_code=400, detail=f"Tối đa {STREAM_MAX_KEYS} sub mỗi kết nối.")
+
+    visible = await overview_service.visible_site_ids(user)
+    if visible is not None and any(site_id not in visible for site_id, _ in keys):
+        raise HTTPException(status_code=403, detail="Bạn không có quyền truy cập site này.")
+
+    subscription = hub.subscribe(keys)
+
+    async def _events():
+        pending = None
+        try:
+            while True:
+                pending = pending or asyncio.ensure_future(subscription.next_events())
+                done, _ = await asyncio.wait({pending}, timeout=SSE_KEEPALIVE_SECONDS)
+                if not done:
+                    yield ": keepalive\n\n"
+                    continue
+                events, pending = pending.result(), None
+                for event in events:
+                    yield f"event: {event['type']}\ndata: {json.dumps(event, ensure_ascii=False, default=str)}\n\n"
+        finally:
+            if pending:
+                pending.cancel()
+            hub.unsubscribe(subscription)
+
+    return StreamingResponse(
+        _events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
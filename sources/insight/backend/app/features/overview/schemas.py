@@ -0,0 +1,14 @@
+"""Pydantic schemas for the overview feature."""
+from typing import List
+from pydantic import BaseModel, Field
+
+BATCH_MAX_ITEMS = 500
+
+
+class SiteReadItem(BaseModel):
+    site_id: str = Field(..., min_length=1)
+    sub_path: str = Field(..., min_length=1, description="Aruba site sub-path, e.g. health, alerts")
+
+
+class BatchReadRequest(BaseModel):
+    items: List[SiteReadItem] = Field(..., min_length=1, max_length=BATCH_MAX_ITEMS)
@@ -1,15 +1,21 @@
 """
-Dịch vụ Overview — lấy danh sách site trực tiếp từ Aruba API.
-
-Kiến trúc Stateless (stateless_architecture.md):
-  - TUYỆT ĐỐI không cache site hay token xuống database.
-  - Role Aruba (userRoleOnSite) được map theo thời gian thực (Live Mapping).
-  - insight_app_role lấy từ DB insight (Track 1), chỉ tra một lần mỗi request.
+Dịch vụ Overview — danh sách site của tài khoản Aruba master.
+
+Kiến trúc Snapshot (collector.py):
+  - Collector nền đọc định kỳ toàn bộ site (health, alerts, clientSummary, devices)
+    bằng master token và ghi snapshot đã chuẩn hoá vào collection site_snapshots.
+  - Các request đọc từ snapshot kèm mốc thời gian collected_at; chỉ gọi Aruba trực
+    tiếp khi chưa có snapshot hoặc snapshot đã quá SNAPSHOT_MAX_AGE_SECONDS.
+  - Token KHÔNG bao giờ được lưu vào snapshot.
+  - Role Aruba (userRoleOnSite) được map khi collect; insight_app_role lấy từ DB
+    insight (Track 1), tra một lần mỗi request, cùng với zone filter.
   - 401/403 từ Aruba → raise HTTPException(401) để frontend interceptor kích hoạt /refresh.
 """
-from typing import List, Dict, Any
+from datetime import datetime, timezone
+from typing import List, Dict, Any, Optional, Set, Tuple
 
 from fastapi import HTTPException
+from app.config import SNAPSHOT_MAX_AGE_SECONDS, SNAPSHOT_RESOURCES
 from app.shared.aruba import aruba_service
 
 # Map Aruba role verbatim → shorthand nội bộ
@@ -26,21 +32,13 @@ _SITES_ENDPOINTS = ["/api/sites", "/api/v1/sites"]
 
 class OverviewService:
 
-    async def get_live_sites(
-        self,
-        aruba_token: str,
-        caller_email: str = ""
-    ) -> List[Dict[str, Any]]:
+    async def fetch_site_list(self, aruba_token: str, background: bool = False) -> Optional[List[Dict[str, Any]]]:
         """
-        Lấy danh sách site từ Aruba API và map role theo thời gian thực.
-
-        Args:
-            aruba_token:   Bearer token do trình duyệt gửi lên.
-            caller_email:  Email người dùng (từ header X-Insight-User) để tra
-                           insight_app_role từ DB (Track 1).
+        Lấy danh sách site từ Aruba API và chuẩn hoá (chưa gắn insight_app_role,
+        chưa lọc theo zone). background=True: gọi qua lane rate-limit nền (collector).
 
         Returns:
-            Danh sách site đã chuẩn hoá; raise HTTPException(401) nếu token hết hạn.
+            Danh sách site; None nếu Aruba lỗi. Raise HTTPException(401) nếu token hết hạn.
         """
         # --- Bước 1: Gọi Aruba API, thử từng endpoint ---
         response = None
@@ -49,6 +47,7 @@ class OverviewService:
                 method="GET",
                 endpoint=endpoint,
                 aruba_token=aruba_token,
+                background=background,
             )
             if response.status_code == 200:
                 break
@@ -61,17 +60,9 @@ class OverviewService:
 
         if response is None or response.status_code != 200:
             print(f"[OVERVIEW] Aruba API trả về lỗi: {response.status_code if response else 'no response'}")
-            return []
-
-        # --- Bước 2: Tra insight_app_role một lần (Track 1) ---
-        insight_app_role = "guest"
-        if caller_email:
-            from app.database.auth_crud import get_user_by_email
-            user = await get_user_by_email(caller_email)
-            if user:
-                insight_app_role = user.get("role", "guest")
+            return None
 
-        # --- Bước 3: Parse JSON và map role theo thời gian thực ---
+        # --- Bước 2: Parse JSON và map role Aruba ---
         try:
             data = response.json()
             raw_elements: list = data if isinstance(data, list) else data.get("elements", [])
@@ -94,7 +85,6 @@ class OverviewService:
                     "siteName":              node.get("name") or node.get("siteName") or node.get("site_name", "Unknown"),
                     "role":                  mapped_role,
                     "aruba_role_raw":        aruba_role_raw if aruba_role_raw else "unknown",
-                    "insight_app_role":      insight_app_role,
                     # Enriched fields for Sites Grid UI
                     "status":                node.get("status", "up"),
                     "healthScore":           node.get("currentHealthScore", {}),
@@ -102,22 +92,129 @@ class OverviewService:
                     "activeAlertsCounters":  node.get("activeAlertsCounters", {}),
                     "historyDurationSeconds": node.get("historyDurationSeconds", 86400),
                 })
-
-            # --- Bước 4: Zone filter — non-global-admin chỉ thấy sites trong zones của mình ---
-            from app.config import SUPER_ADMIN_EMAILS
-            from app.database.zones_crud import get_site_ids_for_user_zones
-
-            is_global_admin = insight_app_role in ("super_admin", "tenant_admin") or (caller_email in SUPER_ADMIN_EMAILS)
-            if not is_global_admin and caller_email:
-                allowed_ids = await get_site_ids_for_user_zones(caller_email)
-                allowed_set = set(allowed_ids)
-                sites = [s for s in sites if s.get("siteId") in allowed_set]
-
             return sites
 
         except Exception as exc:
             print(f"[OVERVIEW] Lỗi parse response: {exc}")
+            return None
+
+    async def filter_visible_sites(
+        self,
+        sites: List[Dict[str, Any]],
+        caller_email: str = ""
+    ) -> List[Dict[str, Any]]:
+        """
+        Gắn insight_app_role của người gọi và lọc theo zone.
+
+        Args:
+            sites:         Danh sách site đã chuẩn hoá (fetch_site_list / snapshot).
+            caller_email:  Email người dùng (từ header X-Insight-User) để tra
+                           insight_app_role từ DB (Track 1).
+        """
+        # --- Tra insight_app_role một lần (Track 1) ---
+        insight_app_role = "guest"
+        if caller_email:
+            from app.database.auth_crud import get_user_by_email
+            user = await get_user_by_email(caller_email)
+            if user:
+                insight_app_role = user.get("role", "guest")
+
+        sites = [{**s, "insight_app_role": insight_app_role} for s in sites]
+
+        # --- Zone filter — non-global-admin chỉ thấy sites trong zones của mình ---
+        from app.config import SUPER_ADMIN_EMAILS
+        from app.database.zones_crud import get_site_ids_for_user_zones
+
+        is_global_admin = insight_app_role in ("super_admin", "tenant_admin") or (caller_email in SUPER_ADMIN_EMAILS)
+        if not is_global_admin and caller_email:
+            allowed_ids = await get_site_ids_for_user_zones(caller_email)
+            allowed_set = set(allowed_ids)
+            sites = [s for s in sites if s.get("siteId") in allowed_set]
+
+        return sites
+
+    async def visible_site_ids(self, user: Dict[str, Any]) -> Optional[Set[str]]:
+        """Cùng quy tắc với filter_visible_sites: None = admin-tier, thấy tất cả;
+        người dùng khác chỉ thấy sites trong zones của mình."""
+        from app.config import SUPER_ADMIN_EMAILS
+        from app.database.zones_crud import get_site_ids_for_user_zones
+
+        if user.get("role") in ("super_admin", "tenant_admin") or user.get("email") in SUPER_ADMIN_EMAILS:
+            return None
+        return set(await get_site_ids_for_user_zones(user["email"]))
+
+    async def can_view_site(self, site_id: str, user: Dict[str, Any]) -> bool:
+        visible = await self.visible_site_ids(user)
+        return visible is None or site_id in visible
+
+    async def read_site_resource(
+        self,
+        site_id: str,
+        sub_path: str,
+        aruba_token: str,
+        background: bool = False,
+    ) -> Tuple[int, Any, Optional[datetime]]:
+        """
+        Đọc /api/sites/{site_id}/{sub_path}: từ snapshot nếu collector có lưu và còn mới,
+        nếu không thì gọi Aruba trực tiếp (background=True: qua lane rate-limit nền).
+
+        Returns:
+            (status_code, data, collected_at) — collected_at là None khi đọc live.
+        """
+        from app.database.snapshots_crud import get_snapshot_resource, is_fresh
+
+        if sub_path in SNAPSHOT_RESOURCES:
+            snapshot = await get_snapshot_resource(site_id, sub_path)
+            if snapshot and is_fresh(snapshot["collected_at"], SNAPSHOT_MAX_AGE_SECONDS):
+                return 200, snapshot["data"], snapshot["collected_at"]
+
+        response = await aruba_service.call_api(
+            method="GET",
+            endpoint=f"/api/sites/{site_id}/{sub_path}",
+            aruba_token=aruba_token,
+            background=background,
+        )
+        if response.status_code != 200:
+            return response.status_code, None, None
+        return 200, response.json(), None
+
+    async def get_live_sites(
+        self,
+        aruba_token: str,
+        caller_email: str = ""
+    ) -> List[Dict[str, Any]]:
+        """
+        Lấy danh sách site trực tiếp từ Aruba API (bỏ qua snapshot).
+
+        Returns:
+            Danh sách site đã chuẩn hoá và lọc theo zone; raise HTTPException(401) nếu token hết hạn.
+        """
+        sites = await self.fetch_site_list(aruba_token)
+        if sites is None:
             return []
+        return await self.filter_visible_sites(sites, caller_email)
+
+    async def get_sites(
+        self,
+        aruba_token: str,
+        caller_email: str = ""
+    ) -> Tuple[List[Dict[str, Any]], Optional[datetime]]:
+        """
+        Danh sách site cho người gọi, ưu tiên snapshot của collector.
+
+        Returns:
+            (sites, collected_at) — collected_at là thời điểm snapshot cũ nhất được dùng,
+            hoặc thời điểm gọi Aruba nếu phải fallback sang live.
+        """
+        from app.database.snapshots_crud import get_site_snapshots, is_fresh
+
+        snapshots = await get_site_snapshots(projection={"site": 1, "site_collected_at": 1})
+        if snapshots and all(is_fresh(doc.get("site_collected_at"), SNAPSHOT_MAX_AGE_SECONDS) for doc in snapshots):
+            collected_at = min(doc["site_collected_at"] for doc in snapshots).replace(tzinfo=timezone.utc)
+            sites = [doc["site"] for doc in snapshots]
+            return await self.filter_visible_sites(sites, caller_email), collected_at
 
+        collected_at = datetime.now(timezone.utc)
+        return await self.get_live_sites(aruba_token, caller_email), collected_at
 
 overview_service = OverviewService()
@@ -12,6 +12,7 @@ Endpoints:
   DELETE /api/v1/super/users/{id}                  — delete user
   POST   /api/v1/super/users/{id}/reset-password   — reset user password (super only)
   GET    /api/v1/super/logs                        — system-wide audit logs
+  GET    /api/v1/super/audit-sink                  — audit writer counters (buffered/written/dropped/failed)
 """
 from fastapi import APIRouter, Depends, HTTPException
 from typing import Any, Dict, List
@@ -341,3 +342,10 @@ async def get_system_logs(
             master_account_used=log.get("master_account_used", False),
         ))
     return formatted
+
+
+@router.get("/audit-sink")
+async def get_audit_sink_stats(current_user: Dict[str, Any] = Depends(require_super_admin)):
+    _require_super(current_user)
+    from app.shared.audit_sink import audit_sink
+    return audit_sink.stats()
@@ -3,6 +3,7 @@ from fastapi import APIRouter, HTTPException, Request, Depends
 from typing import List, Dict, Any
 from app.shared.auth_deps import require_internal_admin, require_zone_access, require_zone_admin, get_current_insight_user
 from app.database.zones_crud import get_all_member_emails_in_zone
+from app.database.auth_crud import normalize_actor
 from . import service
 from .schemas import (
     ZoneCreateRequest, ZoneUpdateRequest, ZoneSitesUpdateRequest,
@@ -180,11 +181,9 @@ async def get_zone_logs(
 
     db = get_database()
     vn_tz = tz("Asia/Ho_Chi_Minh")
+    # Served by the (actor, timestamp) index
     cursor = db.audit_logs.find({
-        "$or": [
-            {"actor_email": {"$in": member_emails}},
-            {"insight_user_id": {"$in": member_emails}}
-        ]
+        "actor": {"$in": [normalize_actor(e) for e in member_emails]}
     }).sort("timestamp", -1).skip(skip).limit(limit)
 
     logs = []
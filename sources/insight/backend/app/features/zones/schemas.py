@@ -47,6 +47,19 @@ class ZoneMemberResponse(BaseModel):
     assigned_at: str  # ISO string
 
 
+class ZoneRollup(BaseModel):
+    """Zone summary precomputed from site snapshots (no Aruba calls)."""
+    sites_reporting: int = 0
+    sites_down: int = 0
+    devices: int = 0
+    devices_offline: int = 0
+    clients: int = 0
+    worst_health_score: Optional[float] = None
+    open_alerts: int = 0
+    collected_at: Optional[datetime] = None  # oldest site snapshot included
+    updated_at: Optional[datetime] = None
+
+
 class ZoneResponse(BaseModel):
     id: str
     name: str
@@ -59,6 +72,7 @@ class ZoneResponse(BaseModel):
     members: List[ZoneMemberResponse]
     member_count: int
     site_count: int
+    rollup: Optional[ZoneRollup] = None
 
 
 class ZoneListItem(BaseModel):
@@ -72,3 +86,4 @@ class ZoneListItem(BaseModel):
     member_count: int
     site_count: int
     site_ids: List[str] = Field(default_factory=list)
+    rollup: Optional[ZoneRollup] = None
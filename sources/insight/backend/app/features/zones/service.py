@@ -2,7 +2,7 @@
 from datetime import timezone
 from typing import Dict, Any, List, Optional
 from app.database import zones_crud
-from .schemas import ZoneResponse, ZoneListItem, ZoneMemberResponse, VALID_ZONE_ROLES
+from .schemas import ZoneResponse, ZoneListItem, ZoneMemberResponse, ZoneRollup, VALID_ZONE_ROLES
 
 
 def _fmt_dt(dt) -> str:
@@ -36,6 +36,7 @@ def _serialize_zone(z: Dict[str, Any]) -> ZoneResponse:
         members=members,
         member_count=len(members),
         site_count=len(z.get("site_ids", [])),
+        rollup=ZoneRollup(**z["rollup"]) if z.get("rollup") else None,
     )
 
 
@@ -50,6 +51,7 @@ def _serialize_zone_list_item(z: Dict[str, Any]) -> ZoneListItem:
         member_count=len(z.get("members", [])),
         site_count=len(z.get("site_ids", [])),
         site_ids=z.get("site_ids", []),
+        rollup=ZoneRollup(**z["rollup"]) if z.get("rollup") else None,
     )
 
 
@@ -5,7 +5,7 @@ from fastapi.middleware.cors import CORSMiddleware
 from datetime import datetime, timezone
 
 from app.database.connection import connect_to_mongo, close_mongo_connection, get_database
-from app.config import INTERNAL_APP_AUTH, SUPER_ADMIN_EMAILS, SUPER_ADMIN_PASSWORD
+from app.config import INTERNAL_APP_AUTH, SUPER_ADMIN_EMAILS, SUPER_ADMIN_PASSWORD, SNAPSHOT_COLLECTOR_ENABLED
 from app.shared.logging_middleware import GlobalLoggingMiddleware
 
 # Feature-first routers — all under /api/v1/
@@ -51,12 +51,28 @@ async def lifespan(app: FastAPI):
             await db.users.update_one({"email": email}, {"$set": update})
             print(f"[RBAC] Super Admin ensured (migrated if needed): {email}")
 
+    # Start batched audit-log writer
+    from app.shared.audit_sink import audit_sink
+    audit_sink.start()
+
     # Start master account token auto-refresh background task
     from app.features.master.token_manager import start_token_manager
     start_token_manager()
     print("INFO: Master token manager started.")
 
+    # Start capture retention (expiry backfill + size-capped rollover) background task
+    from app.features.capture.retention import start_retention_job
+    start_retention_job()
+    print("INFO: Capture retention job started.")
+
+    # Start site snapshot collector (overview / inventory read from its snapshots)
+    if SNAPSHOT_COLLECTOR_ENABLED:
+        from app.features.overview.collector import start_snapshot_collector
+        start_snapshot_collector()
+        print("INFO: Site snapshot collector started.")
+
     yield
+    await audit_sink.stop()
     await close_mongo_connection()
 
 
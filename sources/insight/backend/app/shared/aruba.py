@@ -1,7 +1,15 @@
+import asyncio
+import time
 import httpx
 import json
 from typing import Optional, Dict, Any
 from urllib.parse import urlparse
+from app.config import (
+    ARUBA_MAX_CONCURRENCY,
+    ARUBA_MAX_RPS,
+    ARUBA_BACKGROUND_MAX_CONCURRENCY,
+    ARUBA_BACKGROUND_MAX_RPS,
+)
 from app.shared.constants import (
     ARUBA_BASE_URL,
     ARUBA_API_VERSION,
@@ -10,6 +18,42 @@ from app.shared.constants import (
     CHROME_USER_AGENT,
 )
 
+class ArubaRateLimiter:
+    """Limit for outbound Aruba calls: at most `max_concurrency` in flight
+    and at most `max_rps` started per second (evenly spaced).
+
+    Every call_api() goes through one of two instances (lanes): user-facing
+    calls (including fleet fan-outs) through aruba_rate_limiter, background
+    polling (snapshot collector, live feeds) through aruba_background_limiter.
+    Neither can burst past what the Aruba portal tolerates, and user requests
+    never queue behind collector traffic.
+    """
+
+    def __init__(self, max_concurrency: int, max_rps: float):
+        self._semaphore = asyncio.Semaphore(max(1, max_concurrency))
+        self._interval = 1.0 / max_rps if max_rps > 0 else 0.0
+        self._next_start = 0.0
+        self._lock = asyncio.Lock()
+
+    async def __aenter__(self):
+        await self._semaphore.acquire()
+        if self._interval:
+            async with self._lock:
+                now = time.monotonic()
+                wait = self._next_start - now
+                self._next_start = max(now, self._next_start) + self._interval
+            if wait > 0:
+                await asyncio.sleep(wait)
+        return self
+
+    async def __aexit__(self, *exc):
+        self._semaphore.release()
+
+
+aruba_rate_limiter = ArubaRateLimiter(ARUBA_MAX_CONCURRENCY, ARUBA_MAX_RPS)
+aruba_background_limiter = ArubaRateLimiter(ARUBA_BACKGROUND_MAX_CONCURRENCY, ARUBA_BACKGROUND_MAX_RPS)
+
+
 class ArubaService:
     def __init__(self):
         pass
@@ -29,10 +73,12 @@ class ArubaService:
         data: Any = None,
         json_data: Any = None,
         headers: Optional[Dict[str, str]] = None,
-        target_domain: Optional[str] = None
+        target_domain: Optional[str] = None,
+        background: bool = False,
     ) -> httpx.Response:
         """
         Executes a request to the Aruba API with automatic auth injection and header spoofing.
+        background=True routes the call through the background rate-limit lane.
         """
         base_url = f"https://{target_domain}" if target_domain else ARUBA_BASE_URL
         if not endpoint.startswith("http"):
@@ -72,8 +118,9 @@ class ArubaService:
         token_present = "Yes" if final_headers.get("Authorization") or final_headers.get("authorization") else "No"
         print(f"[ARUBA SERVICE] Token Presence: {token_present}")
 
-        # Execute Request
-        async with httpx.AsyncClient(
+        # Execute Request (under the rate limit of its lane)
+        limiter = aruba_background_limiter if background else aruba_rate_limiter
+        async with limiter, httpx.AsyncClient(
             timeout=30.0,
             follow_redirects=True,
             verify=False
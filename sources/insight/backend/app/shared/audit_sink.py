@@ -0,0 +1,113 @@
+"""Batched, bounded writer for audit_logs.
+
+Producers (the audit middleware, batch cloner operations) call submit(), which
+only appends to an in-memory buffer — no task and no Mongo round-trip per entry.
+A single background task flushes the buffer with insert_many when it reaches
+AUDIT_SINK_BATCH_SIZE or every AUDIT_SINK_FLUSH_INTERVAL_SECONDS, whichever
+comes first, and folds each written batch into the audit_rollups activity
+counters (see audit_stats_crud). When the buffer is full (Mongo down or slow),
+new entries are dropped and counted rather than growing memory without bound.
+lifespan() drains the buffer on shutdown.
+
+Like the other background tasks, this relies on a SINGLE Uvicorn worker.
+"""
+import asyncio
+from typing import Any, Dict, List, Optional
+from pymongo.errors import BulkWriteError
+from app.config import AUDIT_SINK_BATCH_SIZE, AUDIT_SINK_FLUSH_INTERVAL_SECONDS, AUDIT_SINK_MAX_BUFFER
+from app.database.audit_stats_crud import record_audit_rollups
+from app.database.auth_crud import with_actor
+from app.database.connection import get_database
+
+
+class AuditSink:
+    def __init__(self, batch_size: int, flush_interval: float, max_buffer: int):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+        self._buffer: List[Dict[str, Any]] = []
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+
+    def submit(self, entry: Dict[str, Any]) -> bool:
+        """Queue one audit entry. Never blocks; returns False if it was dropped."""
+        if len(self._buffer) >= self.max_buffer:
+            self.dropped += 1
+            if self.dropped == 1 or self.dropped % 1000 == 0:
+                print(f"[AUDIT] WARNING: buffer full ({self.max_buffer}), {self.dropped} entr(y/ies) dropped so far.")
+            return False
+        self._buffer.append(with_actor(entry))
+        if len(self._buffer) >= self.batch_size:
+            self._wakeup.set()
+        return True
+
+    async def flush(self) -> int:
+        """Write everything currently buffered, in insert_many batches."""
+        written = 0
+        while self._buffer:
+            batch = self._buffer[:self.batch_size]
+            del self._buffer[:self.batch_size]
+            stored = batch
+            try:
+                await get_database().audit_logs.insert_many(batch, ordered=False)
+            except BulkWriteError as e:
+                rejected = {err["index"] for err in e.details.get("writeErrors", [])}
+                stored = [entry for i, entry in enumerate(batch) if i not in rejected]
+                self.failed += len(rejected)
+                print(f"[AUDIT] ERROR: {len(rejected)} audit entr(y/ies) rejected by MongoDB.")
+            except Exception as e:
+                self.failed += len(batch)
+                print(f"[AUDIT] ERROR: failed to write {len(batch)} audit entr(y/ies): {e}")
+                continue
+            written += len(stored)
+            try:
+                await record_audit_rollups(stored)
+            except Exception as e:
+                print(f"[AUDIT] ERROR: failed to update activity rollups: {e}")
+        self.written += written
+        return written
+
+    async def _run(self):
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    def start(self):
+        """Start the background flusher. Called from lifespan()."""
+        if self._task is None or self._task.done():
+            self._stopping = False
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the flusher and drain whatever is still buffered."""
+        if self._task is not None:
+            # Let an in-flight insert_many finish instead of cancelling it mid-batch
+            self._stopping = True
+            self._wakeup.set()
+            await self._task
+            self._task = None
+        await self.flush()
+        print(f"[AUDIT] Sink drained — written {self.written}, dropped {self.dropped}, failed {self.failed}.")
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "buffered": len(self._buffer),
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed": self.failed,
+        }
+
+
+audit_sink = AuditSink(
+    batch_size=AUDIT_SINK_BATCH_SIZE,
+    flush_interval=AUDIT_SINK_FLUSH_INTERVAL_SECONDS,
+    max_buffer=AUDIT_SINK_MAX_BUFFER,
+)
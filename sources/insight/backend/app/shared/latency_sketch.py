@@ -0,0 +1,51 @@
+"""Compact mergeable latency sketch (log-bucketed histogram).
+
+A duration d (ms) falls in bucket i = ceil(log(d) / log(GAMMA)), i.e. buckets
+grow geometrically, so any quantile read back is within ~RELATIVE_ACCURACY of
+the true value while ~150 buckets cover 1 ms → 1 h. A sketch is just a
+{bucket: count} map: merging is adding counts, which is also what lets MongoDB
+maintain it with $inc on ingest.
+"""
+import math
+from typing import Dict, Iterable, Mapping, Optional
+
+RELATIVE_ACCURACY = 0.05
+GAMMA = (1 + RELATIVE_ACCURACY) / (1 - RELATIVE_ACCURACY)
+_LOG_GAMMA = math.log(GAMMA)
+
+
+def bucket_of(duration_ms: float) -> int:
+    """Bucket index for a duration; everything ≤ 1 ms shares bucket 0."""
+    if duration_ms <= 1:
+        return 0
+    return math.ceil(math.log(duration_ms) / _LOG_GAMMA)
+
+
+def bucket_value(index: int) -> float:
+    """Representative duration of a bucket (relative error ≤ RELATIVE_ACCURACY)."""
+    if index <= 0:
+        return 1.0 if index == 0 else 0.0
+    return 2 * GAMMA ** index / (GAMMA + 1)
+
+
+def merge(sketches: Iterable[Mapping[str, int]]) -> Dict[int, int]:
+    """Add bucket counts of several sketches (keys may be str, as stored in Mongo)."""
+    merged: Dict[int, int] = {}
+    for sketch in sketches:
+        for index, count in (sketch or {}).items():
+            merged[int(index)] = merged.get(int(index), 0) + count
+    return merged
+
+
+def quantile(sketch: Mapping[int, int], q: float) -> Optional[float]:
+    """Approximate q-quantile (0..1) of a merged sketch, or None if empty."""
+    total = sum(sketch.values())
+    if not total:
+        return None
+    rank = q * (total - 1)
+    seen = 0
+    for index in sorted(sketch):
+        seen += sketch[index]
+        if seen > rank:
+            return round(bucket_value(index), 1)
+    return round(bucket_value(max(sketch)), 1)
@@ -1,10 +1,9 @@
 import re
 import json
-import asyncio
 from datetime import datetime, timezone
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
-from app.database.auth_crud import insert_audit_log
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.shared.audit_sink import audit_sink
 from app.shared.jwt_utils import verify_insight_token
 
 
@@ -53,10 +52,14 @@ def _resolve_zone_action(path: str, method: str):
     return None
 
 
-def _extract_jwt_email(request: Request):
+_AUDITED_METHODS = frozenset({"POST", "PUT", "PATCH", "DELETE"})
+_MASTER_PATH_SEGMENTS = ("/cloner/", "/config/", "/overview/", "/inventory/")
+
+
+def _extract_jwt_email(headers: Headers):
     """Try to extract email from Insight JWT without raising."""
     try:
-        auth = request.headers.get("Authorization", "")
+        auth = headers.get("Authorization", "")
         if auth.startswith("Bearer "):
             payload = verify_insight_token(auth.split(" ", 1)[1])
             return payload.get("sub")
@@ -65,25 +68,75 @@ def _extract_jwt_email(request: Request):
     return None
 
 
-class GlobalLoggingMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        if request.method not in ["POST", "PUT", "PATCH", "DELETE"]:
-            return await call_next(request)
+def _parse_payload(body_bytes: bytes):
+    """Decode the audited request body, dropping password/token fields."""
+    if not body_bytes:
+        return None
+    try:
+        payload_data = json.loads(body_bytes)
+        if isinstance(payload_data, dict):
+            for key in [k for k in payload_data if "password" in k.lower() or "token" in k.lower()]:
+                del payload_data[key]
+        return payload_data
+    except Exception:
+        return {"raw": body_bytes.decode("utf-8", errors="ignore")}
+
+
+class GlobalLoggingMiddleware:
+    """Pure ASGI audit middleware.
 
-        path = str(request.url.path)
+    Non-audited requests (every GET, and any path without an action label) are
+    handed straight to the app — no wrapper task, no stream, no Request object.
+    Audited requests tee the receive channel: body chunks are recorded as the
+    route reads them, never buffered up front and replayed. The body is only
+    decoded after the response, when the audit entry is built.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["method"] not in _AUDITED_METHODS:
+            return await self.app(scope, receive, send)
+
+        path = scope["path"]
+        method = scope["method"]
 
         # Resolve action label
         action_name = _EXACT_ACTIONS.get(path)
         if action_name is None:
-            action_name = _resolve_zone_action(path, request.method)
+            action_name = _resolve_zone_action(path, method)
         if action_name is None:
-            return await call_next(request)
+            return await self.app(scope, receive, send)
 
-        # Identity: prefer JWT sub, fall back to X-Insight-User header
-        actor_email = _extract_jwt_email(request) or request.headers.get("X-Insight-User", "anonymous")
+        body_chunks = []
+        status_code = 500
+
+        async def tee_receive() -> Message:
+            message = await receive()
+            if message["type"] == "http.request":
+                body_chunks.append(message.get("body", b""))
+            return message
 
-        method = request.method
-        ip_address = request.client.host if request.client else None
+        async def send_with_status(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, tee_receive, send_with_status)
+        finally:
+            self._audit(scope, path, method, action_name, b"".join(body_chunks), status_code)
+
+    @staticmethod
+    def _audit(scope: Scope, path: str, method: str, action_name: str, body_bytes: bytes, status_code: int):
+        headers = Headers(scope=scope)
+
+        # Identity: prefer JWT sub, fall back to X-Insight-User header
+        actor_email = _extract_jwt_email(headers) or headers.get("X-Insight-User", "anonymous")
+        client = scope.get("client")
+        ip_address = client[0] if client else None
 
         # Extract contextual IDs from path
         site_match = _SITE_ID_RE.search(path)
@@ -91,20 +144,7 @@ class GlobalLoggingMiddleware(BaseHTTPMiddleware):
         zone_match = _ZONE_ID_RE.search(path)
         zone_id = zone_match.group(1) if zone_match else None
 
-        # Detect master token usage (any cloner/config/overview/inventory call = master)
-        master_account_used = any(seg in path for seg in ["/cloner/", "/config/", "/overview/", "/inventory/"])
-
-        # Read request body safely
-        body_bytes = await request.body()
-        payload_data = None
-        if body_bytes:
-            try:
-                payload_data = json.loads(body_bytes.decode("utf-8"))
-                if isinstance(payload_data, dict):
-                    for key in [k for k in payload_data if "password" in k.lower() or "token" in k.lower()]:
-                        del payload_data[key]
-            except Exception:
-                payload_data = {"raw": body_bytes.decode("utf-8", errors="ignore")}
+        payload_data = _parse_payload(body_bytes)
 
         # Extract site_id from body too (sync ops send target_site_ids)
         if not site_id and isinstance(payload_data, dict):
@@ -114,49 +154,31 @@ class GlobalLoggingMiddleware(BaseHTTPMiddleware):
             elif isinstance(ids, str):
                 site_id = ids
 
-        receive_called = False
-        async def receive():
-            nonlocal receive_called
-            if receive_called:
-                return {"type": "http.disconnect"}
-            receive_called = True
-            return {"type": "http.request", "body": body_bytes, "more_body": False}
-
-        request._receive = receive
+        # Use 'target_zone_ids' if present in body
+        if not zone_id and isinstance(payload_data, dict):
+            z_ids = payload_data.get("target_zone_ids")
+            if isinstance(z_ids, list) and z_ids:
+                zone_id = z_ids[0] # Track primary target zone
 
-        status_code = 500
-        try:
-            response = await call_next(request)
-            status_code = response.status_code
-        except Exception as e:
-            raise e
-        finally:
-            # Try to determine admin_master_id if possible
-            # Simplified to Master System for now unless a specific account is known
-            admin_master_id = "Master System" if master_account_used else None
-            
-            # Use 'target_zone_ids' if present in body
-            if not zone_id and isinstance(payload_data, dict):
-                z_ids = payload_data.get("target_zone_ids")
-                if isinstance(z_ids, list) and z_ids:
-                    zone_id = z_ids[0] # Track primary target zone
-            
-            status_text = "SUCCESS" if 200 <= status_code < 300 else "ERROR"
-            
-            log_entry = {
-                "timestamp": datetime.now(timezone.utc),
-                "insight_user_id": actor_email,
-                "admin_master_id": admin_master_id,
-                "action": action_name,
-                "zone_id": zone_id,
-                "site_id": site_id,
-                "status": status_text,
-                "method": method,
-                "endpoint": path,
-                "payload": payload_data,
-                "ip_address": ip_address,
-                "statusCode": status_code,
-            }
-            asyncio.create_task(insert_audit_log(log_entry))
-
-        return response
+        # Detect master token usage (any cloner/config/overview/inventory call = master)
+        # Simplified to Master System for now unless a specific account is known
+        master_account_used = any(seg in path for seg in _MASTER_PATH_SEGMENTS)
+        admin_master_id = "Master System" if master_account_used else None
+
+        status_text = "SUCCESS" if 200 <= status_code < 300 else "ERROR"
+
+        log_entry = {
+            "timestamp": datetime.now(timezone.utc),
+            "insight_user_id": actor_email,
+            "admin_master_id": admin_master_id,
+            "action": action_name,
+            "zone_id": zone_id,
+            "site_id": site_id,
+            "status": status_text,
+            "method": method,
+            "endpoint": path,
+            "payload": payload_data,
+            "ip_address": ip_address,
+            "statusCode": status_code,
+        }
+        audit_sink.submit(log_entry)
@@ -0,0 +1,37 @@
+"""Bounded fan-out primitives shared by the live (WebSocket / SSE) endpoints."""
+import asyncio
+from typing import Any, List
+
+
+class DropOldestQueue:
+    """Bounded asyncio queue that never blocks the producer.
+
+    When a slow consumer lets the queue fill up, the oldest item is discarded to
+    make room and counted in `dropped`, so one stalled client can never hold up
+    the publisher or grow memory without bound.
+    """
+
+    def __init__(self, maxsize: int):
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.dropped = 0
+
+    def put(self, item: Any):
+        try:
+            self._queue.put_nowait(item)
+        except asyncio.QueueFull:
+            self._queue.get_nowait()
+            self.dropped += 1
+            self._queue.put_nowait(item)
+
+    async def get_batch(self, window: float, max_items: int) -> List[Any]:
+        """Wait for one item, then collect whatever else arrives within `window` seconds."""
+        batch = [await self._queue.get()]
+        if window > 0:
+            await asyncio.sleep(window)
+        while len(batch) < max_items and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        return batch
+
+    def take_dropped(self) -> int:
+        dropped, self.dropped = self.dropped, 0
+        return dropped
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Captured Sites Backfill — Run once after enabling ingest-time site extraction.
+
+New captures maintain the captured_sites collection as they arrive. This script
+replays the raw_logs captured before that (still within retention) so the cloner's
+"captured source" list is complete immediately:
+
+  - site UUIDs addressed in request paths (/api/sites/<uuid>/...)
+  - named sites listed in sites-list responses (/api/v1/.../sites, /api/sites)
+
+Usage:
+  python backfill_captured_sites.py [--dry-run]
+"""
+import asyncio
+import sys
+from motor.motor_asyncio import AsyncIOMotorClient
+
+import app.database.connection as connection
+from app.config import MONGODB_URL, DATABASE_NAME
+from app.database.bodies_crud import hydrate_stream
+from app.database.captured_sites_crud import record_captured_sites
+from app.features.capture.site_tags import site_id_from_path, sites_from_body
+
+DRY_RUN = "--dry-run" in sys.argv
+
+
+async def backfill():
+    client = AsyncIOMotorClient(MONGODB_URL)
+    connection.db = client[DATABASE_NAME]
+    db = connection.db
+
+    print(f"[backfill_captured_sites] Connected to {MONGODB_URL} / {DATABASE_NAME}")
+    if DRY_RUN:
+        print("[backfill_captured_sites] DRY RUN — no changes will be written.\n")
+
+    cursor = db.raw_logs.find(
+        {"url": {"$regex": "/sites"}},
+        {"url": 1, "path": 1, "status_code": 1, "timestamp": 1, "response_body_ref": 1},
+    ).sort("timestamp", 1)
+
+    scanned, seen = 0, set()
+    async for log in hydrate_stream(cursor, {"response_body_ref": "response_body"}):
+        scanned += 1
+        path_site_id = site_id_from_path(log.get("path") or log.get("url", ""))
+        named = sites_from_body(log.get("url", ""), log.get("response_body")) \
+            if (log.get("status_code") or 0) < 400 else []
+        seen.update(s["site_id"] for s in named)
+        if path_site_id:
+            seen.add(path_site_id)
+        if not DRY_RUN and log.get("timestamp"):
+            await record_captured_sites(log["timestamp"], path_site_id, named)
+
+    print(f"[backfill_captured_sites] Scanned {scanned} log(s), found {len(seen)} site(s).")
+    print("\n[backfill_captured_sites] Done.")
+    client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(backfill())
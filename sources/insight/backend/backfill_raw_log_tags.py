@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Raw Log Site Tags Backfill — Run once after enabling ingest-time site tagging.
+
+New captures store site_id / resource_kind on site-scoped raw logs
+(/api/sites/<uuid>/networksSummary → site_id=<uuid>, resource_kind=networksSummary),
+which the cloner's "preview from captured" queries through the partial
+site_config_lookup index (untagged logs are not in it). This script tags logs captured before
+that, one update per distinct path.
+
+Usage:
+  python backfill_raw_log_tags.py [--dry-run]
+"""
+import asyncio
+import sys
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from app.config import MONGODB_URL, DATABASE_NAME
+from app.features.capture.site_tags import site_id_from_path, resource_kind_from_path
+
+DRY_RUN = "--dry-run" in sys.argv
+
+
+async def backfill():
+    client = AsyncIOMotorClient(MONGODB_URL)
+    db = client[DATABASE_NAME]
+
+    print(f"[backfill_raw_log_tags] Connected to {MONGODB_URL} / {DATABASE_NAME}")
+    if DRY_RUN:
+        print("[backfill_raw_log_tags] DRY RUN — no changes will be written.\n")
+
+    query = {"site_id": {"$exists": False}, "path": {"$regex": "/sites/"}}
+    paths = await db.raw_logs.distinct("path", query)
+    tagged = 0
+    for path in paths:
+        site_id = site_id_from_path(path)
+        if not site_id or DRY_RUN:
+            continue
+        result = await db.raw_logs.update_many(
+            {**query, "path": path},
+            {"$set": {"site_id": site_id, "resource_kind": resource_kind_from_path(path)}},
+        )
+        tagged += result.modified_count
+
+    print(f"[backfill_raw_log_tags] {len(paths)} distinct untagged site path(s), {tagged} log(s) tagged.")
+    print("\n[backfill_raw_log_tags] Done.")
+    client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(backfill())
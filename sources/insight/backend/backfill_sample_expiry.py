@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Endpoint Sample Expiry Backfill — Run once after upgrading.
+
+Endpoint body samples are references into the `bodies` collection. Bodies used
+to receive only the raw log's expiry (RAW_LOG_RETENTION_DAYS), so an endpoint
+not seen for that long lost its samples to the TTL while the endpoint itself is
+kept for ENDPOINT_RETENTION_DAYS. New captures store samples with the endpoint's
+expiry; this script extends the bodies already referenced as samples to
+last_seen_at + ENDPOINT_RETENTION_DAYS (expire_at only ever moves forward).
+
+Usage:
+  python backfill_sample_expiry.py [--dry-run]
+"""
+import asyncio
+import sys
+from datetime import timezone
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
+
+import app.database.connection as connection
+from app.config import MONGODB_URL, DATABASE_NAME
+from app.database.crud import endpoint_sample_expire_at
+
+DRY_RUN = "--dry-run" in sys.argv
+BATCH_SIZE = 1000
+
+
+async def backfill():
+    client = AsyncIOMotorClient(MONGODB_URL)
+    connection.db = client[DATABASE_NAME]
+    db = connection.db
+
+    print(f"[backfill_sample_expiry] Connected to {MONGODB_URL} / {DATABASE_NAME}")
+    if DRY_RUN:
+        print("[backfill_sample_expiry] DRY RUN — no changes will be written.\n")
+
+    cursor = db.endpoints.find(
+        {"$or": [{"request_body_sample_ref": {"$type": "string"}}, {"response_body_sample_ref": {"$type": "string"}}]},
+        {"request_body_sample_ref": 1, "response_body_sample_ref": 1, "last_seen_at": 1},
+    )
+
+    scanned, ops = 0, []
+    async for ep in cursor:
+        scanned += 1
+        last_seen = ep.get("last_seen_at")
+        if last_seen is not None and last_seen.tzinfo is None:
+            last_seen = last_seen.replace(tzinfo=timezone.utc)
+        expire_at = endpoint_sample_expire_at(last_seen)
+        for ref in (ep.get("request_body_sample_ref"), ep.get("response_body_sample_ref")):
+            if ref:
+                ops.append(UpdateOne({"_id": ref}, {"$max": {"expire_at": expire_at}}))
+        if not DRY_RUN and len(ops) >= BATCH_SIZE:
+            await db.bodies.bulk_write(ops, ordered=False)
+            ops = []
+
+    if not DRY_RUN and ops:
+        await db.bodies.bulk_write(ops, ordered=False)
+
+    print(f"[backfill_sample_expiry] Scanned {scanned} endpoint(s) with body samples.")
+    print("\n[backfill_sample_expiry] Done.")
+    client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(backfill())
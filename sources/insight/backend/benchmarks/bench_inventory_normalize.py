@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark — inventory normalization and serialization of a large fleet.
+
+Builds a synthetic raw Aruba device listing and compares, per payload:
+
+  pydantic        — the previous path: per-item string matching, one
+                    DeviceResponse per device, then the list validated again
+                    through TypeAdapter(List[DeviceResponse]) as FastAPI's
+                    response_model did, and JSON-encoded
+  records         — normalize_devices() (table-driven status/type mapping,
+                    __slots__ DeviceRecord) serialized straight to JSON, as the
+                    inventory routes now do
+
+No Aruba or Mongo involved.
+
+Usage (from the backend directory):
+  python benchmarks/bench_inventory_normalize.py [--devices N] [--rounds N]
+"""
+import json
+import os
+import random
+import sys
+import time
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pydantic import TypeAdapter
+
+from app.features.inventory.schemas import DeviceResponse, DeviceStatus, DeviceType
+from app.features.inventory.service import normalize_devices
+
+DEVICES = int(sys.argv[sys.argv.index("--devices") + 1]) if "--devices" in sys.argv else 50000
+ROUNDS = int(sys.argv[sys.argv.index("--rounds") + 1]) if "--rounds" in sys.argv else 3
+
+STATES = ["ONLINE", "Active", "OFFLINE", "down", "ALERT", "PROBLEM", "UNKNOWN"]
+RAW_TYPES = ["accessPoint", "switch", "gateway", "stack"]
+
+
+def _payload(n: int) -> dict:
+    rng = random.Random(42)
+    return {"elements": [
+        {
+            "id": f"dev-{i}",
+            "name": f"AP-{i:05d}",
+            "state": rng.choice(STATES),
+            "deviceType": rng.choice(RAW_TYPES),
+            "serialNumber": f"SN{i:010d}",
+            "macAddress": ":".join(f"{rng.randrange(256):02x}" for _ in range(6)),
+            "uptime": rng.randrange(10 ** 7),
+            "connectedClients": rng.randrange(60),
+            "firmwareVersion": rng.choice(["2.8.0", "2.8.1", "2.9.0"]),
+            "ipAddress": "10.0.0.1",  # scrubbed
+            "model": "AP22",           # scrubbed
+        }
+        for i in range(n)
+    ]}
+
+
+def _pydantic_device(item: dict, site_id: str) -> DeviceResponse:
+    """The per-item mapping normalize_devices replaced."""
+    raw_state = item.get("state", "UNKNOWN").upper()
+    status = DeviceStatus.UNKNOWN
+    if raw_state in ["ONLINE", "ACTIVE"]:
+        status = DeviceStatus.ONLINE
+    elif raw_state in ["OFFLINE", "DOWN"]:
+        status = DeviceStatus.OFFLINE
+    elif raw_state in ["ALERT", "PROBLEM"]:
+        status = DeviceStatus.ALERT
+
+    raw_type = item.get("deviceType", "UNKNOWN").lower()
+    dtype = DeviceType.UNKNOWN
+    if "ap" in raw_type or "accesspoint" in raw_type:
+        dtype = DeviceType.AP
+    elif "switch" in raw_type:
+        dtype = DeviceType.SWITCH
+
+    return DeviceResponse(
+        id=item.get("id", "unknown"),
+        name=item.get("name", "Unknown Device"),
+        status=status,
+        type=dtype,
+        serial_number=item.get("serialNumber"),
+        mac_address=item.get("macAddress"),
+        site_id=site_id,
+        uptime_seconds=item.get("uptime", 0),
+        client_count=item.get("connectedClients", 0),
+        firmware_version=item.get("firmwareVersion"),
+    )
+
+
+_RESPONSE_ADAPTER = TypeAdapter(List[DeviceResponse])
+
+
+def _run_pydantic(payload: dict) -> bytes:
+    devices = [_pydantic_device(item, "site-1") for item in payload["elements"]]
+    validated = _RESPONSE_ADAPTER.validate_python([d.model_dump() for d in devices])
+    return _RESPONSE_ADAPTER.dump_json(validated)
+
+
+def _run_records(payload: dict) -> bytes:
+    devices = normalize_devices(payload, "site-1")
+    return json.dumps([d.to_dict() for d in devices]).encode()
+
+
+def _best_of(fn, payload: dict) -> float:
+    best = float("inf")
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        fn(payload)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    payload = _payload(DEVICES)
+    assert json.loads(_run_pydantic(payload)) == json.loads(_run_records(payload))
+
+    print(f"{DEVICES} devices, best of {ROUNDS} rounds\n")
+    print(f"{'path':12}{'ms':>10}{'µs/device':>12}")
+    results = {"pydantic": _best_of(_run_pydantic, payload), "records": _best_of(_run_records, payload)}
+    for name, ms in results.items():
+        print(f"{name:12}{ms:10.1f}{ms * 1000 / DEVICES:12.2f}")
+    print(f"\nspeedup: {results['pydantic'] / results['records']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark — per-request overhead of the audit middleware.
+
+Drives a minimal Starlette app directly through ASGI (no sockets, no server),
+so the numbers isolate middleware cost. Compares, per request:
+
+  bare            — the app with no middleware
+  base_http       — an empty BaseHTTPMiddleware passthrough (the old
+                    GlobalLoggingMiddleware's floor, before any audit work)
+  audit           — GlobalLoggingMiddleware
+
+for a GET (never audited), a non-audited POST and an audited POST with a
+JSON body. Audit sink submission is replaced with a no-op so Mongo is not involved.
+
+Usage (from the backend directory):
+  python benchmarks/bench_logging_middleware.py [--requests N]
+"""
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from starlette.applications import Starlette
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+import app.shared.logging_middleware as logging_middleware
+
+REQUESTS = int(sys.argv[sys.argv.index("--requests") + 1]) if "--requests" in sys.argv else 20000
+AUDITED_BODY = json.dumps({"target_site_ids": ["site-1", "site-2"], "password": "x", "ssid": "Guest"}).encode()
+
+logging_middleware.audit_sink.submit = lambda entry: True
+
+
+async def _handler(request: Request):
+    if request.method != "GET":
+        await request.body()
+    return JSONResponse({"ok": True})
+
+
+def _app():
+    return Starlette(routes=[
+        Route("/api/v1/overview/sites", _handler, methods=["GET"]),
+        Route("/api/v1/replay/run", _handler, methods=["POST"]),
+        Route("/api/v1/cloner/sync-config", _handler, methods=["POST"]),
+    ])
+
+
+class _Passthrough(BaseHTTPMiddleware):
+    async def dispatch(self, request, call_next):
+        return await call_next(request)
+
+
+def _scope(method: str, path: str) -> dict:
+    return {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": method, "scheme": "http", "path": path, "raw_path": path.encode(),
+        "query_string": b"", "root_path": "", "server": ("bench", 80), "client": ("127.0.0.1", 5000),
+        "headers": [(b"content-type", b"application/json"), (b"x-insight-user", b"bench@example.com")],
+    }
+
+
+async def _run(app, method: str, path: str, body: bytes, n: int) -> float:
+    async def send(message):
+        pass
+
+    start = time.perf_counter()
+    for _ in range(n):
+        sent = False
+
+        async def receive():
+            nonlocal sent
+            if sent:
+                return {"type": "http.disconnect"}
+            sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        await app(_scope(method, path), receive, send)
+    return (time.perf_counter() - start) / n * 1e6
+
+
+async def main():
+    variants = {
+        "bare": _app(),
+        "base_http": _Passthrough(_app()),
+        "audit": logging_middleware.GlobalLoggingMiddleware(_app()),
+    }
+    cases = [
+        ("GET  /overview/sites", "GET", "/api/v1/overview/sites", b""),
+        ("POST /replay/run (not audited)", "POST", "/api/v1/replay/run", AUDITED_BODY),
+        ("POST /cloner/sync-config (audited)", "POST", "/api/v1/cloner/sync-config", AUDITED_BODY),
+    ]
+
+    print(f"{REQUESTS} requests per case, µs/request\n")
+    print(f"{'case':38}" + "".join(f"{name:>12}" for name in variants))
+    for label, method, path, body in cases:
+        row = []
+        for app in variants.values():
+            await _run(app, method, path, body, min(REQUESTS, 500))  # warm-up
+            row.append(await _run(app, method, path, body, REQUESTS))
+        print(f"{label:38}" + "".join(f"{us:12.1f}" for us in row))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
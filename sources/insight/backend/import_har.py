@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+HAR Import — Back-fill the capture store from browser HAR exports.
+
+Streams the file (memory stays bounded by the largest single entry), maps each
+entry onto the extension's capture model and runs it through the same bulk
+ingest path as /api/v1/capture/batch: endpoints, raw_logs (backdated to the
+entry's startedDateTime), captured_sites and endpoint_stats are all updated.
+
+Note: entries older than the raw-log retention expire on the next TTL pass;
+their endpoint documents and stats are kept.
+
+Usage:
+  python import_har.py <file.har> [<file.har> ...] [--batch-size N]
+"""
+import asyncio
+import sys
+from motor.motor_asyncio import AsyncIOMotorClient
+
+import app.database.connection as connection
+from app.config import MONGODB_URL, DATABASE_NAME
+from app.features.capture.har import import_har, read_har_file, HAR_IMPORT_BATCH_SIZE
+from app.features.capture.routes import ingest_captures
+
+
+def _args():
+    files, batch_size = [], HAR_IMPORT_BATCH_SIZE
+    argv = iter(sys.argv[1:])
+    for arg in argv:
+        if arg == "--batch-size":
+            batch_size = int(next(argv))
+        else:
+            files.append(arg)
+    return files, batch_size
+
+
+async def main():
+    files, batch_size = _args()
+    if not files:
+        print(__doc__)
+        sys.exit(1)
+
+    client = AsyncIOMotorClient(MONGODB_URL)
+    connection.client = client
+    connection.db = client[DATABASE_NAME]
+    print(f"[import_har] Connected to {MONGODB_URL} / {DATABASE_NAME}")
+
+    for path in files:
+        print(f"\n[import_har] {path}")
+        report = {}
+        async for report in import_har(read_har_file(path), ingest_captures, batch_size):
+            print(
+                f"  entries={report['entries']} processed={report['processed']} "
+                f"failed={report['failed']} skipped={report['skipped']}",
+                end="\r",
+            )
+        print(f"\n[import_har] Done: {report}")
+
+    client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Audit Actor Migration — Run once after introducing the normalized `actor` field.
+
+Audit entries used to carry the acting user in either actor_email or
+insight_user_id, so the admin/zone log views had to query both with an $or.
+New entries get a single lowercased `actor` field at write time, indexed as
+(actor, timestamp). This script back-fills `actor` on existing entries.
+
+Usage:
+  python migrate_audit_actor.py [--dry-run]
+"""
+import asyncio
+import sys
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from app.config import MONGODB_URL, DATABASE_NAME
+
+DRY_RUN = "--dry-run" in sys.argv
+
+
+async def migrate():
+    client = AsyncIOMotorClient(MONGODB_URL)
+    db = client[DATABASE_NAME]
+
+    print(f"[migrate_audit_actor] Connected to {MONGODB_URL} / {DATABASE_NAME}")
+    if DRY_RUN:
+        print("[migrate_audit_actor] DRY RUN — no changes will be written.\n")
+
+    query = {"actor": {"$exists": False}}
+    pending = await db.audit_logs.count_documents(query)
+    print(f"[migrate_audit_actor] {pending} audit entr(y/ies) without actor")
+
+    if not DRY_RUN and pending:
+        result = await db.audit_logs.update_many(query, [{
+            "$set": {
+                "actor": {
+                    "$toLower": {
+                        "$trim": {
+                            "input": {"$ifNull": ["$actor_email", {"$ifNull": ["$insight_user_id", "anonymous"]}]}
+                        }
+                    }
+                }
+            }
+        }])
+        print(f"[migrate_audit_actor] Updated {result.modified_count} entr(y/ies)")
+
+    print("\n[migrate_audit_actor] Done.")
+    client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(migrate())
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Endpoint Path Template Migration — Run once after enabling path templating.
+
+Before templating, every site/device produced its own endpoint document
+(GET-https://host/api/sites/<uuid>/networksSummary, one per site). This script:
+
+  1. Re-keys every endpoint with the templated path and merges documents that
+     collapse onto the same key (counts summed, status codes / dependencies
+     unioned, headers / cookies / query params merged, newest sample kept).
+  2. Backfills raw_logs.path_template for logs captured before templating.
+  3. Folds endpoint_history rows with concrete paths into their templated row.
+
+Usage:
+  python migrate_endpoint_templates.py [--dry-run]
+"""
+import asyncio
+import sys
+from collections import defaultdict
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from app.config import MONGODB_URL, DATABASE_NAME
+from app.features.capture.path_template import template_path, endpoint_key
+
+DRY_RUN = "--dry-run" in sys.argv
+
+
+def _endpoint_url(doc: dict) -> str:
+    """Recover the request URL from a legacy api_key (METHOD-https://host/path)."""
+    _, _, url = doc.get("api_key", "").partition("-")
+    return url or f"https://{doc.get('domain', 'unknown')}{doc.get('path', '/')}"
+
+
+def _merge(docs: list, new_key: str) -> dict:
+    """Merge endpoint docs (sorted oldest → newest last_seen_at) into one."""
+    base = dict(docs[-1])
+    merged_qp, merged_cookies, merged_headers = {}, {}, {}
+    status_codes, dependencies = set(), set()
+    for d in docs:
+        merged_qp.update(d.get("query_params") or {})
+        merged_cookies.update(d.get("cookies") or {})
+        merged_headers.update(d.get("request_headers") or {})
+        status_codes.update(d.get("status_codes") or [])
+        dependencies.update(d.get("dependencies") or [])
+
+    first_seen = [d["first_seen_at"] for d in docs if d.get("first_seen_at")]
+    base.update({
+        "api_key": new_key,
+        "path": template_path(base.get("path", "/")),
+        "sample_path": base.get("sample_path") or base.get("path", "/"),
+        "query_params": merged_qp,
+        "cookies": merged_cookies,
+        "request_headers": merged_headers,
+        "status_codes": sorted(status_codes),
+        "dependencies": sorted(dependencies),
+        "request_count": sum(d.get("request_count", 0) for d in docs),
+        "first_seen_at": min(first_seen) if first_seen else base.get("first_seen_at"),
+    })
+    return base
+
+
+async def migrate_endpoints(db) -> int:
+    docs = await db.endpoints.find({}).sort("last_seen_at", 1).to_list(None)
+    groups = defaultdict(list)
+    for d in docs:
+        path = d.get("sample_path") or d.get("path", "/")
+        groups[endpoint_key(d.get("method", "GET"), _endpoint_url(d), path)].append(d)
+
+    removed = 0
+    for new_key, group in groups.items():
+        if len(group) == 1 and group[0].get("api_key") == new_key and group[0].get("sample_path"):
+            continue
+        merged = _merge(group, new_key)
+        stale_ids = [d["_id"] for d in group if d["_id"] != merged["_id"]]
+        print(f"  [{new_key}] ← {len(group)} document(s)")
+        if not DRY_RUN:
+            await db.endpoints.replace_one({"_id": merged["_id"]}, merged)
+            if stale_ids:
+                await db.endpoints.delete_many({"_id": {"$in": stale_ids}})
+        removed += len(stale_ids)
+    return removed
+
+
+async def backfill_raw_logs(db) -> int:
+    updated = 0
+    paths = await db.raw_logs.distinct("path", {"path_template": {"$exists": False}})
+    for path in paths:
+        if DRY_RUN:
+            continue
+        result = await db.raw_logs.update_many(
+            {"path": path, "path_template": {"$exists": False}},
+            {"$set": {"path_template": template_path(path)}},
+        )
+        updated += result.modified_count
+    print(f"  {len(paths)} distinct legacy path(s) in raw_logs")
+    return updated
+
+
+async def migrate_history(db) -> int:
+    folded = 0
+    async for row in db.endpoint_history.find({}):
+        templated = template_path(row.get("path", "/"))
+        if templated == row.get("path"):
+            continue
+        folded += 1
+        if DRY_RUN:
+            continue
+        inc = {k: row.get(k, 0) for k in ("count", "error_count", "duration_total_ms")}
+        inc.update({f"status_counts.{code}": n for code, n in (row.get("status_counts") or {}).items()})
+        update = {"$inc": inc, "$max": {"duration_max_ms": row.get("duration_max_ms", 0)}}
+        if row.get("last_seen_at"):
+            update["$max"]["last_seen_at"] = row["last_seen_at"]
+        if row.get("first_seen_at"):
+            update["$min"] = {"first_seen_at": row["first_seen_at"]}
+        await db.endpoint_history.update_one(
+            {"domain": row["domain"], "method": row["method"], "path": templated, "day": row["day"]},
+            update,
+            upsert=True,
+        )
+        await db.endpoint_history.delete_one({"_id": row["_id"]})
+    return folded
+
+
+async def migrate():
+    client = AsyncIOMotorClient(MONGODB_URL)
+    db = client[DATABASE_NAME]
+
+    print(f"[migrate_endpoint_templates] Connected to {MONGODB_URL} / {DATABASE_NAME}")
+    if DRY_RUN:
+        print("[migrate_endpoint_templates] DRY RUN — no changes will be written.\n")
+
+    before = await db.endpoints.count_documents({})
+    removed = await migrate_endpoints(db)
+    print(f"\n[migrate_endpoint_templates] Endpoints: {before} → {before - removed} ({removed} merged away)")
+
+    updated = await backfill_raw_logs(db)
+    print(f"[migrate_endpoint_templates] raw_logs path_template backfilled: {updated}")
+
+    folded = await migrate_history(db)
+    print(f"[migrate_endpoint_templates] endpoint_history rows folded: {folded}")
+
+    print("\n[migrate_endpoint_templates] Done.")
+    client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(migrate())
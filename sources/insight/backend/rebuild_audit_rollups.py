@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Audit Rollups Rebuild — Run once after enabling audit activity rollups (or to
+repair them).
+
+The audit sink keeps audit_rollups up to date for every entry it writes. This
+script recomputes the hourly/daily counters from the audit_logs still inside
+the 90-day TTL window: it clears audit_rollups, then folds every entry written
+before the script started. Entries written while it runs are counted by the
+live sink as usual.
+
+Usage:
+  python rebuild_audit_rollups.py [--dry-run]
+"""
+import asyncio
+import sys
+from datetime import datetime, timezone
+from motor.motor_asyncio import AsyncIOMotorClient
+
+import app.database.connection as connection
+from app.config import MONGODB_URL, DATABASE_NAME
+from app.database.audit_stats_crud import record_audit_rollups, ROLLUP_DIMENSIONS
+
+DRY_RUN = "--dry-run" in sys.argv
+BATCH_SIZE = 5000
+
+
+async def rebuild():
+    client = AsyncIOMotorClient(MONGODB_URL)
+    connection.db = client[DATABASE_NAME]
+    db = connection.db
+
+    print(f"[rebuild_audit_rollups] Connected to {MONGODB_URL} / {DATABASE_NAME}")
+    if DRY_RUN:
+        print("[rebuild_audit_rollups] DRY RUN — no changes will be written.\n")
+    else:
+        cleared = (await db.audit_rollups.delete_many({})).deleted_count
+        print(f"[rebuild_audit_rollups] Cleared {cleared} rollup document(s)")
+
+    started_at = datetime.now(timezone.utc)
+    projection = {"_id": 0, "timestamp": 1, **{d: 1 for d in ROLLUP_DIMENSIONS}}
+    cursor = db.audit_logs.find({"timestamp": {"$lt": started_at}}, projection)
+
+    folded, batch = 0, []
+    async for entry in cursor:
+        batch.append(entry)
+        if len(batch) >= BATCH_SIZE:
+            if not DRY_RUN:
+                await record_audit_rollups(batch)
+            folded += len(batch)
+            batch = []
+            print(f"  {folded} entr(y/ies) folded", end="\r")
+    if batch and not DRY_RUN:
+        await record_audit_rollups(batch)
+    folded += len(batch)
+
+    print(f"\n[rebuild_audit_rollups] Folded {folded} audit entr(y/ies).")
+    print("\n[rebuild_audit_rollups] Done.")
+    client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(rebuild())
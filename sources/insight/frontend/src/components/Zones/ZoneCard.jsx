@@ -112,6 +112,31 @@ const ZoneCard = ({ zone, isGlobalAdmin, onUpdated, onDelete, allUsers = [] }) =
         </div>
       </div>
 
+      {/* Zone rollup (precomputed from site snapshots) */}
+      {zone.rollup && (
+        <div className="grid grid-cols-4 gap-2 px-3 py-2 border-b border-slate-800 text-[10px] text-slate-500">
+          <div>
+            <p className="uppercase tracking-wider">Devices</p>
+            <p className="text-xs text-slate-200">
+              {zone.rollup.devices}
+              {zone.rollup.devices_offline > 0 && <span className="text-rose-400"> ({zone.rollup.devices_offline} off)</span>}
+            </p>
+          </div>
+          <div>
+            <p className="uppercase tracking-wider">Clients</p>
+            <p className="text-xs text-slate-200">{zone.rollup.clients}</p>
+          </div>
+          <div>
+            <p className="uppercase tracking-wider">Worst health</p>
+            <p className="text-xs text-slate-200">{zone.rollup.worst_health_score ?? '—'}</p>
+          </div>
+          <div>
+            <p className="uppercase tracking-wider">Alerts</p>
+            <p className={`text-xs ${zone.rollup.open_alerts > 0 ? 'text-amber-400' : 'text-slate-200'}`}>{zone.rollup.open_alerts}</p>
+          </div>
+        </div>
+      )}
+
       {/* Sites drop target */}
       <div className={`p-2 space-y-2 border-b border-slate-800 ${isOver ? 'bg-blue-900/10' : ''}`}>
         {(zone.site_ids || []).length > 0 && (
@@ -0,0 +1,112 @@
+import { useEffect, useRef } from 'react';
+import apiClient from '../api/apiClient';
+
+/**
+ * Apply a JSON Merge Patch (RFC 7386) to a value.
+ */
+const applyMergePatch = (target, patch) => {
+    if (patch === null || typeof patch !== 'object' || Array.isArray(patch)) return patch;
+    const result = (target && typeof target === 'object' && !Array.isArray(target)) ? { ...target } : {};
+    Object.entries(patch).forEach(([key, value]) => {
+        if (value === null) delete result[key];
+        else result[key] = applyMergePatch(result[key], value);
+    });
+    return result;
+};
+
+/**
+ * Subscribe to a site resource over /overview/stream (Server-Sent Events).
+ * The server polls each (site, resource) once for all viewers and only pushes changes.
+ * fetch() is used instead of EventSource so the Authorization header can be sent.
+ * A 401 goes through apiClient's refresh/logout flow before reconnecting; a 403
+ * (site not visible) stops the stream.
+ *
+ * @param {string} siteId - Site to watch (null to pause)
+ * @param {string} resource - Aruba site sub-path, e.g. 'alerts'
+ * @param {Function} onData - Called with (data, collectedAt) on every snapshot / change
+ * @param {boolean} enabled - Set false to disconnect
+ */
+const useSiteResourceStream = (siteId, resource, onData, enabled = true) => {
+    const savedOnData = useRef(onData);
+
+    useEffect(() => {
+        savedOnData.current = onData;
+    }, [onData]);
+
+    useEffect(() => {
+        if (!siteId || !resource || !enabled) return;
+
+        const controller = new AbortController();
+        let value = null;
+        let retryTimer = null;
+        let justRefreshed = false;
+
+        const handleEvent = (type, event) => {
+            if (type === 'snapshot') value = event.data;
+            else if (type === 'patch') value = applyMergePatch(value, event.patch);
+            else if (type === 'resync') value = event.data.find(s => s.site_id === siteId && s.resource === resource)?.data ?? value;
+            else return;
+            savedOnData.current(value, event.collected_at);
+        };
+
+        const connect = async () => {
+            try {
+                const headers = {};
+                const token = sessionStorage.getItem('token');
+                if (token) headers.Authorization = `Bearer ${token}`;
+                const params = new URLSearchParams({ sub: `${siteId}/${resource}` });
+                const res = await fetch(`/api/v1/overview/stream?${params}`, { headers, signal: controller.signal });
+                if (res.status === 403) {
+                    console.warn(`[Stream] Access denied for ${siteId}/${resource}, not reconnecting.`);
+                    return;
+                }
+                if (res.status === 401 && !justRefreshed) {
+                    // Same resource through apiClient: its interceptor refreshes the token
+                    // (or logs out); on success reconnect right away with the new token
+                    const fresh = await apiClient.get(`/overview/sites/${siteId}/${resource}`, { signal: controller.signal });
+                    justRefreshed = true;
+                    value = fresh.data;
+                    savedOnData.current(value, fresh.headers['x-collected-at'] ?? null);
+                    if (!controller.signal.aborted) connect();
+                    return;
+                }
+                if (!res.ok || !res.body) throw new Error(`Stream failed: ${res.status}`);
+                justRefreshed = false;
+
+                const reader = res.body.pipeThrough(new TextDecoderStream()).getReader();
+                let buffer = '';
+                while (true) {
+                    const { value: chunk, done } = await reader.read();
+                    if (done) break;
+                    buffer += chunk;
+                    let sep;
+                    while ((sep = buffer.indexOf('\n\n')) !== -1) {
+                        const block = buffer.slice(0, sep);
+                        buffer = buffer.slice(sep + 2);
+                        const type = block.match(/^event: (.*)$/m)?.[1];
+                        const data = block.match(/^data: (.*)$/m)?.[1];
+                        if (type && data) handleEvent(type, JSON.parse(data));
+                    }
+                }
+            } catch (err) {
+                if (controller.signal.aborted) return;
+                const status = err.response?.status;
+                if (status === 401 || status === 403) {
+                    // Refresh failed (apiClient is logging out) or access was revoked
+                    console.warn(`[Stream] Not authorized (${status}), not reconnecting.`);
+                    return;
+                }
+                console.warn('[Stream] Disconnected, reconnecting in 5s...', err);
+            }
+            if (!controller.signal.aborted) retryTimer = setTimeout(connect, 5000);
+        };
+
+        connect();
+        return () => {
+            controller.abort();
+            clearTimeout(retryTimer);
+        };
+    }, [siteId, resource, enabled]);
+};
+
+export default useSiteResourceStream;
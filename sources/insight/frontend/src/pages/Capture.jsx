@@ -63,15 +63,20 @@ function Capture() {
 
     const connectWebSocket = () => {
         const protocol = window.location.protocol === 'https:' ? 'wss:' : 'ws:';
-        const socketUrl = `${protocol}//localhost:8000/ws`;
+        const socketUrl = `${protocol}//${window.location.host}/api/v1/capture/ws`;
 
         ws.current = new WebSocket(socketUrl);
 
         ws.current.onmessage = (event) => {
             const message = JSON.parse(event.data);
-            if (message.type === 'NEW_REQUEST' && isLive) {
+            if (!isLive) return;
+            if (message.type === 'NEW_REQUEST') {
                 setLogs(prev => [message.data, ...prev].slice(0, 100)); // Keep last 100 in live view
                 setTotal(t => t + 1);
+            } else if (message.type === 'NEW_REQUEST_BATCH') {
+                // Server batches bursts into one frame (oldest first)
+                setLogs(prev => [...message.data.slice().reverse(), ...prev].slice(0, 100));
+                setTotal(t => t + message.data.length + (message.dropped || 0));
             }
         };
 
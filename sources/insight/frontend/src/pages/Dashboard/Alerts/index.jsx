@@ -3,7 +3,7 @@ import { Bell, AlertCircle, CheckCircle2, User, Clock, Filter } from 'lucide-rea
 import apiClient from '../../../api/apiClient';
 import { useSite } from '../../../context/SiteContext';
 import { useSettings } from '../../../context/SettingsContext';
-import useIntervalFetch from '../../../hooks/useIntervalFetch';
+import useSiteResourceStream from '../../../hooks/useSiteResourceStream';
 import SyncIndicator from '../../../components/SyncIndicator';
 
 // --- Constants ---
@@ -143,10 +143,11 @@ const Alerts = () => {
         }
     };
 
-    // 60s auto-poll
-    useIntervalFetch(() => {
-        if (selectedSiteId && !loading) fetchAlerts(true);
-    }, isAutoRefreshEnabled ? 60000 : null, [selectedSiteId, loading, isAutoRefreshEnabled]);
+    // Live updates pushed by the server (shared poll per site, changes only)
+    useSiteResourceStream(selectedSiteId, 'alerts', (data) => {
+        setRawAlerts(Array.isArray(data) ? data : (data?.elements || data?.alerts || []));
+        setLastUpdated(new Date());
+    }, isAutoRefreshEnabled);
 
     // Apply UI filters
     const displayAlerts = useMemo(() => {
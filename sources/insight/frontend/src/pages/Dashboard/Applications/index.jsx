@@ -4,7 +4,7 @@ import apiClient from '../../../api/apiClient';
 import { useSite } from '../../../context/SiteContext';
 import { processApplicationData } from './applicationProcessor';
 import ApplicationTable from './ApplicationTable';
-import useIntervalFetch from '../../../hooks/useIntervalFetch';
+import useSiteResourceStream from '../../../hooks/useSiteResourceStream';
 import { useSettings } from '../../../context/SettingsContext';
 import SyncIndicator from '../../../components/SyncIndicator';
 
@@ -46,12 +46,11 @@ const Applications = () => {
         }
     };
 
-    // Auto-polling conditionally based on settings
-    useIntervalFetch(() => {
-        if (selectedSiteId && !loading) {
-            fetchDashboardData(selectedSiteId, true);
-        }
-    }, isAutoRefreshEnabled ? 60000 : null, [selectedSiteId, loading, isAutoRefreshEnabled]);
+    // Live updates pushed by the server (shared poll per site, changes only)
+    useSiteResourceStream(selectedSiteId, 'dashboard', (data) => {
+        setDashboardData(data);
+        setLastUpdated(new Date());
+    }, isAutoRefreshEnabled);
 
 
     const handleSort = (key) => {
@@ -2,6 +2,7 @@ import React, { useState, useMemo, useEffect } from 'react';
 import { AlertCircle, RefreshCw, Search, HardDrive, Wifi, ArrowDown, ArrowUp, Cloud, CloudOff, Users } from 'lucide-react';
 import apiClient from '../../../api/apiClient';
 import { useSite } from '../../../context/SiteContext';
+import useSiteResourceStream from '../../../hooks/useSiteResourceStream';
 
 // Aruba internal model ID → friendly display name
 const MODEL_DISPLAY_MAP = {
@@ -79,13 +80,6 @@ const Devices = () => {
         if (selectedSiteId) fetchInventory(selectedSiteId);
     }, [selectedSiteId]);
 
-    // Silent client-count refresh every 30s — no loading spinner
-    useEffect(() => {
-        if (!selectedSiteId) return;
-        const interval = setInterval(() => fetchInventorySilent(selectedSiteId), 30000);
-        return () => clearInterval(interval);
-    }, [selectedSiteId]);
-
     const extractDevices = (data) => {
         if (Array.isArray(data)) return data;
         if (data?.elements) return data.elements;
@@ -107,13 +101,11 @@ const Devices = () => {
         }
     };
 
-    const fetchInventorySilent = async (siteId) => {
-        try {
-            const res = await apiClient.get(`/overview/sites/${siteId}/inventory`);
-            const extracted = extractDevices(res.data);
-            if (extracted.length > 0) setDevices(extracted);
-        } catch { /* silent */ }
-    };
+    // Live client-count updates pushed by the server (shared poll per site, changes only) — no loading spinner
+    useSiteResourceStream(selectedSiteId, 'inventory', (data) => {
+        const extracted = extractDevices(data);
+        if (extracted.length > 0) setDevices(extracted);
+    });
 
     const processedDevices = useMemo(() => {
         let result = [...(devices || [])].filter(d => {
@@ -5,7 +5,7 @@ import { useSite } from '../../../context/SiteContext';
 import { processNetworks } from './dataProcessor';
 import NetworkTable from './NetworkTable';
 import WirelessTable from './WirelessTable';
-import useIntervalFetch from '../../../hooks/useIntervalFetch';
+import useSiteResourceStream from '../../../hooks/useSiteResourceStream';
 import { useSettings } from '../../../context/SettingsContext';
 import SyncIndicator from '../../../components/SyncIndicator';
 
@@ -49,10 +49,11 @@ const Networks = () => {
         }
     };
 
-    // 30s silent polling
-    useIntervalFetch(() => {
-        if (selectedSiteId && !loading) fetchNetworks(selectedSiteId, true);
-    }, isAutoRefreshEnabled ? 30000 : null, [selectedSiteId, loading, isAutoRefreshEnabled]);
+    // Live updates pushed by the server (shared poll per site, changes only)
+    useSiteResourceStream(selectedSiteId, 'wiredNetworks', (data) => {
+        setNetworksData(processNetworks(data));
+        setLastUpdated(new Date());
+    }, isAutoRefreshEnabled);
 
     // Split into wired / wireless — apply search on both
     const { wiredRows, wirelessRows } = useMemo(() => {
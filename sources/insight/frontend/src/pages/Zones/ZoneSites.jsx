@@ -4,6 +4,9 @@ import { Layers, Server, MapPin, ChevronRight, ChevronLeft, RefreshCw, Wifi, Sea
 import apiClient from '../../api/apiClient';
 import { useSite } from '../../context/SiteContext';
 
+// Must match BATCH_MAX_ITEMS of POST /overview/batch (backend overview/schemas.py)
+const BATCH_MAX_ITEMS = 500;
+
 const STATUS_BADGE = {
   up: { label: 'Online', cls: 'bg-emerald-500/10 text-emerald-400 border-emerald-500/20' },
   down: { label: 'Offline', cls: 'bg-slate-500/10 text-slate-400 border-slate-500/20' },
@@ -71,31 +74,54 @@ const ZoneSites = () => {
     return 0;
   });
 
-  // Fetch individual site metrics (health, alerts) dynamically
+  // Fetch site metrics (health, alerts) for all new sites in one batch request
   useEffect(() => {
     if (!zoneSites || zoneSites.length === 0) return;
 
-    zoneSites.forEach(site => {
+    const newSites = zoneSites.filter(site => !fetchedSiteIds.current.has(site.siteId || site.id || site._id));
+    if (newSites.length === 0) return;
+
+    const items = [];
+    newSites.forEach(site => {
       const id = site.siteId || site.id || site._id;
-      if (!fetchedSiteIds.current.has(id)) {
-        fetchedSiteIds.current.add(id);
+      fetchedSiteIds.current.add(id);
+      items.push({ site_id: id, sub_path: 'health' }, { site_id: id, sub_path: 'alerts' });
+      setSiteMetrics(prev => ({ ...prev, [id]: { loading: true, health: null, alerts: null } }));
+    });
 
-        setSiteMetrics(prev => ({ ...prev, [id]: { loading: true, health: null, alerts: 0 } }));
+    // The batch endpoint rejects more than BATCH_MAX_ITEMS items, so split into chunks;
+    // a failed chunk leaves its keys missing and those sites show an error, not made-up values
+    const chunks = [];
+    for (let i = 0; i < items.length; i += BATCH_MAX_ITEMS) {
+      chunks.push(items.slice(i, i + BATCH_MAX_ITEMS));
+    }
 
-        Promise.all([
-          apiClient.get(`/overview/sites/${id}/health`).catch(() => ({ data: null })),
-          apiClient.get(`/overview/sites/${id}/alerts`).catch(() => ({ data: [] }))
-        ]).then(([hRes, aRes]) => {
-          setSiteMetrics(prev => ({
-            ...prev,
-            [id]: {
-              loading: false,
-              health: hRes.data?.score ?? (site.status === 'up' ? 100 : 0),
-              alerts: Array.isArray(aRes.data) ? aRes.data.length : 0
-            }
-          }));
+    Promise.all(chunks.map(chunk =>
+      apiClient.post('/overview/batch', { items: chunk })
+        .then(res => res.data?.results || {})
+        .catch(err => {
+          console.error('Failed to fetch site metrics batch:', err);
+          return {};
+        })
+    )).then(chunkResults => {
+      const results = Object.assign({}, ...chunkResults);
+      setSiteMetrics(prev => {
+        const next = { ...prev };
+        newSites.forEach(site => {
+          const id = site.siteId || site.id || site._id;
+          const health = results[`${id}/health`];
+          const alerts = results[`${id}/alerts`];
+          const healthOk = health?.status === 200;
+          const alertsOk = alerts?.status === 200;
+          next[id] = {
+            loading: false,
+            error: !healthOk || !alertsOk,
+            health: healthOk ? (health.data?.score ?? null) : null,
+            alerts: alertsOk && Array.isArray(alerts.data) ? alerts.data.length : null
+          };
         });
-      }
+        return next;
+      });
     });
   }, [zoneSites]);
 
@@ -238,9 +264,9 @@ const ZoneSites = () => {
             const role = site.internal_app_role || site.aruba_role_raw || '';
             const isUp = site.status === 'up';
 
-            const metrics = siteMetrics[id] || { loading: true, health: isUp ? 100 : 0, alerts: 0 };
-            const healthScore = metrics.health !== null ? metrics.health : (isUp ? 100 : 0);
-            const alertsCount = metrics.alerts || 0;
+            const metrics = siteMetrics[id] || { loading: true, health: null, alerts: null };
+            const healthScore = metrics.health;
+            const alertsCount = metrics.alerts;
             const healthLabel = healthScore >= 80 ? 'Good' : healthScore >= 50 ? 'Fair' : 'Poor';
 
             const indicatorColor = isUp ? 'border-emerald-500' : 'border-rose-500';
@@ -267,6 +293,8 @@ const ZoneSites = () => {
                     <div className="flex items-end gap-1.5 h-[24px]">
                       {metrics.loading ? (
                         <div className="w-4 h-4 rounded-full border-2 border-slate-600 border-t-slate-400 animate-spin mt-1" />
+                      ) : healthScore === null ? (
+                        <span className="text-2xl font-bold text-slate-500 leading-none">—</span>
                       ) : (
                         <>
                           {healthScore >= 80 ? <CheckCircle2 size={18} className={healthColor} /> : <AlertTriangle size={18} className={healthColor} />}
@@ -274,20 +302,28 @@ const ZoneSites = () => {
                         </>
                       )}
                     </div>
-                    {!metrics.loading && <p className={`text-xs mt-1 ${healthColor}`}>{healthLabel}</p>}
+                    {!metrics.loading && (healthScore === null
+                      ? <p className="text-xs mt-1 text-slate-500">{metrics.error ? 'Không tải được' : 'No data'}</p>
+                      : <p className={`text-xs mt-1 ${healthColor}`}>{healthLabel}</p>)}
                   </div>
                   <div>
                     <p className="text-xs text-slate-400 mb-1">Alerts</p>
                     <div className="flex items-end gap-1.5 h-[24px]">
                       {metrics.loading ? (
                         <div className="w-4 h-4 rounded-full border-2 border-slate-600 border-t-slate-400 animate-spin mt-1" />
+                      ) : alertsCount === null ? (
+                        <span className="text-2xl font-bold text-slate-500 leading-none">—</span>
                       ) : (
                         <span className={`text-2xl font-bold leading-none ${alertsCount > 0 ? 'text-rose-500' : 'text-white'}`}>
                           {alertsCount}
                         </span>
                       )}
                     </div>
-                    {!metrics.loading && <p className="text-xs mt-1 text-slate-400">{alertsCount > 0 ? 'Active alerts' : 'No alerts'}</p>}
+                    {!metrics.loading && (
+                      <p className="text-xs mt-1 text-slate-400">
+                        {alertsCount === null ? 'Không tải được' : alertsCount > 0 ? 'Active alerts' : 'No alerts'}
+                      </p>
+                    )}
                   </div>
                 </div>
 
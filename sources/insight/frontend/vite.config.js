@@ -16,6 +16,7 @@ export default defineConfig(({ mode }) => {
         '/api': {
           target: env.VITE_API_URL || 'http://localhost:8001',
           changeOrigin: true,
+          ws: true,
         },
       },
     },